@@ -1,4 +1,6 @@
+import sys
 from logging.config import fileConfig
+from pathlib import Path
 
 from alembic import context
 from sqlalchemy import engine_from_config, pool
@@ -7,7 +9,10 @@ from sqlmodel import SQLModel
 from app.config import settings
 
 # Import all models to register them with SQLModel metadata
-from app.models import Agent, Company, Event, Movement, RoleConfig  # noqa: F401
+from app.models import Agent, Company, Event, Movement, RoleConfig, StateTombstone  # noqa: F401
+
+# Let migration scripts import the shared helpers in alembic/migration_helpers.py
+sys.path.insert(0, str(Path(__file__).parent))
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,18 @@
+"""Helpers shared by migration scripts (alembic/ is put on sys.path by env.py)."""
+import sqlalchemy as sa
+
+from alembic import op
+
+
+def drop_invalid_index(name: str, table: str) -> None:
+    """
+    Drop `name` if a failed CONCURRENTLY build left it INVALID: if_not_exists
+    would otherwise keep the unusable index instead of building it again.
+    Call inside op.get_context().autocommit_block().
+    """
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
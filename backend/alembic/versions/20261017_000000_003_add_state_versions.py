@@ -0,0 +1,53 @@
+"""Add per-company state versions and removal tombstones
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("companies", sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column(
+        "companies", sa.Column("min_delta_version", sa.BigInteger(), nullable=False, server_default="0")
+    )
+    op.add_column("agents", sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column("movements", sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "state_tombstones",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("company_id", sa.Uuid(), nullable=False),
+        sa.Column("kind", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column("key", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_state_tombstones_company_id"), "state_tombstones", ["company_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_state_tombstones_company_id"), table_name="state_tombstones")
+    op.drop_table("state_tombstones")
+
+    op.drop_column("movements", "version")
+    op.drop_column("agents", "version")
+    op.drop_column("companies", "min_delta_version")
+    op.drop_column("companies", "version")
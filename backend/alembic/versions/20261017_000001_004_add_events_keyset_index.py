@@ -0,0 +1,44 @@
+"""Add composite index for keyset pagination of company logs
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+The index is built with CREATE INDEX CONCURRENTLY (outside the migration
+transaction) so events stays writable while it builds. An index left
+INVALID by an interrupted earlier run is dropped and built again.
+"""
+from typing import Sequence, Union
+
+from migration_helpers import drop_invalid_index
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_invalid_index("ix_events_company_timestamp_id", "events")
+        op.create_index(
+            "ix_events_company_timestamp_id",
+            "events",
+            ["company_id", "timestamp", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_company_timestamp_id",
+            table_name="events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
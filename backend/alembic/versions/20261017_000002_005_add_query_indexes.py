@@ -0,0 +1,105 @@
+"""Add composite, unique and partial indexes for the hot query paths
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+Indexes are built with CREATE INDEX CONCURRENTLY (outside the migration
+transaction) so large tables stay writable while they build. An index left
+INVALID by an interrupted earlier run is dropped and built again. The
+migration stops, listing them, if agents already holds an agent_id twice in
+one company: which row to keep is left to the operator.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from migration_helpers import drop_invalid_index
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_duplicate_agents() -> None:
+    """Fail with the offending rows before the unique index build does, less readably."""
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT company_id, agent_id, count(*) FROM agents "
+            "GROUP BY company_id, agent_id HAVING count(*) > 1 ORDER BY company_id, agent_id"
+        )
+    ).all()
+    if duplicates:
+        listed = ", ".join(f"{company_id}/{agent_id} ({count} rows)" for company_id, agent_id, count in duplicates)
+        raise RuntimeError(
+            "Cannot build uq_agents_company_agent: agent_id is duplicated within a company for "
+            f"{listed}. Delete or rename the extra agents rows, then run the migration again."
+        )
+
+
+def upgrade() -> None:
+    _check_duplicate_agents()
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("uq_agents_company_agent", "agents"),
+            ("ix_events_company_from_agent_timestamp_id", "events"),
+            ("ix_events_company_to_agent_timestamp_id", "events"),
+            ("ix_events_company_type_timestamp_id", "events"),
+            ("ix_movements_company_pending", "movements"),
+        ):
+            drop_invalid_index(name, table)
+        # Agent lookups by (company_id, agent_id); also enforces agent_id uniqueness per company
+        op.create_index(
+            "uq_agents_company_agent",
+            "agents",
+            ["company_id", "agent_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Log filters: agent (as sender or receiver) and event type, newest first
+        op.create_index(
+            "ix_events_company_from_agent_timestamp_id",
+            "events",
+            ["company_id", "from_agent_id", "timestamp", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_events_company_to_agent_timestamp_id",
+            "events",
+            ["company_id", "to_agent_id", "timestamp", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_events_company_type_timestamp_id",
+            "events",
+            ["company_id", "event_type", "timestamp", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Pending movements only; completed rows never enter the index
+        op.create_index(
+            "ix_movements_company_pending",
+            "movements",
+            ["company_id"],
+            postgresql_where=sa.text("progress < 1.0"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("ix_movements_company_pending", "movements"),
+            ("ix_events_company_type_timestamp_id", "events"),
+            ("ix_events_company_to_agent_timestamp_id", "events"),
+            ("ix_events_company_from_agent_timestamp_id", "events"),
+            ("uq_agents_company_agent", "agents"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,62 @@
+"""Store event payloads as JSONB with a GIN index for containment filters
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+The GIN index is built CONCURRENTLY; one left INVALID by an interrupted
+earlier run is dropped and built again.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from migration_helpers import drop_invalid_index
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for column in ("payload", "inferred_actions"):
+        op.alter_column(
+            "events",
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            postgresql_using=f"{column}::jsonb",
+        )
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index("ix_events_payload_gin", "events")
+        # jsonb_path_ops: smaller and faster than the default opclass; serves @> only
+        op.create_index(
+            "ix_events_payload_gin",
+            "events",
+            ["payload"],
+            postgresql_using="gin",
+            postgresql_ops={"payload": "jsonb_path_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_payload_gin", table_name="events", postgresql_concurrently=True, if_exists=True
+        )
+
+    for column in ("payload", "inferred_actions"):
+        op.alter_column(
+            "events",
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            postgresql_using=f"{column}::json",
+        )
@@ -0,0 +1,54 @@
+"""Add generated full-text search vector over event payload text
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+The GIN index is built CONCURRENTLY; one left INVALID by an interrupted
+earlier run is dropped and built again.
+"""
+from typing import Sequence, Union
+
+from migration_helpers import drop_invalid_index
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Weighted payload fields: task (A), thought and message (B), artifact (C)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'task', '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'thought', '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'message', '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'artifact', '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        f"ALTER TABLE events ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index("ix_events_search_vector", "events")
+        op.create_index(
+            "ix_events_search_vector",
+            "events",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_search_vector", table_name="events", postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column("events", "search_vector")
@@ -0,0 +1,143 @@
+"""Partition events by month on timestamp; add per-company log retention
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+The events table is rebuilt as a RANGE-partitioned table (one partition per
+month plus a default partition) and existing rows are copied over. The
+primary key becomes (id, timestamp) because a partitioned table's unique
+constraints must include the partition key.
+
+Downtime: the whole rebuild runs in one transaction. events is locked in
+EXCLUSIVE mode before the copy, so reads keep working but every event write
+waits until the migration commits, for time proportional to the table size.
+The final DROP TABLE briefly takes an ACCESS EXCLUSIVE lock as well. On a
+large events table, run this in a maintenance window with ingestion paused.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'task', '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'thought', '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'message', '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(payload->>'artifact', '')), 'C')"
+)
+
+COPIED_COLUMNS = "id, company_id, from_agent_id, to_agent_id, event_type, payload, inferred_actions, timestamp"
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_events_company_id", "events", ["company_id"])
+    op.create_index("ix_events_timestamp", "events", ["timestamp"])
+    op.create_index("ix_events_company_timestamp_id", "events", ["company_id", "timestamp", "id"])
+    op.create_index(
+        "ix_events_company_from_agent_timestamp_id", "events", ["company_id", "from_agent_id", "timestamp", "id"]
+    )
+    op.create_index(
+        "ix_events_company_to_agent_timestamp_id", "events", ["company_id", "to_agent_id", "timestamp", "id"]
+    )
+    op.create_index(
+        "ix_events_company_type_timestamp_id", "events", ["company_id", "event_type", "timestamp", "id"]
+    )
+    op.create_index(
+        "ix_events_payload_gin",
+        "events",
+        ["payload"],
+        postgresql_using="gin",
+        postgresql_ops={"payload": "jsonb_path_ops"},
+    )
+    op.create_index("ix_events_search_vector", "events", ["search_vector"], postgresql_using="gin")
+
+
+def upgrade() -> None:
+    op.add_column("companies", sa.Column("retention_days", sa.Integer(), nullable=True))
+
+    # Block writes for the whole copy so no event inserted meanwhile is lost with the old table
+    op.execute("LOCK TABLE events IN EXCLUSIVE MODE")
+    op.execute(
+        f"""
+        CREATE TABLE events_partitioned (
+            id uuid NOT NULL,
+            company_id uuid NOT NULL CONSTRAINT events_company_id_fkey REFERENCES companies (id),
+            from_agent_id varchar(50),
+            to_agent_id varchar(50),
+            event_type varchar(50) NOT NULL,
+            payload jsonb,
+            inferred_actions jsonb,
+            timestamp timestamp without time zone NOT NULL,
+            search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED,
+            CONSTRAINT events_partitioned_pkey PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+    op.execute("CREATE TABLE events_default PARTITION OF events_partitioned DEFAULT")
+    # Monthly partitions from the oldest event through three months ahead
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month date;
+            first_month date := date_trunc(
+                'month', coalesce((SELECT min(timestamp) FROM events), now() AT TIME ZONE 'utc')
+            );
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    first_month,
+                    date_trunc('month', now() AT TIME ZONE 'utc') + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF events_partitioned FOR VALUES FROM (%L) TO (%L)',
+                    'events_p' || to_char(month, 'YYYY_MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(f"INSERT INTO events_partitioned ({COPIED_COLUMNS}) SELECT {COPIED_COLUMNS} FROM events")
+
+    op.drop_table("events")
+    op.rename_table("events_partitioned", "events")
+    op.execute("ALTER TABLE events RENAME CONSTRAINT events_partitioned_pkey TO events_pkey")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    op.execute(
+        f"""
+        CREATE TABLE events_plain (
+            id uuid NOT NULL,
+            company_id uuid NOT NULL CONSTRAINT events_company_id_fkey REFERENCES companies (id),
+            from_agent_id varchar(50),
+            to_agent_id varchar(50),
+            event_type varchar(50) NOT NULL,
+            payload jsonb,
+            inferred_actions jsonb,
+            timestamp timestamp without time zone NOT NULL,
+            search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED,
+            CONSTRAINT events_plain_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f"INSERT INTO events_plain ({COPIED_COLUMNS}) SELECT {COPIED_COLUMNS} FROM events")
+    op.drop_table("events")  # Drops all partitions
+    op.rename_table("events_plain", "events")
+    op.execute("ALTER TABLE events RENAME CONSTRAINT events_plain_pkey TO events_pkey")
+    _create_indexes()
+
+    op.drop_column("companies", "retention_days")
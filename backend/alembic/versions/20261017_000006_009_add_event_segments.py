@@ -0,0 +1,46 @@
+"""Add event_segments: index of events archived to compressed files
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_segments",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("company_id", sa.Uuid(), nullable=False),
+        sa.Column("path", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("source_partition", sqlmodel.sql.sqltypes.AutoString(length=63), nullable=False),
+        sa.Column("min_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("max_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_event_segments_company_max_timestamp",
+        "event_segments",
+        ["company_id", "max_timestamp"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_segments_company_max_timestamp", table_name="event_segments")
+    op.drop_table("event_segments")
@@ -0,0 +1,44 @@
+"""Add state_snapshots: periodic replayed agent state per company
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "state_snapshots",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("company_id", sa.Uuid(), nullable=False),
+        sa.Column("position_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("position_event_id", sa.Uuid(), nullable=False),
+        sa.Column("agents", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_state_snapshots_company_position",
+        "state_snapshots",
+        ["company_id", "position_timestamp"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_state_snapshots_company_position", table_name="state_snapshots")
+    op.drop_table("state_snapshots")
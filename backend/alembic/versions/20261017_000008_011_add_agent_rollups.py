@@ -0,0 +1,89 @@
+"""Add hourly per-agent analytics rollups and agents.status_changed_at
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with app.services.actions.HANDOFF_EVENT_TYPES
+_HANDOFF_EVENT_TYPES = "'WORK_REQUEST', 'WORK_COMPLETE', 'REVIEW_REQUEST', 'FEEDBACK', 'MESSAGE_SEND'"
+
+
+def upgrade() -> None:
+    # Time in the current status is counted from the migration on
+    op.add_column(
+        "agents",
+        sa.Column(
+            "status_changed_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+    )
+
+    op.create_table(
+        "agent_status_rollups",
+        sa.Column("company_id", sa.Uuid(), nullable=False),
+        sa.Column("agent_id", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("seconds", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint("company_id", "agent_id", "bucket", "status"),
+    )
+    op.create_table(
+        "agent_activity_rollups",
+        sa.Column("company_id", sa.Uuid(), nullable=False),
+        sa.Column("agent_id", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("events", sa.Integer(), nullable=False),
+        sa.Column("handoffs_sent", sa.Integer(), nullable=False),
+        sa.Column("handoffs_received", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint("company_id", "agent_id", "bucket"),
+    )
+
+    # Backfill event and handoff counts from the events still in Postgres
+    op.execute(
+        f"""
+        INSERT INTO agent_activity_rollups
+            (company_id, agent_id, bucket, events, handoffs_sent, handoffs_received)
+        SELECT company_id, from_agent_id, date_trunc('hour', timestamp), count(*),
+               count(*) FILTER (WHERE to_agent_id IS NOT NULL AND event_type IN ({_HANDOFF_EVENT_TYPES})),
+               0
+        FROM events
+        WHERE from_agent_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO agent_activity_rollups
+            (company_id, agent_id, bucket, events, handoffs_sent, handoffs_received)
+        SELECT company_id, to_agent_id, date_trunc('hour', timestamp), 0, 0, count(*)
+        FROM events
+        WHERE to_agent_id IS NOT NULL AND event_type IN ({_HANDOFF_EVENT_TYPES})
+        GROUP BY 1, 2, 3
+        ON CONFLICT (company_id, agent_id, bucket)
+        DO UPDATE SET handoffs_received = EXCLUDED.handoffs_received
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("agent_activity_rollups")
+    op.drop_table("agent_status_rollups")
+    op.drop_column("agents", "status_changed_at")
@@ -0,0 +1,65 @@
+"""Add handoff_edges: hourly agent-to-agent handoff counters
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with app.services.actions.HANDOFF_EVENT_TYPES
+_HANDOFF_EVENT_TYPES = "'WORK_REQUEST', 'WORK_COMPLETE', 'REVIEW_REQUEST', 'FEEDBACK', 'MESSAGE_SEND'"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "handoff_edges",
+        sa.Column("company_id", sa.Uuid(), nullable=False),
+        sa.Column("from_agent_id", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("to_agent_id", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("event_type", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("artifact", sqlmodel.sql.sqltypes.AutoString(length=200), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("last_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint(
+            "company_id", "from_agent_id", "to_agent_id", "bucket", "event_type", "artifact"
+        ),
+    )
+    op.create_index(
+        "ix_handoff_edges_company_bucket",
+        "handoff_edges",
+        ["company_id", "bucket"],
+        unique=False,
+    )
+
+    # Backfill from the events still in Postgres
+    op.execute(
+        f"""
+        INSERT INTO handoff_edges
+            (company_id, from_agent_id, to_agent_id, bucket, event_type, artifact, count, last_at)
+        SELECT company_id, from_agent_id, to_agent_id, date_trunc('hour', timestamp), event_type,
+               coalesce(left(payload->>'artifact', 200), ''), count(*), max(timestamp)
+        FROM events
+        WHERE from_agent_id IS NOT NULL AND to_agent_id IS NOT NULL
+          AND event_type IN ({_HANDOFF_EVENT_TYPES})
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_handoff_edges_company_bucket", table_name="handoff_edges")
+    op.drop_table("handoff_edges")
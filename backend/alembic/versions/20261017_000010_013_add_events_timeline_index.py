@@ -0,0 +1,32 @@
+"""Add a covering events index for timeline histograms
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+events is partitioned, so the index can't be built CONCURRENTLY; creating it
+on the parent builds it on every partition.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # date_bin counts per (company, time range), grouped by type or sender, from the index alone
+    op.create_index(
+        "ix_events_company_timestamp_covering",
+        "events",
+        ["company_id", "timestamp"],
+        postgresql_include=["event_type", "from_agent_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_company_timestamp_covering", table_name="events")
@@ -0,0 +1,62 @@
+"""Denormalize agent_count, event_count and last_activity on companies
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("companies", sa.Column("agent_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("companies", sa.Column("event_count", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column("companies", sa.Column("last_activity", sa.DateTime(), nullable=True))
+
+    # One-off backfill; from here on the counters move with each write
+    op.execute(
+        """
+        UPDATE companies SET agent_count = counts.agent_count
+        FROM (SELECT company_id, count(*) AS agent_count FROM agents GROUP BY company_id) AS counts
+        WHERE companies.id = counts.company_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE companies
+        SET event_count = counts.event_count, last_activity = counts.last_activity
+        FROM (
+            SELECT company_id, count(*) AS event_count, max(timestamp) AS last_activity
+            FROM events GROUP BY company_id
+        ) AS counts
+        WHERE companies.id = counts.company_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE companies
+        SET event_count = companies.event_count + archived.event_count,
+            last_activity = greatest(companies.last_activity, archived.last_activity)
+        FROM (
+            SELECT company_id, sum(event_count) AS event_count, max(max_timestamp) AS last_activity
+            FROM event_segments GROUP BY company_id
+        ) AS archived
+        WHERE companies.id = archived.company_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("companies", "last_activity")
+    op.drop_column("companies", "event_count")
+    op.drop_column("companies", "agent_count")
@@ -0,0 +1,49 @@
+"""Add company list indexes for sorting, name prefix filters and keyset pages
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17
+
+Indexes are built with CREATE INDEX CONCURRENTLY (outside the migration
+transaction) so companies stay writable while they build. An index left
+INVALID by an interrupted earlier run is dropped and built again.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from migration_helpers import drop_invalid_index
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_companies_name_id": ["name", "id"],
+    "ix_companies_created_at_id": ["created_at", "id"],
+    "ix_companies_agent_count_id": ["agent_count", "id"],
+    "ix_companies_last_activity_id": [sa.text("last_activity DESC NULLS LAST"), sa.text("id DESC")],
+    "ix_companies_name_prefix": [sa.text('lower(name) COLLATE "C"')],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            drop_invalid_index(name, "companies")
+            op.create_index(
+                name,
+                "companies",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(INDEXES):
+            op.drop_index(name, table_name="companies", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,52 @@
+"""Add a maintained change marker for the company list
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17
+
+The company list ETag was built from count(*) and max(updated_at) over the
+whole companies table. It now reads a single-row generation, bumped when
+companies are created or deleted, and max(updated_at) from a new index.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from migration_helpers import drop_invalid_index
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "company_list_marker",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO company_list_marker (id, generation) VALUES (1, 0)")
+    with op.get_context().autocommit_block():
+        drop_invalid_index("ix_companies_updated_at", "companies")
+        op.create_index(
+            "ix_companies_updated_at",
+            "companies",
+            ["updated_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_companies_updated_at",
+            table_name="companies",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table("company_list_marker")
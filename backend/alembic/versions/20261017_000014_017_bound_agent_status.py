@@ -0,0 +1,36 @@
+"""Bound agents.status to the rollup status length
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17
+
+agents.status was unbounded while agent_status_rollups.status is
+varchar(50), so an agent holding a longer status failed every rollup flush
+of its transitions. Longer statuses already stored are cut to 50
+characters. The agents table is rewritten under an exclusive lock.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "agents",
+        "status",
+        type_=sa.String(length=50),
+        existing_nullable=False,
+        postgresql_using="left(status, 50)",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column("agents", "status", type_=sa.String(), existing_nullable=False)
@@ -1,44 +1,165 @@
+import asyncio
+import json
+import re
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, cast, func, or_, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import select
 
-from app.database import get_session
-from app.models import Agent, Company, Event, Movement, RoleConfig
-from app.models.role_config import CUSTOM_ROLE_COLORS, DEFAULT_ROLES
+from app.config import settings
+from app.core.etag import is_not_modified, make_etag, not_modified, set_etag
+from app.core.export import EXPORT_FORMATS, csv_chunk, gzip_stream, ndjson_chunk
+from app.core.pagination import (
+    COUNT_MODES,
+    count_rows,
+    decode_cursor,
+    decode_keyset,
+    encode_cursor,
+    encode_keyset,
+    estimate_rows,
+)
+from app.core.sse import SSE_HEADERS, SSE_KEEPALIVE, format_sse
+from app.database import get_session, get_session_factory
+from app.models import (
+    Agent,
+    AgentActivityRollup,
+    AgentStatusRollup,
+    Company,
+    CompanyListMarker,
+    Event,
+    EventSegment,
+    HandoffEdge,
+    Movement,
+    StateSnapshot,
+    StateTombstone,
+)
+from app.models.event import SEARCH_FIELDS, event_search_vector
 from app.schemas.company import (
+    AgentAnalytics,
+    AgentAnalyticsBucket,
     AgentCreateRequest,
     AgentResponse,
+    CompanyAnalyticsResponse,
     CompanyCreate,
     CompanyListResponse,
     CompanyResponse,
     CompanyStateResponse,
-    RoleConfigResponse,
+    CompanyUpdate,
+    HandoffArtifact,
+    HandoffGraphEdge,
+    HandoffGraphNode,
+    HandoffGraphResponse,
+    PlaybackControlRequest,
+    TimelineBucket,
+    TimelineResponse,
+)
+from app.services.analytics import (
+    ROLLUP_BUCKET,
+    flush_rollups,
+    record_status_change,
+    rollup_bucket,
+    split_by_bucket,
+)
+from app.services.archive import (
+    EVENT_RECORD_COLUMNS,
+    ArchiveFilter,
+    archived_batches,
+    count_archived_events,
+    find_segments,
+    read_archived_page,
+    remove_agent_from_segments,
+    remove_segment_files,
+)
+from app.services.broadcaster import company_broadcaster, record_change
+from app.services.directory import company_directory
+from app.services.partitions import event_read_horizon
+from app.services.playback import MAX_PLAYBACK_SPEED, MIN_PLAYBACK_SPEED, play_events, playbacks
+from app.services.projection import AgentView, MovementView, company_projections
+from app.services.replay import state_replay
+from app.services.roles import role_registry
+from app.services.timeline import (
+    TIMELINE_GROUPS,
+    bucket_ceil,
+    bucket_start,
+    parse_bucket_width,
+    timeline_cache,
+)
+from app.services.versioning import (
+    bump_company_list_generation,
+    bump_company_version,
+    prune_tombstones,
+    record_removals,
 )
 
 MAX_AGENTS_PER_COMPANY = 50
 
+# Log export: rows fetched per server-side cursor round trip
+_EXPORT_BATCH_SIZE = 1000
+
+# Full-text search over event payloads (see Event.search_vector)
+_SEARCH_CONFIG = cast("english", REGCONFIG)
+_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2"
+
+# Handoff graph windows: "all" or a number of hours or days, e.g. "24h", "7d"
+_GRAPH_WINDOW = re.compile(r"^(\d+)([hd])$")
+_GRAPH_WINDOW_UNITS = {"h": "hours", "d": "days"}
+# Artifacts listed per handoff graph edge
+_GRAPH_EDGE_ARTIFACTS = 10
+
+# Company list sort columns: value type (for cursors) and whether the order runs
+# largest/newest first; ties break on id
+_COMPANY_SORTS = {
+    "last_activity": (datetime, True),
+    "name": (str, False),
+    "created_at": (datetime, True),
+    "agent_count": (int, True),
+}
+_COMPANY_STATUSES = ("active", "inactive")
+
 router = APIRouter()
 
 
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 @router.post("", response_model=CompanyResponse, status_code=201)
 async def create_company(
     company_in: CompanyCreate,
     session: AsyncSession = Depends(get_session),
 ):
     """Register a new virtual company with optional agents."""
+    # Check for duplicate agent_ids in the request (uq_agents_company_agent)
+    agent_ids = [agent_data.agent_id for agent_data in company_in.agents]
+    duplicates = sorted({agent_id for agent_id in agent_ids if agent_ids.count(agent_id) > 1})
+    if duplicates:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Duplicate agent ids in request: {', '.join(duplicates)}",
+        )
+
     # Create company
     company = Company(
         name=company_in.name,
         description=company_in.description,
+        retention_days=company_in.retention_days,
+        agent_count=len(company_in.agents),
     )
     session.add(company)
     await session.flush()
 
     # Create agents (if provided)
     for agent_data in company_in.agents:
+        await role_registry.resolve(session, agent_data.role)
         agent = Agent(
             company_id=company.id,
             agent_id=agent_data.agent_id,
@@ -48,68 +169,170 @@ async def create_company(
         )
         session.add(agent)
 
+    await bump_company_list_generation(session)
     await session.commit()
     await session.refresh(company)
+    company_directory.invalidate(company.id)
 
     return CompanyResponse(
         company_id=company.id,
         name=company.name,
         created_at=company.created_at,
+        retention_days=company.retention_days,
     )
 
 
+def _decode_company_cursor(cursor: str, sort: str) -> tuple:
+    """(sort value, id) from a company list cursor. Raises ValueError if it doesn't fit `sort`."""
+    values = decode_keyset(cursor)
+    if len(values) != 3 or values[0] != sort:
+        raise ValueError("Invalid cursor")
+    value_type, _ = _COMPANY_SORTS[sort]
+    value = values[1]
+    if value is None:
+        if not Company.__table__.c[sort].nullable:
+            raise ValueError("Invalid cursor")
+    elif value_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, value_type):
+        raise ValueError("Invalid cursor")
+    return value, UUID(values[2])
+
+
+def _company_keyset(sort: str, value, row_id: UUID):
+    """Companies after the (value, id) position in `sort` order."""
+    column = Company.__table__.c[sort]
+    _, descending = _COMPANY_SORTS[sort]
+    if not descending:
+        return tuple_(column, Company.id) > tuple_(value, row_id)
+    # Descending with nulls last: past a null only nulls with smaller ids remain
+    if value is None:
+        return and_(column.is_(None), Company.id < row_id)
+    after = tuple_(column, Company.id) < tuple_(value, row_id)
+    return or_(after, column.is_(None)) if column.nullable else after
+
+
+def _name_prefix_range(prefix: str) -> list:
+    """
+    Case-insensitive name prefix match as a range on lower(name) COLLATE "C",
+    which ix_companies_name_prefix serves; unlike LIKE it needs no escaping
+    and stays indexable with bound parameters.
+    """
+    lowered = func.lower(Company.name).collate("C")
+    prefix = prefix.lower()
+    conditions = [lowered >= prefix]
+    if ord(prefix[-1]) < 0x10FFFF:
+        conditions.append(lowered < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+    return conditions
+
+
 @router.get("", response_model=CompanyListResponse)
 async def list_companies(
+    request: Request,
+    response: Response,
     limit: int = 100,
     offset: int = 0,
+    sort: str = "last_activity",
+    name_prefix: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
 ):
-    """List all companies with pagination. Optimized to avoid N+1 queries."""
-    from sqlalchemy import func, outerjoin
-    from sqlalchemy.orm import aliased
-
-    # Subquery for agent counts
-    agent_count_subq = (
-        select(Agent.company_id, func.count(Agent.id).label("agent_count"))
-        .group_by(Agent.company_id)
-        .subquery()
-    )
+    """
+    List companies a page at a time, from the company rows alone.
+
+    `sort` orders by last_activity (most recent first, companies without
+    events last), name (A-Z), created_at (newest first) or agent_count (most
+    agents first); each order has a (column, id) index. `name_prefix`
+    matches the start of the name case-insensitively; `status` keeps
+    "active" (with agents) or "inactive" companies.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the following page;
+    `offset` is kept for older clients and ignored when a cursor is given.
+    """
+    if sort not in _COMPANY_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {list(_COMPANY_SORTS)}")
+    if status is not None and status not in _COMPANY_STATUSES:
+        raise HTTPException(
+            status_code=400, detail=f"status must be one of {list(_COMPANY_STATUSES)}"
+        )
 
-    # Subquery for last activity (max timestamp per company)
-    last_activity_subq = (
-        select(Event.company_id, func.max(Event.timestamp).label("last_activity"))
-        .group_by(Event.company_id)
-        .subquery()
-    )
+    position = None
+    if cursor is not None:
+        try:
+            position = _decode_company_cursor(cursor, sort)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    # Main query with left joins
-    query = (
+    # Change marker: creates/deletes bump the list generation, other company
+    # writes bump updated_at; both are single-row lookups
+    marker_result = await session.execute(
         select(
-            Company,
-            func.coalesce(agent_count_subq.c.agent_count, 0).label("agent_count"),
-            last_activity_subq.c.last_activity,
+            select(CompanyListMarker.generation).scalar_subquery(),
+            select(func.max(Company.updated_at)).scalar_subquery(),
         )
-        .outerjoin(agent_count_subq, Company.id == agent_count_subq.c.company_id)
-        .outerjoin(last_activity_subq, Company.id == last_activity_subq.c.company_id)
-        .offset(offset)
-        .limit(limit)
     )
+    generation, last_updated = marker_result.one()
+    etag = make_etag(
+        "companies",
+        generation,
+        last_updated,
+        limit,
+        offset,
+        sort,
+        name_prefix,
+        status,
+        cursor,
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # Counts and last activity are denormalized on the company row
+    query = select(Company)
+    if name_prefix:
+        query = query.where(*_name_prefix_range(name_prefix))
+    if status == "active":
+        query = query.where(Company.agent_count > 0)
+    elif status == "inactive":
+        query = query.where(Company.agent_count == 0)
+
+    column = Company.__table__.c[sort]
+    _, descending = _COMPANY_SORTS[sort]
+    if descending:
+        query = query.order_by(column.desc().nullslast(), Company.id.desc())
+    else:
+        query = query.order_by(column, Company.id)
+    if position is not None:
+        query = query.where(_company_keyset(sort, *position))
+    else:
+        query = query.offset(offset)
 
-    result = await session.execute(query)
-    rows = result.all()
+    # One extra row tells whether another page follows
+    result = await session.execute(query.limit(limit + 1))
+    companies = result.scalars().all()
+    has_more = len(companies) > limit
+    companies = companies[:limit]
 
     items = [
         {
-            "company_id": row.Company.id,
-            "name": row.Company.name,
-            "agent_count": row.agent_count,
-            "last_activity": row.last_activity,
-            "status": "active" if row.agent_count > 0 else "inactive",
+            "company_id": company.id,
+            "name": company.name,
+            "agent_count": company.agent_count,
+            "event_count": company.event_count,
+            "last_activity": company.last_activity,
+            "status": "active" if company.agent_count > 0 else "inactive",
         }
-        for row in rows
+        for company in companies
     ]
+    next_cursor = None
+    if has_more and companies:
+        last = companies[-1]
+        next_cursor = encode_keyset([sort, getattr(last, sort), last.id])
 
-    return CompanyListResponse(companies=items)
+    return CompanyListResponse(companies=items, has_more=has_more, next_cursor=next_cursor)
 
 
 @router.get("/{company_id}", response_model=CompanyResponse)
@@ -128,22 +351,54 @@ async def get_company(
         company_id=company.id,
         name=company.name,
         created_at=company.created_at,
+        retention_days=company.retention_days,
     )
 
 
-@router.delete("/{company_id}")
-async def delete_company(
+@router.patch("/{company_id}", response_model=CompanyResponse)
+async def update_company(
     company_id: UUID,
+    company_in: CompanyUpdate,
     session: AsyncSession = Depends(get_session),
 ):
-    """Delete a company and all related data (agents, events, movements)."""
+    """
+    Update company details.
+
+    `retention_days` narrows how far back this company's logs reach; it can
+    only be shorter than the global EVENT_RETENTION_DAYS. Older events stay
+    stored until their monthly partition expires globally.
+    """
     result = await session.execute(select(Company).where(Company.id == company_id))
     company = result.scalars().first()
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    # Cascade delete: movements, events, agents, then company
+    for field in company_in.model_fields_set:
+        setattr(company, field, getattr(company_in, field))
+    # updated_at is the company list's change marker
+    await bump_company_version(session, company_id)
+    await session.commit()
+    await session.refresh(company)
+
+    return CompanyResponse(
+        company_id=company.id,
+        name=company.name,
+        created_at=company.created_at,
+        retention_days=company.retention_days,
+    )
+
+
+@router.delete("/{company_id}")
+async def delete_company(
+    company_id: UUID,
+    session: AsyncSession = Depends(get_session),
+):
+    """Delete a company and all related data (agents, events, archived events, movements)."""
+    if not await company_directory.get(session, company_id):
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    # Cascade delete: movements, events, agents, tombstones, then company
     await session.execute(
         Movement.__table__.delete().where(Movement.company_id == company_id)
     )
@@ -153,118 +408,44 @@ async def delete_company(
     await session.execute(
         Agent.__table__.delete().where(Agent.company_id == company_id)
     )
-    await session.delete(company)
-    await session.commit()
-
-    return {"company_id": str(company_id), "status": "deleted"}
-
-
-async def get_or_create_role_config(
-    role: str, session: AsyncSession
-) -> RoleConfig:
-    """Get existing role config or create new one for custom roles."""
-    # Check if role config exists
-    result = await session.execute(
-        select(RoleConfig).where(RoleConfig.role_id == role)
+    await session.execute(
+        StateTombstone.__table__.delete().where(StateTombstone.company_id == company_id)
     )
-    role_config = result.scalars().first()
-
-    if role_config:
-        return role_config
-
-    # Check if it's a default role that needs to be seeded
-    for default_role in DEFAULT_ROLES:
-        if default_role["role_id"] == role:
-            role_config = RoleConfig(**default_role)
-            session.add(role_config)
-            await session.flush()
-            return role_config
-
-    # Create new custom role config
-    # Count existing custom roles to determine color index
-    result = await session.execute(
-        select(RoleConfig).where(RoleConfig.is_default == False)  # noqa: E712
+    await session.execute(
+        StateSnapshot.__table__.delete().where(StateSnapshot.company_id == company_id)
     )
-    custom_roles = result.scalars().all()
-    custom_role_count = len(custom_roles)
-
-    # Convert snake_case to Title Case
-    display_name = " ".join(word.capitalize() for word in role.split("_"))
-
-    # Use extended palette if available, otherwise generate HSL from hash
-    if custom_role_count < len(CUSTOM_ROLE_COLORS):
-        color, zone_color = CUSTOM_ROLE_COLORS[custom_role_count]
-    else:
-        # Generate deterministic color using HSL from role name hash
-        color, zone_color = _generate_hsl_color_from_hash(role)
-
-    role_config = RoleConfig(
-        role_id=role,
-        display_name=display_name,
-        color=color,
-        zone_color=zone_color,
-        is_default=False,
+    await session.execute(
+        AgentStatusRollup.__table__.delete().where(AgentStatusRollup.company_id == company_id)
     )
-    session.add(role_config)
-    await session.flush()
-    return role_config
-
-
-def _generate_hsl_color_from_hash(role: str) -> tuple[str, str]:
-    """Generate deterministic HSL color from role name hash."""
-    import hashlib
-
-    # Hash the role name for deterministic color
-    hash_bytes = hashlib.md5(role.encode()).digest()
-    hash_int = int.from_bytes(hash_bytes[:4], 'big')
-
-    # Generate HSL values
-    # Hue: 0-360 (full spectrum)
-    # Saturation: 60-80% (vibrant but not oversaturated)
-    # Lightness: 45-55% (visible on dark background)
-    hue = hash_int % 360
-    saturation = 60 + (hash_int >> 8) % 20  # 60-80%
-    lightness = 45 + (hash_int >> 16) % 10  # 45-55%
-
-    # Convert HSL to hex color
-    color_hex = _hsl_to_hex(hue, saturation, lightness)
-    zone_color = f"rgba({_hsl_to_rgb(hue, saturation, lightness)}, 0.3)"
-
-    return color_hex, zone_color
-
-
-def _hsl_to_hex(h: int, s: int, l: int) -> str:
-    """Convert HSL to hex color string."""
-    r, g, b = _hsl_to_rgb_values(h, s / 100, l / 100)
-    return f"#{int(r):02x}{int(g):02x}{int(b):02x}".upper()
-
-
-def _hsl_to_rgb(h: int, s: int, l: int) -> str:
-    """Convert HSL to RGB string for rgba()."""
-    r, g, b = _hsl_to_rgb_values(h, s / 100, l / 100)
-    return f"{int(r)}, {int(g)}, {int(b)}"
-
-
-def _hsl_to_rgb_values(h: int, s: float, l: float) -> tuple[float, float, float]:
-    """Convert HSL to RGB values (0-255)."""
-    c = (1 - abs(2 * l - 1)) * s
-    x = c * (1 - abs((h / 60) % 2 - 1))
-    m = l - c / 2
-
-    if h < 60:
-        r, g, b = c, x, 0
-    elif h < 120:
-        r, g, b = x, c, 0
-    elif h < 180:
-        r, g, b = 0, c, x
-    elif h < 240:
-        r, g, b = 0, x, c
-    elif h < 300:
-        r, g, b = x, 0, c
-    else:
-        r, g, b = c, 0, x
+    await session.execute(
+        AgentActivityRollup.__table__.delete().where(AgentActivityRollup.company_id == company_id)
+    )
+    await session.execute(
+        HandoffEdge.__table__.delete().where(HandoffEdge.company_id == company_id)
+    )
+    segment_result = await session.execute(
+        EventSegment.__table__.delete()
+        .where(EventSegment.company_id == company_id)
+        .returning(EventSegment.path)
+    )
+    segment_paths = list(segment_result.scalars())
+    company_result = await session.execute(
+        Company.__table__.delete().where(Company.id == company_id)
+    )
+    if company_result.rowcount == 0:
+        # The directory entry was stale: the company is already gone
+        await session.rollback()
+        company_directory.invalidate(company_id)
+        raise HTTPException(status_code=404, detail="Company not found")
+    await bump_company_list_generation(session)
+    await session.commit()
+    company_directory.invalidate(company_id)
+    company_projections.invalidate(company_id)
+    state_replay.invalidate(company_id)
+    timeline_cache.invalidate(company_id)
+    await remove_segment_files(segment_paths)
 
-    return (r + m) * 255, (g + m) * 255, (b + m) * 255
+    return {"company_id": str(company_id), "status": "deleted"}
 
 
 @router.post("/{company_id}/agents", response_model=AgentResponse, status_code=201)
@@ -275,40 +456,27 @@ async def create_agent(
 ):
     """Create a new agent for a company."""
     # Verify company exists
-    result = await session.execute(select(Company).where(Company.id == company_id))
-    company = result.scalars().first()
+    entry = await company_directory.get(session, company_id)
 
-    if not company:
+    if not entry:
         raise HTTPException(status_code=404, detail="Company not found")
 
     # Check max agents limit
-    agent_count_result = await session.execute(
-        select(Agent).where(Agent.company_id == company_id)
-    )
-    agent_count = len(agent_count_result.scalars().all())
-
-    if agent_count >= MAX_AGENTS_PER_COMPANY:
+    if len(entry.agents) >= MAX_AGENTS_PER_COMPANY:
         raise HTTPException(
             status_code=400,
             detail=f"Maximum agents reached ({MAX_AGENTS_PER_COMPANY})",
         )
 
     # Check for duplicate agent_id within company
-    result = await session.execute(
-        select(Agent).where(
-            Agent.company_id == company_id, Agent.agent_id == agent_in.agent_id
-        )
-    )
-    existing_agent = result.scalars().first()
-
-    if existing_agent:
+    if agent_in.agent_id in entry.agents:
         raise HTTPException(
             status_code=409,
             detail=f"Agent with id '{agent_in.agent_id}' already exists in this company",
         )
 
     # Get or create role config
-    role_config = await get_or_create_role_config(agent_in.role, session)
+    role_config = await role_registry.resolve(session, agent_in.role)
 
     # Create agent
     agent = Agent(
@@ -321,9 +489,34 @@ async def create_agent(
         position_x=0.0,
         position_y=0.0,
     )
+    agent.version = await bump_company_version(session, company_id, agents=1)
     session.add(agent)
-    await session.commit()
+    record_change(
+        session,
+        company_id,
+        "agent_added",
+        {
+            "agent_id": agent.agent_id,
+            "name": agent.name,
+            "role": agent.role,
+            "status": agent.status,
+            "zone": agent.position_zone,
+            "x": agent.position_x,
+            "y": agent.position_y,
+        },
+    )
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent request created the same agent_id (uq_agents_company_agent)
+        await session.rollback()
+        company_directory.invalidate(company_id)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Agent with id '{agent_in.agent_id}' already exists in this company",
+        )
     await session.refresh(agent)
+    company_directory.invalidate(company_id)
 
     return AgentResponse(
         agent_id=agent.agent_id,
@@ -335,96 +528,287 @@ async def create_agent(
             "x": agent.position_x,
             "y": agent.position_y,
         },
-        role_config=RoleConfigResponse(
-            role_id=role_config.role_id,
-            display_name=role_config.display_name,
-            color=role_config.color,
-            zone_color=role_config.zone_color,
-            is_default=role_config.is_default,
-        ),
+        role_config=role_config,
     )
 
 
 @router.get("/{company_id}/state", response_model=CompanyStateResponse)
 async def get_company_state(
     company_id: UUID,
+    request: Request,
+    response: Response,
+    since: Optional[int] = None,
+    at: Optional[datetime] = None,
     session: AsyncSession = Depends(get_session),
 ):
-    """Get current state of a company for dashboard polling."""
-    # Verify company exists
-    result = await session.execute(select(Company).where(Company.id == company_id))
-    company = result.scalars().first()
+    """
+    Get current state of a company for dashboard polling.
+
+    With `at=<timestamp>` the state as of that time is returned instead,
+    rebuilt by replaying the company's events up to it (naive times are UTC).
+    Historical states carry no pending movements and can't be combined with
+    `since`.
+
+    With `since=<version>` (the `version` of a previous response) only agents
+    and movements changed after that version are returned, plus the ids removed
+    since then. A full snapshot (`is_delta: false`) is returned instead when the
+    version is unknown or older than the retained removal history.
+
+    State is served from the in-memory projection; the database is only asked
+    for the current version, and the projection is rebuilt when it lags behind.
+    """
+    result = await session.execute(
+        select(Company.version, Company.min_delta_version).where(Company.id == company_id)
+    )
+    row = result.first()
 
-    if not company:
+    if row is None:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    # Get all agents
-    agent_result = await session.execute(
-        select(Agent).where(Agent.company_id == company_id)
+    if at is not None:
+        if since is not None:
+            raise HTTPException(status_code=400, detail="at can't be combined with since")
+        return await _company_state_at(session, company_id, _naive_utc(at), row.version, request, response)
+
+    projection = company_projections.get(company_id, row.version)
+    if projection is None:
+        projection = await company_projections.load(session, company_id)
+        if projection is None:
+            raise HTTPException(status_code=404, detail="Company not found")
+
+    version = projection.version
+    is_delta = since is not None and row.min_delta_version <= since <= version
+
+    # Every agent/movement write bumps the version, so it fully identifies the payload
+    etag = make_etag("state", company_id, version, since if is_delta else None)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    removed_agent_ids: list[str] = []
+    removed_movement_ids: list[str] = []
+    if not is_delta:
+        agents = list(projection.agents.values())
+        movements = list(projection.movements.values())
+    elif since >= projection.history_floor:
+        agents = [a for a in projection.agents.values() if a.version > since]
+        movements = [m for m in projection.movements.values() if m.version > since]
+        present_agent_ids = {a.agent_id for a in agents}
+        for removed_version, kind, key in projection.removals:
+            if removed_version <= since:
+                continue
+            if kind == "agent" and key not in present_agent_ids:
+                removed_agent_ids.append(key)
+            elif kind == "movement":
+                removed_movement_ids.append(key)
+    else:
+        # Older than the projection's removal history: read the delta from the database
+        agents, movements, removed_agent_ids, removed_movement_ids = await _load_state_delta(
+            session, company_id, since, version
+        )
+
+    # Role configs for the returned agents (in-memory after the first lookup)
+    role_configs_map = {}
+    for role in {a.role for a in agents}:
+        role_configs_map[role] = await role_registry.resolve(session, role)
+
+    return CompanyStateResponse(
+        company_id=company_id,
+        agents=[a.to_state(role_configs_map.get(a.role)) for a in agents],
+        pending_movements=[m.to_state() for m in movements],
+        role_configs=role_configs_map,
+        last_updated=projection.updated_at,
+        version=version,
+        is_delta=is_delta,
+        removed_agent_ids=removed_agent_ids,
+        removed_movement_ids=removed_movement_ids,
     )
-    agents = agent_result.scalars().all()
 
-    # Collect unique roles and fetch their configs
-    unique_roles = set(a.role for a in agents)
+
+async def _company_state_at(
+    session: AsyncSession,
+    company_id: UUID,
+    at: datetime,
+    version: int,
+    request: Request,
+    response: Response,
+):
+    """/state?at=: agent state replayed from events up to `at`."""
+    # Past state only changes when history does, which also bumps the version
+    etag = make_etag("state-at", company_id, version, at)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    agents, last_position = await state_replay.state_at(session, company_id, at)
+
     role_configs_map = {}
+    for role in {a.role for a in agents}:
+        role_configs_map[role] = await role_registry.resolve(session, role)
 
-    for role in unique_roles:
-        role_config = await get_or_create_role_config(role, session)
-        role_configs_map[role] = RoleConfigResponse(
-            role_id=role_config.role_id,
-            display_name=role_config.display_name,
-            color=role_config.color,
-            zone_color=role_config.zone_color,
-            is_default=role_config.is_default,
-        )
+    return CompanyStateResponse(
+        company_id=company_id,
+        agents=[a.to_state(role_configs_map.get(a.role)) for a in agents],
+        pending_movements=[],
+        role_configs=role_configs_map,
+        last_updated=last_position[0] if last_position else at,
+    )
 
-    # Build agent states with role configs
-    agent_states = [
-        {
-            "agent_id": a.agent_id,
-            "role": a.role,
-            "name": a.name,
-            "status": a.status,
-            "position": {
-                "zone": a.position_zone,
-                "x": a.position_x,
-                "y": a.position_y,
-            },
-            "current_task": a.current_task,
-            "role_config": role_configs_map.get(a.role),
-        }
-        for a in agents
-    ]
 
-    # Get pending movements (progress < 1.0)
+async def _load_state_delta(
+    session: AsyncSession,
+    company_id: UUID,
+    since: int,
+    version: int,
+) -> tuple[list[AgentView], list[MovementView], list[str], list[str]]:
+    """
+    Read changes in (since, version] from the database.
+
+    Returns changed agents, changed pending movements, and removed agent and
+    movement ids (movements completed in the range count as removed).
+    """
+    agent_result = await session.execute(
+        select(Agent).where(
+            Agent.company_id == company_id,
+            Agent.version > since,
+            Agent.version <= version,
+        )
+    )
+    agents = [AgentView.from_row(a) for a in agent_result.scalars().all()]
+
     movement_result = await session.execute(
         select(Movement).where(
             Movement.company_id == company_id,
-            Movement.progress < 1.0,
+            Movement.version > since,
+            Movement.version <= version,
+        )
+    )
+    movements = [MovementView.from_row(m) for m in movement_result.scalars().all()]
+
+    removed_agent_ids: list[str] = []
+    removed_movement_ids = [m.id for m in movements if m.progress >= 1.0]
+    tombstone_result = await session.execute(
+        select(StateTombstone.kind, StateTombstone.key).where(
+            StateTombstone.company_id == company_id,
+            StateTombstone.version > since,
+            StateTombstone.version <= version,
         )
     )
-    movements = movement_result.scalars().all()
+    present_agent_ids = {a.agent_id for a in agents}
+    for kind, key in tombstone_result.all():
+        if kind == "agent" and key not in present_agent_ids:
+            removed_agent_ids.append(key)
+        elif kind == "movement":
+            removed_movement_ids.append(key)
 
-    pending_movements = [
-        {
-            "id": str(m.id),
-            "agent_id": m.agent_id,
-            "from_zone": m.from_zone,
-            "to_zone": m.to_zone,
-            "purpose": m.purpose,
-            "artifact": m.artifact,
-            "progress": m.progress,
-        }
-        for m in movements
-    ]
+    pending = [m for m in movements if m.progress < 1.0]
+    return agents, pending, removed_agent_ids, removed_movement_ids
 
-    return CompanyStateResponse(
-        company_id=company_id,
-        agents=agent_states,
-        pending_movements=pending_movements,
-        role_configs=role_configs_map,
-        last_updated=company.updated_at,
+
+@router.get("/{company_id}/stream")
+async def stream_company_changes(
+    company_id: UUID,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Server-Sent Events stream of committed changes for a company.
+
+    Event types: agent_status, agent_added, agent_removed, movement_created,
+    movement_progress, movement_completed, and resync (client fell behind and
+    should refetch /state). Clients should load /state after "ready".
+    """
+    if not await company_directory.get(session, company_id):
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    async def event_stream():
+        queue = company_broadcaster.subscribe(company_id)
+        try:
+            yield format_sse("ready", {"company_id": str(company_id)})
+            while not await request.is_disconnected():
+                try:
+                    change_type, data = await asyncio.wait_for(
+                        queue.get(), timeout=settings.stream_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield SSE_KEEPALIVE
+                    continue
+                yield format_sse(change_type, data)
+        finally:
+            company_broadcaster.unsubscribe(company_id, queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/{company_id}/playback")
+async def play_company_events(
+    company_id: UUID,
+    from_time: datetime = Query(..., alias="from"),
+    to_time: datetime = Query(..., alias="to"),
+    speed: float = Query(1.0, ge=MIN_PLAYBACK_SPEED, le=MAX_PLAYBACK_SPEED),
+    max_gap: float = Query(10.0, gt=0, le=3600),
+    session: AsyncSession = Depends(get_session),
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    """
+    Server-Sent Events replay of a company's recorded events in [from, to).
+
+    Events are sent with their original spacing divided by `speed`, with gaps
+    capped at `max_gap` seconds. Event types: playback (id for the control
+    endpoint), state (agents at the start or seek point), event (one recorded
+    event with the agents it changed), and end. A playback paused for longer
+    than PLAYBACK_MAX_PAUSE_SECONDS ends.
+    """
+    company_result = await session.execute(
+        select(Company.retention_days).where(Company.id == company_id)
     )
+    company_row = company_result.first()
+    if not company_row:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    start = _naive_utc(from_time)
+    end = _naive_utc(to_time)
+    horizon = event_read_horizon(company_row.retention_days)
+    if horizon and start < horizon:
+        start = horizon
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+
+    async def playback_stream():
+        # Registered only once the body is iterated, so an unsent response can't leak it
+        control = playbacks.open(company_id, start, end, speed)
+        try:
+            async for message in play_events(
+                session_factory,
+                control,
+                max_gap,
+                settings.stream_keepalive_seconds,
+                settings.playback_max_pause_seconds,
+            ):
+                yield message
+        finally:
+            playbacks.close(control.id)
+
+    return StreamingResponse(playback_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/{company_id}/playback/{playback_id}")
+async def control_company_playback(
+    company_id: UUID,
+    playback_id: UUID,
+    body: PlaybackControlRequest,
+):
+    """Pause, resume, change the speed of, or seek an open playback stream."""
+    control = playbacks.get(playback_id)
+    if control is None or control.company_id != company_id:
+        raise HTTPException(status_code=404, detail="Playback not found")
+
+    seek_to = _naive_utc(body.seek_to) if body.seek_to else None
+    if seek_to is not None and not control.start <= seek_to < control.end:
+        raise HTTPException(status_code=400, detail="seek_to must be within the playback range")
+
+    control.update(body.paused, body.speed, seek_to)
+    return control.to_dict()
 
 
 @router.delete("/{company_id}/agents/{agent_id}")
@@ -434,77 +818,454 @@ async def delete_agent(
     session: AsyncSession = Depends(get_session),
 ):
     """Remove an agent from a company with cascading cleanup."""
-    # Verify company exists
-    result = await session.execute(select(Company).where(Company.id == company_id))
-    company = result.scalars().first()
+    # Verify company and agent exist
+    entry = await company_directory.get(session, company_id)
 
-    if not company:
+    if not entry:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    # Find the agent
-    result = await session.execute(
-        select(Agent).where(
+    if agent_id not in entry.agents:
+        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+
+    # Delete the agent first: its row lock makes a concurrent delete wait, then find nothing
+    agent_result = await session.execute(
+        Agent.__table__.delete().where(
             Agent.company_id == company_id, Agent.agent_id == agent_id
         )
     )
-    agent = result.scalars().first()
-
-    if not agent:
+    if agent_result.rowcount == 0:
+        # The directory entry was stale, or another request deleted the agent
+        await session.rollback()
+        company_directory.invalidate(company_id)
         raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
 
+    # Cascade delete: Remove events where agent is from_agent or to_agent
+    # Note: We keep events for audit trail but clear the agent references
+    # Or delete if you prefer complete cleanup:
+    event_result = await session.execute(
+        Event.__table__.delete().where(
+            Event.company_id == company_id,
+            (Event.from_agent_id == agent_id) | (Event.to_agent_id == agent_id),
+        )
+    )
+    # ...and from archived segments, which would otherwise merge them back into reads
+    archived_removed, replaced_segments = await remove_agent_from_segments(
+        session, company_id, agent_id
+    )
+    version = await bump_company_version(
+        session, company_id, agents=-1, events=-(event_result.rowcount + archived_removed)
+    )
+
     # Cascade delete: Remove related movements
-    await session.execute(
-        Movement.__table__.delete().where(
+    result = await session.execute(
+        Movement.__table__.delete()
+        .where(
             Movement.company_id == company_id,
             Movement.agent_id == agent_id,
         )
+        .returning(Movement.id)
     )
+    movement_ids = [str(movement_id) for movement_id in result.scalars()]
 
-    # Cascade delete: Remove events where agent is from_agent or to_agent
-    # Note: We keep events for audit trail but clear the agent references
-    # Or delete if you prefer complete cleanup:
+    # Snapshots replayed those events; history now differs
     await session.execute(
-        Event.__table__.delete().where(
-            Event.company_id == company_id,
-            (Event.from_agent_id == agent_id) | (Event.to_agent_id == agent_id),
+        StateSnapshot.__table__.delete().where(StateSnapshot.company_id == company_id)
+    )
+
+    # The agent's own rollups; other agents keep the activity they had with it
+    for rollup in (AgentStatusRollup, AgentActivityRollup):
+        await session.execute(
+            rollup.__table__.delete().where(
+                rollup.company_id == company_id, rollup.agent_id == agent_id
+            )
+        )
+    # Its handoff graph edges go with it: the graph no longer has a node for it
+    await session.execute(
+        HandoffEdge.__table__.delete().where(
+            HandoffEdge.company_id == company_id,
+            (HandoffEdge.from_agent_id == agent_id) | (HandoffEdge.to_agent_id == agent_id),
         )
     )
 
-    # Delete the agent
-    await session.delete(agent)
+    await record_removals(session, company_id, "agent", [agent_id], version)
+    await record_removals(session, company_id, "movement", movement_ids, version)
+    record_change(session, company_id, "agent_removed", {"agent_id": agent_id})
     await session.commit()
+    company_directory.invalidate(company_id)
+    await remove_segment_files(replaced_segments)
 
     return {"agent_id": agent_id, "status": "removed"}
 
 
+@router.get("/{company_id}/analytics", response_model=CompanyAnalyticsResponse)
+async def get_company_analytics(
+    company_id: UUID,
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    agent_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Time in each status, events per hour and handoff counts per agent.
+
+    Read from the hourly rollups maintained as events are ingested, never
+    from the events table. The range is widened to whole hours and defaults
+    to the last 24.
+    """
+    if not await company_directory.get(session, company_id):
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    now = _utc_now()
+    end = _naive_utc(to_time) if to_time else now
+    if rollup_bucket(end) < end:
+        end = rollup_bucket(end) + ROLLUP_BUCKET
+    start = rollup_bucket(_naive_utc(from_time)) if from_time else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+
+    agent_filters = [Agent.company_id == company_id]
+    if agent_id:
+        agent_filters.append(Agent.agent_id == agent_id)
+    agent_result = await session.execute(
+        select(Agent.agent_id, Agent.name, Agent.role, Agent.status, Agent.status_changed_at)
+        .where(*agent_filters)
+        .order_by(Agent.agent_id)
+    )
+    agents = agent_result.all()
+    buckets: dict[str, dict[datetime, AgentAnalyticsBucket]] = {a.agent_id: {} for a in agents}
+
+    def agent_bucket(row_agent_id: str, bucket: datetime) -> AgentAnalyticsBucket | None:
+        if row_agent_id not in buckets:
+            return None
+        return buckets[row_agent_id].setdefault(bucket, AgentAnalyticsBucket(bucket=bucket))
+
+    def rollup_filters(rollup) -> list:
+        filters = [rollup.company_id == company_id, rollup.bucket >= start, rollup.bucket < end]
+        if agent_id:
+            filters.append(rollup.agent_id == agent_id)
+        return filters
+
+    activity_result = await session.execute(
+        select(AgentActivityRollup).where(*rollup_filters(AgentActivityRollup))
+    )
+    for row in activity_result.scalars():
+        entry = agent_bucket(row.agent_id, row.bucket)
+        if entry is not None:
+            entry.events += row.events
+            entry.handoffs_sent += row.handoffs_sent
+            entry.handoffs_received += row.handoffs_received
+
+    status_result = await session.execute(
+        select(AgentStatusRollup).where(*rollup_filters(AgentStatusRollup))
+    )
+    for row in status_result.scalars():
+        entry = agent_bucket(row.agent_id, row.bucket)
+        if entry is not None:
+            entry.status_seconds[row.status] = entry.status_seconds.get(row.status, 0.0) + row.seconds
+
+    # The current status is only rolled up when it ends; count it up to now
+    for agent in agents:
+        for bucket, seconds in split_by_bucket(max(agent.status_changed_at, start), min(now, end)):
+            entry = agent_bucket(agent.agent_id, bucket)
+            entry.status_seconds[agent.status] = entry.status_seconds.get(agent.status, 0.0) + seconds
+
+    hours = (end - start) / timedelta(hours=1)
+    results = []
+    for agent in agents:
+        agent_buckets = sorted(buckets[agent.agent_id].values(), key=lambda b: b.bucket)
+        status_seconds: dict[str, float] = {}
+        for entry in agent_buckets:
+            for status, seconds in entry.status_seconds.items():
+                status_seconds[status] = status_seconds.get(status, 0.0) + seconds
+        events = sum(b.events for b in agent_buckets)
+        results.append(
+            AgentAnalytics(
+                agent_id=agent.agent_id,
+                name=agent.name,
+                role=agent.role,
+                events=events,
+                events_per_hour=round(events / hours, 3),
+                handoffs_sent=sum(b.handoffs_sent for b in agent_buckets),
+                handoffs_received=sum(b.handoffs_received for b in agent_buckets),
+                status_seconds=status_seconds,
+                buckets=agent_buckets,
+            )
+        )
+
+    return CompanyAnalyticsResponse(company_id=company_id, start=start, end=end, agents=results)
+
+
+@router.get("/{company_id}/handoff-graph", response_model=HandoffGraphResponse)
+async def get_handoff_graph(
+    company_id: UUID,
+    window: str = "7d",
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Who hands work to whom: weighted edges between agents for handoff events
+    (WORK_REQUEST, REVIEW_REQUEST, FEEDBACK, ...), with the artifacts passed.
+
+    Read from the hourly handoff_edges counters maintained at ingestion, so
+    the cost depends on the number of edges and hours, not events. `window`
+    is "all" or a number of hours or days ("24h", "7d"), widened to whole hours.
+    """
+    entry = await company_directory.get(session, company_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    since = None
+    if window != "all":
+        match = _GRAPH_WINDOW.match(window)
+        if not match or int(match[1]) == 0:
+            raise HTTPException(status_code=400, detail='window must be "all" or like "24h" or "7d"')
+        duration = timedelta(**{_GRAPH_WINDOW_UNITS[match[2]]: int(match[1])})
+        since = rollup_bucket(_utc_now() - duration)
+
+    query = (
+        select(
+            HandoffEdge.from_agent_id,
+            HandoffEdge.to_agent_id,
+            HandoffEdge.event_type,
+            HandoffEdge.artifact,
+            func.sum(HandoffEdge.count).label("count"),
+            func.max(HandoffEdge.last_at).label("last_at"),
+        )
+        .where(HandoffEdge.company_id == company_id)
+        .group_by(
+            HandoffEdge.from_agent_id,
+            HandoffEdge.to_agent_id,
+            HandoffEdge.event_type,
+            HandoffEdge.artifact,
+        )
+    )
+    if since is not None:
+        query = query.where(HandoffEdge.bucket >= since)
+    result = await session.execute(query)
+
+    nodes = {
+        agent_id: HandoffGraphNode(agent_id=agent_id, role=agent.role)
+        for agent_id, agent in entry.agents.items()
+    }
+    edges: dict[tuple[str, str], HandoffGraphEdge] = {}
+    artifacts: dict[tuple[str, str], dict[str, int]] = {}
+    for row in result.all():
+        key = (row.from_agent_id, row.to_agent_id)
+        edge = edges.get(key)
+        if edge is None:
+            edge = edges[key] = HandoffGraphEdge(
+                from_agent=row.from_agent_id,
+                to_agent=row.to_agent_id,
+                count=0,
+                event_types={},
+                last_at=row.last_at,
+            )
+        edge.count += row.count
+        edge.event_types[row.event_type] = edge.event_types.get(row.event_type, 0) + row.count
+        edge.last_at = max(edge.last_at, row.last_at)
+        if row.artifact:
+            edge_artifacts = artifacts.setdefault(key, {})
+            edge_artifacts[row.artifact] = edge_artifacts.get(row.artifact, 0) + row.count
+        if row.from_agent_id in nodes:
+            nodes[row.from_agent_id].sent += row.count
+        if row.to_agent_id in nodes:
+            nodes[row.to_agent_id].received += row.count
+
+    for key, edge_artifacts in artifacts.items():
+        top = sorted(edge_artifacts.items(), key=lambda item: (-item[1], item[0]))[:_GRAPH_EDGE_ARTIFACTS]
+        edges[key].artifacts = [HandoffArtifact(artifact=name, count=count) for name, count in top]
+
+    return HandoffGraphResponse(
+        company_id=company_id,
+        window=window,
+        since=since,
+        nodes=sorted(nodes.values(), key=lambda n: n.agent_id),
+        edges=sorted(edges.values(), key=lambda e: (-e.count, e.from_agent, e.to_agent)),
+    )
+
+
+@router.get("/{company_id}/timeline", response_model=TimelineResponse)
+async def get_company_timeline(
+    company_id: UUID,
+    bucket: str = "1m",
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    group_by: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Event counts per time bucket, optionally per event type or (sending) agent.
+
+    `bucket` is a width like "30s", "1m", "1h" or "1d"; the range is widened
+    to whole buckets and defaults to the last 60. Closed buckets are cached,
+    so only the open tail of the range is counted again.
+    """
+    width = parse_bucket_width(bucket)
+    if width is None:
+        raise HTTPException(status_code=400, detail='bucket must be like "30s", "1m", "1h" or "1d"')
+    if group_by is not None and group_by not in TIMELINE_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {list(TIMELINE_GROUPS)}")
+
+    company_result = await session.execute(
+        select(Company.retention_days).where(Company.id == company_id)
+    )
+    company_row = company_result.first()
+    if not company_row:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    now = _utc_now()
+    end = bucket_ceil(_naive_utc(to_time) if to_time else now, width)
+    start = bucket_start(_naive_utc(from_time), width) if from_time else end - 60 * width
+    horizon = event_read_horizon(company_row.retention_days)
+    if horizon and start < horizon:
+        start = bucket_ceil(horizon, width)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+    if (end - start) / width > settings.timeline_max_buckets:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range holds more than {settings.timeline_max_buckets} buckets; use a wider bucket",
+        )
+
+    counts = await timeline_cache.counts(session, company_id, width, group_by, start, end, now)
+
+    buckets = []
+    current = start
+    while current < end:
+        bucket_counts = counts.get(current, {})
+        buckets.append(
+            TimelineBucket(
+                start=current,
+                total=sum(bucket_counts.values()),
+                counts=bucket_counts if group_by else {},
+            )
+        )
+        current += width
+
+    return TimelineResponse(
+        company_id=company_id,
+        bucket=bucket,
+        group_by=group_by,
+        start=start,
+        end=end,
+        buckets=buckets,
+    )
+
+
 @router.get("/{company_id}/logs")
 async def get_company_logs(
     company_id: UUID,
+    request: Request,
+    response: Response,
     agent_id: Optional[str] = None,
     event_type: Optional[str] = None,
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+    payload_contains: Optional[str] = None,
+    q: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
 ):
-    """Get activity logs for a company."""
-    query = select(Event).where(Event.company_id == company_id)
-
-    if agent_id:
-        query = query.where(
-            (Event.from_agent_id == agent_id) | (Event.to_agent_id == agent_id)
+    """
+    Get activity logs for a company, newest first.
+
+    `from`/`to` limit logs to timestamps in [from, to); naive times are UTC.
+    Events older than the global or company retention window are not shown.
+    Events moved to cold storage (see services.archive) are read from their
+    segment files and continue the newest-first order seamlessly.
+
+    Payload filters: `payload_contains=<JSON object>` and/or
+    `payload.<key>=<value>` (string values; dotted keys reach nested objects),
+    matched with JSONB containment so they use the payload GIN index.
+
+    `q` is a full-text search (web search syntax: quoted phrases, OR, -word)
+    over payload task, thought, message and artifact. Matches are ordered by
+    relevance and carry `rank` and a `headline` with <mark>ed terms; search
+    results page by `offset` only and don't include archived events.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the following page;
+    `offset` is kept for older clients and ignored when a cursor is given.
+    `count` selects how `total` is computed: "exact", "estimate" (the
+    company's event counter when nothing is filtered, otherwise a planner
+    estimate for large results, flagged by `total_estimated`) or "none"
+    (`total` is null).
+    """
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {list(COUNT_MODES)}")
+
+    position = None
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if q:
+            raise HTTPException(status_code=400, detail="cursor can't be combined with q; use offset")
+
+    payload_filter = _payload_filter(payload_contains, request)
+
+    # Event writes and deletions bump the company version
+    company_result = await session.execute(
+        select(Company.version, Company.retention_days, Company.event_count).where(Company.id == company_id)
+    )
+    company_row = company_result.first()
+    version, retention_days, event_count = company_row if company_row else (None, None, 0)
+    horizon = event_read_horizon(retention_days)
+    # With no filter or read horizon, the company's maintained event_count
+    # (archived events included) is the total; no EXPLAIN needed
+    count_from_company = count == "estimate" and horizon is None and not (
+        agent_id or event_type or from_time or to_time or payload_filter or q
+    )
+    if version is not None:
+        etag = make_etag(
+            "logs",
+            company_id,
+            version,
+            horizon,
+            agent_id,
+            event_type,
+            from_time,
+            to_time,
+            json.dumps(payload_filter, sort_keys=True),
+            q,
+            limit,
+            offset,
+            cursor,
+            count,
         )
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
 
-    if event_type:
-        query = query.where(Event.event_type == event_type)
+    query = select(Event).where(
+        *_log_filters(company_id, agent_id, event_type, from_time, to_time, payload_filter, horizon)
+    )
 
-    query = query.order_by(Event.timestamp.desc()).offset(offset).limit(limit + 1)
+    if q:
+        search = func.websearch_to_tsquery(_SEARCH_CONFIG, q)
+        query = query.where(event_search_vector.op("@@")(search))
+    filtered = query
+
+    if q:
+        # Most relevant first; ts_headline runs only for the rows on this page
+        rank = func.ts_rank_cd(event_search_vector, search)
+        document = func.concat_ws(" ... ", *(Event.payload[key].astext for key in SEARCH_FIELDS))
+        headline = func.ts_headline(_SEARCH_CONFIG, document, search, _HEADLINE_OPTIONS)
+        query = query.add_columns(rank.label("rank"), headline.label("headline"))
+        query = query.order_by(rank.desc(), Event.timestamp.desc(), Event.id.desc()).offset(offset)
+    elif position is not None:
+        # Keyset pagination over (timestamp, id), served by ix_events_company_timestamp_id
+        query = query.where(tuple_(Event.timestamp, Event.id) < tuple_(*position))
+        query = query.order_by(Event.timestamp.desc(), Event.id.desc())
+    else:
+        query = query.order_by(Event.timestamp.desc(), Event.id.desc()).offset(offset)
+    query = query.limit(limit + 1)
 
     result = await session.execute(query)
-    events = result.scalars().all()
-
-    has_more = len(events) > limit
-    if has_more:
-        events = events[:limit]
+    rows = result.all()
+    events = [row[0] for row in rows]
 
     logs = [
         {
@@ -518,26 +1279,204 @@ async def get_company_logs(
         }
         for e in events
     ]
-
-    # Count total
-    count_query = select(Event).where(Event.company_id == company_id)
-    if agent_id:
-        count_query = count_query.where(
-            (Event.from_agent_id == agent_id) | (Event.to_agent_id == agent_id)
+    positions = [(e.timestamp, e.id) for e in events]
+    if q:
+        for log, row in zip(logs, rows):
+            log["rank"] = round(row.rank, 6)
+            log["headline"] = row.headline
+
+    # Archived events are older than any in Postgres; search covers Postgres only
+    segments = []
+    if not q and (len(events) <= limit or (count != "none" and not count_from_company)):
+        archive_filter = ArchiveFilter(
+            agent_id=agent_id,
+            event_type=event_type,
+            from_time=_naive_utc(from_time) if from_time else None,
+            to_time=_naive_utc(to_time) if to_time else None,
+            horizon=horizon,
+            payload=payload_filter or None,
         )
-    if event_type:
-        count_query = count_query.where(Event.event_type == event_type)
+        segments = await find_segments(session, company_id, archive_filter)
+
+    if segments and len(events) <= limit:
+        # The page runs past the oldest event in Postgres: continue into the archive
+        skip = 0
+        if position is None and not events and offset:
+            skip = max(0, offset - await count_rows(session, filtered))
+        archived = await read_archived_page(
+            segments, archive_filter, skip, limit + 1 - len(events), before=position
+        )
+        logs.extend(
+            {**record, "id": str(record["id"]), "timestamp": record["timestamp"].isoformat()}
+            for record in archived
+        )
+        positions.extend((record["timestamp"], record["id"]) for record in archived)
 
-    count_result = await session.execute(count_query)
-    total = len(count_result.scalars().all())
+    has_more = len(logs) > limit
+    if has_more:
+        logs = logs[:limit]
+
+    # Count total (over all pages, ignoring cursor/offset)
+    total = None
+    total_estimated = False
+    if count_from_company:
+        total = event_count
+    elif count == "exact":
+        total = await count_rows(session, filtered)
+    elif count == "estimate":
+        total, total_estimated = await estimate_rows(session, filtered)
+    if segments and total is not None and not count_from_company:
+        archived_total, archived_estimated = await count_archived_events(
+            segments, archive_filter, exact=count == "exact"
+        )
+        total += archived_total
+        total_estimated = total_estimated or archived_estimated
 
     return {
         "logs": logs,
         "total": total,
+        "total_estimated": total_estimated,
         "has_more": has_more,
+        "next_cursor": (
+            encode_cursor(*positions[limit - 1]) if has_more and not q else None
+        ),
     }
 
 
+@router.get("/{company_id}/logs/export")
+async def export_company_logs(
+    company_id: UUID,
+    agent_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    export_format: str = Query("ndjson", alias="format"),
+    compress: bool = Query(False, alias="gzip"),
+    session: AsyncSession = Depends(get_session),
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    """
+    Stream every matching log, oldest first, as NDJSON or CSV (optionally gzipped).
+
+    Rows are read through a server-side cursor in batches, so memory use does
+    not grow with the number of events. Archived events are streamed first,
+    one segment file at a time. Filters match /logs.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+
+    company_result = await session.execute(
+        select(Company.retention_days).where(Company.id == company_id)
+    )
+    company_row = company_result.first()
+    if not company_row:
+        raise HTTPException(status_code=404, detail="Company not found")
+    horizon = event_read_horizon(company_row.retention_days)
+
+    query = (
+        select(*EVENT_RECORD_COLUMNS)
+        .where(*_log_filters(company_id, agent_id, event_type, from_time, to_time, horizon=horizon))
+        .order_by(Event.timestamp, Event.id)
+        .execution_options(yield_per=_EXPORT_BATCH_SIZE)
+    )
+    columns = [column.key for column in EVENT_RECORD_COLUMNS]
+    archive_filter = ArchiveFilter(
+        agent_id=agent_id,
+        event_type=event_type,
+        from_time=_naive_utc(from_time) if from_time else None,
+        to_time=_naive_utc(to_time) if to_time else None,
+        horizon=horizon,
+    )
+    segments = await find_segments(session, company_id, archive_filter)
+
+    async def record_batches():
+        # Archived events first: they are older than any still in Postgres
+        async for records in archived_batches(segments, archive_filter):
+            yield records
+        # The request-scoped session is closed before the body is sent
+        async with session_factory() as export_session:
+            result = await export_session.stream(query)
+            async for partition in result.mappings().partitions():
+                yield partition
+
+    async def export_stream():
+        header = True
+        async for batch in record_batches():
+            if export_format == "csv":
+                yield csv_chunk(batch, columns, header=header)
+                header = False
+            else:
+                yield ndjson_chunk(batch)
+        if header and export_format == "csv":
+            yield csv_chunk([], columns, header=True)
+
+    body = gzip_stream(export_stream()) if compress else export_stream()
+    filename = f"company-{company_id}-logs.{export_format}" + (".gz" if compress else "")
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if compress else EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _log_filters(
+    company_id: UUID,
+    agent_id: Optional[str],
+    event_type: Optional[str],
+    from_time: Optional[datetime],
+    to_time: Optional[datetime],
+    payload_filter: Optional[dict] = None,
+    horizon: Optional[datetime] = None,
+) -> list:
+    """WHERE clauses shared by /logs and /logs/export."""
+    filters = [Event.company_id == company_id]
+    if horizon:
+        # Retention read horizon; also lets the planner prune expired partitions
+        filters.append(Event.timestamp >= horizon)
+    if agent_id:
+        filters.append((Event.from_agent_id == agent_id) | (Event.to_agent_id == agent_id))
+    if event_type:
+        filters.append(Event.event_type == event_type)
+    if from_time:
+        filters.append(Event.timestamp >= _naive_utc(from_time))
+    if to_time:
+        filters.append(Event.timestamp < _naive_utc(to_time))
+    if payload_filter:
+        filters.append(Event.payload.contains(payload_filter))
+    return filters
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert to naive UTC (for TIMESTAMP WITHOUT TIME ZONE comparisons)."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _payload_filter(payload_contains: Optional[str], request: Request) -> dict:
+    """Merge `payload_contains` and `payload.<key>` query parameters into one containment object."""
+    payload_filter: dict = {}
+    if payload_contains is not None:
+        try:
+            payload_filter = json.loads(payload_contains)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="payload_contains must be a JSON object")
+        if not isinstance(payload_filter, dict):
+            raise HTTPException(status_code=400, detail="payload_contains must be a JSON object")
+
+    for param, value in request.query_params.items():
+        if not param.startswith("payload."):
+            continue
+        *parents, key = param.split(".")[1:]
+        target = payload_filter
+        for parent in parents:
+            target = target.setdefault(parent, {})
+            if not isinstance(target, dict):
+                raise HTTPException(status_code=400, detail=f"Conflicting payload filter '{param}'")
+        target[key] = value
+    return payload_filter
+
+
 @router.patch("/{company_id}/movements/{movement_id}")
 async def update_movement_progress(
     company_id: UUID,
@@ -563,6 +1502,13 @@ async def update_movement_progress(
         raise HTTPException(status_code=400, detail="Progress must be between 0.0 and 1.0")
 
     movement.progress = progress
+    movement.version = await bump_company_version(session, company_id)
+    record_change(
+        session,
+        company_id,
+        "movement_progress",
+        {"movement_id": str(movement_id), "progress": progress},
+    )
     await session.commit()
 
     return {"movement_id": str(movement_id), "progress": progress}
@@ -586,6 +1532,8 @@ async def complete_movement(
     if not movement:
         raise HTTPException(status_code=404, detail="Movement not found")
 
+    version = await bump_company_version(session, company_id)
+
     # Update agent position to destination zone
     result = await session.execute(
         select(Agent).where(
@@ -597,13 +1545,29 @@ async def complete_movement(
 
     if agent:
         agent.position_zone = movement.to_zone
+        agent.version = version
         # If returning, set status back to idle
-        if movement.purpose == "return":
+        if movement.purpose == "return" and agent.status != "idle":
+            record_status_change(session, company_id, agent, agent.status, _utc_now())
             agent.status = "idle"
 
     # Mark movement as complete
     movement.progress = 1.0
+    movement.version = version
+    record_change(
+        session,
+        company_id,
+        "movement_completed",
+        {
+            "movement_id": str(movement_id),
+            "agent_id": movement.agent_id,
+            "zone": movement.to_zone,
+            "status": agent.status if agent else None,
+        },
+    )
+    await flush_rollups(session)
     await session.commit()
+    company_directory.set_agent_zone(company_id, movement.agent_id, movement.to_zone)
 
     return {"movement_id": str(movement_id), "status": "completed"}
 
@@ -615,24 +1579,26 @@ async def cleanup_completed_movements(
 ):
     """Delete all completed movements (progress >= 1.0) for a company."""
     # Verify company exists
-    result = await session.execute(select(Company).where(Company.id == company_id))
-    company = result.scalars().first()
-
-    if not company:
+    if not await company_directory.get(session, company_id):
         raise HTTPException(status_code=404, detail="Company not found")
 
     # Delete completed movements
     result = await session.execute(
-        select(Movement).where(
+        Movement.__table__.delete()
+        .where(
             Movement.company_id == company_id,
             Movement.progress >= 1.0,
         )
+        .returning(Movement.id)
     )
-    completed = result.scalars().all()
-    deleted_count = len(completed)
-
-    for movement in completed:
-        await session.delete(movement)
+    deleted_ids = [str(movement_id) for movement_id in result.scalars()]
+    deleted_count = len(deleted_ids)
+
+    if deleted_ids:
+        version = await bump_company_version(session, company_id)
+        await record_removals(session, company_id, "movement", deleted_ids, version)
+    # Piggyback tombstone pruning on the dashboard's periodic cleanup call
+    await prune_tombstones(session, company_id, settings.state_tombstone_retention_seconds)
 
     await session.commit()
 
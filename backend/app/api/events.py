@@ -1,84 +1,114 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.config import settings
 from app.database import get_session
-from app.models import Agent, Company, Event, Movement
-from app.schemas.event import EventCreate, EventResponse
+from app.models import Agent
+from app.schemas.event import (
+    EventBatchCreate,
+    EventBatchResponse,
+    EventCreate,
+    EventResponse,
+)
+from app.services.analytics import flush_rollups
+from app.services.directory import company_directory
+from app.services.ingestion import (
+    column_limit_error,
+    ingest_events,
+    ingestion_queue,
+    stage_event,
+)
+from app.services.versioning import bump_company_version
 
 router = APIRouter()
 
 
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 @router.post("", response_model=EventResponse)
 async def create_event(
     event_in: EventCreate,
+    response: Response,
     session: AsyncSession = Depends(get_session),
 ):
     """
     Receive a business event from Dev App.
     Server infers visual actions based on event type.
-    """
-    # Verify company exists
-    result = await session.execute(
-        select(Company).where(Company.id == event_in.company_id)
-    )
-    company = result.scalars().first()
 
-    if not company:
+    In "queued" ingest mode the event is validated, buffered for the
+    background flusher and acknowledged with 202 before it is written.
+    """
+    error = column_limit_error(event_in)
+    if error:
+        raise HTTPException(status_code=422, detail=error)
+
+    # Verify company and agents exist (served from the directory cache when warm)
+    entry = await company_directory.get(session, event_in.company_id)
+    referenced = [event_in.agent_id] + ([event_in.to_agent] if event_in.to_agent else [])
+    if entry and any(agent_id not in entry.agents for agent_id in referenced):
+        # The entry may predate an agent created by another worker: reload it once
+        company_directory.invalidate(event_in.company_id)
+        entry = await company_directory.get(session, event_in.company_id)
+
+    if not entry:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    # Verify agent exists and get their zone
+    if event_in.agent_id not in entry.agents:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent '{event_in.agent_id}' not found in company",
+        )
+
+    if event_in.to_agent and event_in.to_agent not in entry.agents:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Target agent '{event_in.to_agent}' not found in company",
+        )
+
+    if settings.event_ingest_mode == "queued":
+        queued = ingestion_queue.enqueue(event_in)
+        if not queued:
+            raise HTTPException(status_code=503, detail="Ingestion queue full, retry later")
+
+        response.status_code = 202
+        return EventResponse(
+            event_id=queued.event_id,
+            timestamp=queued.timestamp,
+            status="queued",
+        )
+
+    # Load both agents in one query for state updates and zone lookup
+    agent_ids = {event_in.agent_id} | ({event_in.to_agent} if event_in.to_agent else set())
     result = await session.execute(
         select(Agent).where(
             Agent.company_id == event_in.company_id,
-            Agent.agent_id == event_in.agent_id,
+            Agent.agent_id.in_(agent_ids),
         )
     )
-    agent = result.scalars().first()
+    agents = {a.agent_id: a for a in result.scalars().all()}
 
-    if not agent:
+    if len(agents) != len(agent_ids):
+        # Directory entry is stale (agent removed by another worker)
+        company_directory.invalidate(event_in.company_id)
+        missing = sorted(agent_ids - agents.keys())[0]
         raise HTTPException(
             status_code=404,
-            detail=f"Agent '{event_in.agent_id}' not found in company",
+            detail=f"Agent '{missing}' not found in company",
         )
 
-    # Verify to_agent exists if specified and get their zone
-    to_agent_obj = None
-    if event_in.to_agent:
-        result = await session.execute(
-            select(Agent).where(
-                Agent.company_id == event_in.company_id,
-                Agent.agent_id == event_in.to_agent,
-            )
-        )
-        to_agent_obj = result.scalars().first()
-
-        if not to_agent_obj:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Target agent '{event_in.to_agent}' not found in company",
-            )
-
-    # Infer visual actions based on event type
-    inferred_actions = infer_actions(event_in)
-
-    # Create event record
-    event = Event(
-        company_id=event_in.company_id,
-        from_agent_id=event_in.agent_id,
-        to_agent_id=event_in.to_agent,
-        event_type=event_in.event_type.upper(),
-        payload=event_in.payload,
-        inferred_actions=inferred_actions,
-    )
-    session.add(event)
-
-    # Update agent states and create movements
-    await update_agent_states(session, event_in, inferred_actions)
-    await create_movements(session, event_in, agent, to_agent_obj, inferred_actions)
+    # Infer visual actions, record the event and apply it to the loaded agents
+    timestamp = _utc_now()
+    version = await bump_company_version(session, event_in.company_id, events=1, last_activity=timestamp)
+    event = stage_event(session, event_in, agents, version, timestamp=timestamp)
+    await flush_rollups(session)
 
     await session.commit()
-    await session.refresh(event)
 
     return EventResponse(
         event_id=event.id,
@@ -87,142 +117,22 @@ async def create_event(
     )
 
 
-def infer_actions(event: EventCreate) -> list[str]:
-    """
-    Infer visual actions from business event type.
-    Accepts any event_type string — known types get specific handling,
-    unknown types fall through to payload-driven state.
-    """
-    event_type = event.event_type.upper()  # Normalize
-    agent_id = event.agent_id
-    to_agent = event.to_agent
-
-    # Communication/work events — involve movement
-    if event_type in ("WORK_REQUEST", "WORK_COMPLETE", "REVIEW_REQUEST", "FEEDBACK", "MESSAGE_SEND"):
-        if to_agent:
-            return [
-                f"{agent_id}:walk_to:{to_agent}",
-                f"{agent_id}:handoff:{to_agent}",
-                f"{agent_id}:return",
-                f"{to_agent}:status:working",
-            ]
-        return [f"{agent_id}:status:working"]
-
-    # Known state events — direct status mapping
-    STATE_MAP = {
-        "THINKING": "thinking", "WORKING": "working", "EXECUTING": "executing",
-        "IDLE": "idle", "ERROR": "error",
-        "CODING": "coding", "DISCUSSING": "discussing", "REVIEWING": "reviewing", "BREAK": "break",
-    }
-    if event_type in STATE_MAP:
-        return [f"{agent_id}:status:{STATE_MAP[event_type]}"]
-
-    if event_type == "TASK_COMPLETE":
-        return [f"{agent_id}:status:idle", f"{agent_id}:task_complete"]
-
-    if event_type == "MESSAGE_RECEIVE":
-        return [f"{agent_id}:acknowledge"]
-
-    if event_type == "CUSTOM_EVENT":
-        event_name = event.payload.get("event_name", "custom") if event.payload else "custom"
-        return [f"{agent_id}:custom:{event_name}"]
-
-    # Unknown event — try payload.agent_state, fallback to working
-    agent_state = (event.payload.get("agent_state") if event.payload else None) or "working"
-    return [f"{agent_id}:status:{agent_state}"]
-
-
-async def update_agent_states(
-    session: AsyncSession,
-    event: EventCreate,
-    actions: list[str],
-) -> None:
-    """
-    Update agent states based on inferred actions.
-    """
-    for action in actions:
-        parts = action.split(":")
-
-        if len(parts) >= 3 and parts[1] == "status":
-            agent_id = parts[0]
-            new_status = parts[2]
-
-            result = await session.execute(
-                select(Agent).where(
-                    Agent.company_id == event.company_id,
-                    Agent.agent_id == agent_id,
-                )
-            )
-            agent = result.scalars().first()
-
-            if agent:
-                agent.status = new_status
-
-                # Update current task from payload if available
-                if new_status in ("working", "thinking", "executing", "coding", "discussing", "reviewing"):
-                    task = event.payload.get("task") or event.payload.get("thought")
-                    if task:
-                        agent.current_task = task
-                elif new_status == "idle":
-                    agent.current_task = None
-
-        # Handle walk_to actions - set agent to walking status
-        elif len(parts) >= 3 and parts[1] == "walk_to":
-            agent_id = parts[0]
-
-            result = await session.execute(
-                select(Agent).where(
-                    Agent.company_id == event.company_id,
-                    Agent.agent_id == agent_id,
-                )
-            )
-            agent = result.scalars().first()
-
-            if agent:
-                agent.status = "walking"
-
-
-async def create_movements(
-    session: AsyncSession,
-    event: EventCreate,
-    from_agent: Agent,
-    to_agent: Agent | None,
-    actions: list[str],
-) -> None:
+@router.post("/batch", response_model=EventBatchResponse)
+async def create_events_batch(
+    batch_in: EventBatchCreate,
+    session: AsyncSession = Depends(get_session),
+):
     """
-    Create movement records for animations.
+    Receive a batch of business events from Dev App.
+    All accepted events are written in a single transaction; events referencing
+    an unknown company or agent are rejected individually.
     """
-    for action in actions:
-        parts = action.split(":")
-
-        # walk_to action - agent walks to target agent's zone
-        if len(parts) >= 3 and parts[1] == "walk_to":
-            agent_id = parts[0]
-            target_agent_id = parts[2]
-
-            if to_agent and agent_id == event.agent_id:
-                movement = Movement(
-                    company_id=event.company_id,
-                    agent_id=agent_id,
-                    from_zone=from_agent.position_zone,
-                    to_zone=to_agent.position_zone,
-                    purpose="handoff",
-                    artifact=event.payload.get("artifact"),
-                    progress=0.0,
-                )
-                session.add(movement)
-
-        # return action - agent returns to their home zone
-        elif len(parts) >= 2 and parts[1] == "return":
-            agent_id = parts[0]
-
-            if agent_id == event.agent_id and to_agent:
-                movement = Movement(
-                    company_id=event.company_id,
-                    agent_id=agent_id,
-                    from_zone=to_agent.position_zone,
-                    to_zone=from_agent.role,  # Return to their role zone
-                    purpose="return",
-                    progress=0.0,
-                )
-                session.add(movement)
+    results = await ingest_events(session, batch_in.events)
+    await session.commit()
+
+    accepted = sum(1 for r in results if r.status == "accepted")
+    return EventBatchResponse(
+        results=results,
+        accepted=accepted,
+        rejected=len(results) - accepted,
+    )
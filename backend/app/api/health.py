@@ -1,7 +1,16 @@
 from fastapi import APIRouter
 from sqlalchemy import text
 
+from app.config import settings
 from app.database import engine
+from app.services.broadcaster import company_broadcaster
+from app.services.directory import company_directory
+from app.services.ingestion import ingestion_queue
+from app.services.playback import playbacks
+from app.services.projection import company_projections
+from app.services.replay import state_replay
+from app.services.roles import role_registry
+from app.services.timeline import timeline_cache
 
 router = APIRouter()
 
@@ -28,3 +37,18 @@ async def health_check():
         "version": "1.0.0",
         "database": db_status,
     }
+
+
+@router.get("/health/stats")
+async def health_stats():
+    """In-process cache and queue counters for capacity tuning."""
+    return {
+        "directory_cache": company_directory.stats(),
+        "ingestion": {"mode": settings.event_ingest_mode, **ingestion_queue.stats()},
+        "stream": company_broadcaster.stats(),
+        "state_projection": company_projections.stats(),
+        "state_replay": state_replay.stats(),
+        "playback": playbacks.stats(),
+        "timeline": timeline_cache.stats(),
+        "role_registry": role_registry.stats(),
+    }
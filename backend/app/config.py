@@ -24,6 +24,63 @@ class Settings(BaseSettings):
         # Handle comma-separated string
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
+    # Company/agent directory cache (hot-path existence checks)
+    directory_cache_size: int = 1024
+    directory_cache_ttl_seconds: float = 60.0
+
+    # Event ingestion: "sync" writes each event before responding,
+    # "queued" acknowledges with 202 and writes in background batches
+    event_ingest_mode: str = "sync"
+    ingest_queue_max_size: int = 10000
+    ingest_flush_size: int = 500
+    ingest_flush_interval_ms: int = 200
+
+    # Company change stream (SSE): per-subscriber backlog and keepalive interval
+    stream_queue_size: int = 1000
+    stream_keepalive_seconds: float = 15.0
+
+    # Playback streams paused for longer than this end
+    playback_max_pause_seconds: float = 600.0
+
+    # How long removals stay available to ?since= state deltas
+    state_tombstone_retention_seconds: int = 3600
+
+    # In-memory company projections serving /state; removals kept per company for deltas
+    state_projection_size: int = 256
+    state_projection_max_removals: int = 1000
+
+    # Time-travel state (/state?at=): companies with cached replay checkpoints,
+    # events replayed between checkpoints, and checkpoints kept per company
+    state_replay_cache_size: int = 64
+    state_replay_checkpoint_interval: int = 1000
+    state_replay_max_checkpoints: int = 256
+
+    # Persistent state snapshots replay starts from: taken for a company once it
+    # has this many new events, or any new events and the last snapshot is this old
+    state_snapshot_every_events: int = 10000
+    state_snapshot_max_age_minutes: int = 60
+    state_snapshot_interval_seconds: int = 300
+
+    # Timeline histograms: cached (company, bucket width, grouping) entries of
+    # closed buckets, and the most buckets one response may hold
+    timeline_cache_size: int = 256
+    timeline_max_buckets: int = 10000
+
+    # Monthly events partitions: created ahead of time; partitions entirely older
+    # than the retention window are dropped (or detached, keeping the table).
+    # Retention 0 keeps events forever. Companies may set a shorter read horizon.
+    event_partition_months_ahead: int = 3
+    event_retention_days: int = 0
+    event_retention_action: str = "drop"
+    partition_maintenance_interval_seconds: int = 3600
+
+    # Cold storage: monthly partitions entirely older than this many days are
+    # written to gzipped NDJSON segment files and dropped from Postgres; logs
+    # and export still read them. 0 disables archiving.
+    event_archive_after_days: int = 0
+    event_archive_dir: str = "archive"
+    event_archive_interval_seconds: int = 3600
+
     # Logging
     log_level: str = "INFO"
 
@@ -36,6 +93,24 @@ class Settings(BaseSettings):
             raise ValueError(f"log_level must be one of {valid_levels}")
         return v.upper()
 
+    @field_validator("event_ingest_mode")
+    @classmethod
+    def validate_event_ingest_mode(cls, v: str) -> str:
+        """Validate event ingest mode is known."""
+        valid_modes = {"sync", "queued"}
+        if v.lower() not in valid_modes:
+            raise ValueError(f"event_ingest_mode must be one of {valid_modes}")
+        return v.lower()
+
+    @field_validator("event_retention_action")
+    @classmethod
+    def validate_event_retention_action(cls, v: str) -> str:
+        """Validate retention action is known."""
+        valid_actions = {"drop", "detach"}
+        if v.lower() not in valid_actions:
+            raise ValueError(f"event_retention_action must be one of {valid_actions}")
+        return v.lower()
+
     @field_validator("database_url")
     @classmethod
     def validate_database_url(cls, v: str) -> str:
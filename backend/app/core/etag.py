@@ -0,0 +1,30 @@
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag derived from the given change-marker parts."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check If-None-Match against `etag` (weak comparison, as RFC 9110 specifies for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the current validator."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach the validator; no-cache makes browsers revalidate on every poll."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from datetime import datetime
+from typing import Any
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> str:
+    # Timestamps in the same ISO form /logs uses; UUIDs and the rest as strings
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def ndjson_chunk(records: Iterable[Mapping[str, Any]]) -> bytes:
+    """Encode records as newline-delimited JSON."""
+    return "".join(json.dumps(dict(record), default=_json_default) + "\n" for record in records).encode()
+
+
+def csv_chunk(records: Iterable[Mapping[str, Any]], columns: Sequence[str], header: bool = False) -> bytes:
+    """Encode records as CSV rows; dict and list values are written as JSON."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for record in records:
+        writer.writerow(
+            json.dumps(value) if isinstance(value, (dict, list))
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in (record[column] for column in columns)
+        )
+    return buffer.getvalue().encode()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-compress a byte stream incrementally."""
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
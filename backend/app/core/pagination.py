@@ -0,0 +1,94 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque URL-safe token."""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a token from encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_keyset(values: list) -> str:
+    """
+    Encode a keyset position of JSON-able values as an opaque URL-safe token.
+    Datetimes and UUIDs are written as strings; the caller parses them back.
+    """
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        default=str,
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_keyset(cursor: str) -> list:
+    """Decode a token from encode_keyset. Raises ValueError if it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+# Count modes for list endpoints: exact count(*), planner estimate, or skip the count
+COUNT_MODES = ("exact", "estimate", "none")
+
+# Below this planner estimate an exact count is cheap enough to run instead
+EXACT_COUNT_THRESHOLD = 1000
+
+
+async def count_rows(session: AsyncSession, query: Select) -> int:
+    """Exact number of rows `query` returns, counted by the database."""
+    result = await session.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    return result.scalar_one()
+
+
+class _ExplainJSON(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a query, executed with the query's own bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, query: Select):
+        self.query = query
+
+
+@compiles(_ExplainJSON)
+def _compile_explain_json(element: _ExplainJSON, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.query, **kw)
+
+
+async def estimate_rows(session: AsyncSession, query: Select) -> tuple[int, bool]:
+    """
+    Planner row estimate for `query`; returns (count, is_estimate).
+
+    Small estimates are replaced by an exact count, since planner statistics
+    are least reliable there and counting is cheap.
+    """
+    result = await session.execute(_ExplainJSON(query.order_by(None)))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < EXACT_COUNT_THRESHOLD:
+        return await count_rows(session, query), False
+    return estimate, True
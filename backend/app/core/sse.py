@@ -0,0 +1,21 @@
+import json
+from typing import Any
+
+
+def format_sse(event: str, data: Any, event_id: str | None = None) -> str:
+    """Encode one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+# Comment line that keeps idle connections (and proxies) from timing out
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Disable nginx response buffering
+}
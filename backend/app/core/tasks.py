@@ -0,0 +1,46 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+
+class PeriodicTask:
+    """
+    Run an async job in the background every `interval_seconds`.
+
+    The first run starts immediately. A failing run is reported and the task
+    keeps its schedule, so one bad run doesn't stop maintenance for good.
+    """
+
+    def __init__(self, name: str, job: Callable[[], Awaitable[None]], interval_seconds: float):
+        self.name = name
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {"running": self._task is not None, "runs": self.runs, "failures": self.failures}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.job()
+                self.runs += 1
+            except Exception as e:
+                self.failures += 1
+                print(f"{self.name} failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
@@ -69,7 +69,7 @@ async def init_db():
     Falls back to create_all if migrations fail (graceful degradation).
     """
     # Import models to register them with SQLModel metadata
-    from app.models import Agent, Company, Event, Movement, RoleConfig  # noqa: F401
+    from app.models import Agent, Company, Event, Movement, RoleConfig, StateTombstone  # noqa: F401
 
     # Try to run migrations
     migration_success = run_migrations()
@@ -86,3 +86,11 @@ async def get_session() -> AsyncSession:
     """Dependency to get database session."""
     async with async_session() as session:
         yield session
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Dependency for handlers that open their own sessions, such as streaming
+    responses whose body outlives the request-scoped session.
+    """
+    return async_session
@@ -5,7 +5,19 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.config import settings
-from app.database import init_db
+from app.database import async_session, init_db
+from app.services.archive import event_archive_task
+from app.services.ingestion import ingestion_queue
+from app.services.partitions import partition_maintenance_task
+from app.services.replay import state_snapshot_task
+from app.services.roles import role_registry
+
+# Creates upcoming events partitions and expires old ones
+partition_maintenance = partition_maintenance_task(async_session)
+# Moves old partitions to compressed segment files (EVENT_ARCHIVE_AFTER_DAYS)
+event_archiver = event_archive_task(async_session)
+# Persists replayed company states so /state?at= replays only the tail
+state_snapshots = state_snapshot_task(async_session)
 
 
 @asynccontextmanager
@@ -14,9 +26,22 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting up SDLC Game Dashboard API...")
     await init_db()
+    async with async_session() as session:
+        await role_registry.preload(session)
+    if settings.event_ingest_mode == "queued":
+        ingestion_queue.start(async_session)
+    partition_maintenance.start()
+    if settings.event_archive_after_days > 0:
+        event_archiver.start()
+    state_snapshots.start()
     yield
     # Shutdown
     print("Shutting down...")
+    # Write out events already acknowledged with 202
+    await ingestion_queue.stop()
+    await partition_maintenance.stop()
+    await event_archiver.stop()
+    await state_snapshots.stop()
 
 
 app = FastAPI(
@@ -33,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Include API router
@@ -1,7 +1,24 @@
-from app.models.company import Company
+from app.models.company import Company, CompanyListMarker
 from app.models.agent import Agent
 from app.models.event import Event
+from app.models.event_segment import EventSegment
 from app.models.role_config import RoleConfig
 from app.models.movement import Movement
+from app.models.tombstone import StateTombstone
+from app.models.state_snapshot import StateSnapshot
+from app.models.rollup import AgentActivityRollup, AgentStatusRollup, HandoffEdge
 
-__all__ = ["Company", "Agent", "Event", "RoleConfig", "Movement"]
+__all__ = [
+    "Company",
+    "CompanyListMarker",
+    "Agent",
+    "Event",
+    "EventSegment",
+    "RoleConfig",
+    "Movement",
+    "StateTombstone",
+    "StateSnapshot",
+    "AgentStatusRollup",
+    "AgentActivityRollup",
+    "HandoffEdge",
+]
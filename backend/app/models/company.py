@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import BigInteger, Index, func
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -14,14 +15,55 @@ class Company(SQLModel, table=True):
     """Virtual company (team) in the dashboard."""
 
     __tablename__ = "companies"
+    __table_args__ = (
+        # Company list keysets: (sort column, id), scanned forward for name
+        # and backward for newest/largest first
+        Index("ix_companies_name_id", "name", "id"),
+        Index("ix_companies_created_at_id", "created_at", "id"),
+        Index("ix_companies_agent_count_id", "agent_count", "id"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str = Field(index=True, max_length=100)
     description: Optional[str] = Field(default=None, max_length=500)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Indexed: its max() is part of the company list change marker
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    # Bumped by every write touching agents or movements (see services/versioning.py)
+    version: int = Field(default=0, sa_type=BigInteger)
+    # Deltas older than this version can't be served (tombstones pruned)
+    min_delta_version: int = Field(default=0, sa_type=BigInteger)
+    # Logs older than this many days are hidden (None: only the global retention applies)
+    retention_days: Optional[int] = Field(default=None)
+    # Denormalized for the company list; maintained with the version bump
+    agent_count: int = Field(default=0)
+    event_count: int = Field(default=0, sa_type=BigInteger)
+    last_activity: Optional[datetime] = Field(default=None)  # Latest event timestamp
 
     # Relationships
     agents: list["Agent"] = Relationship(back_populates="company")
     events: list["Event"] = Relationship(back_populates="company")
     movements: list["Movement"] = Relationship(back_populates="company")
+
+
+class CompanyListMarker(SQLModel, table=True):
+    """
+    Single-row change marker for the company list, bumped when a company is
+    created or deleted. Updates move max(companies.updated_at) instead, so
+    event writes don't all contend for this row.
+    """
+
+    __tablename__ = "company_list_marker"
+
+    id: int = Field(default=1, primary_key=True)
+    generation: int = Field(default=0, sa_type=BigInteger)
+
+
+# Most recently active first, companies without events last
+Index(
+    "ix_companies_last_activity_id",
+    Company.__table__.c.last_activity.desc().nullslast(),
+    Company.__table__.c.id.desc(),
+)
+# Case-insensitive name prefix filters, as a byte-ordered range scan
+Index("ix_companies_name_prefix", func.lower(Company.__table__.c.name).collate("C"))
@@ -2,31 +2,75 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Computed, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from app.models.company import Company
 
 
+# Payload fields indexed for full-text search, with their ts_rank weights
+SEARCH_FIELDS = {"task": "A", "thought": "B", "message": "B", "artifact": "C"}
+
+SEARCH_VECTOR_SQL = " || ".join(
+    f"setweight(to_tsvector('english'::regconfig, coalesce(payload->>'{key}', '')), '{weight}')"
+    for key, weight in SEARCH_FIELDS.items()
+)
+
+
 def _utc_now() -> datetime:
     """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class Event(SQLModel, table=True):
-    """Activity event log."""
+    """Activity event log (range-partitioned by month on timestamp)."""
 
     __tablename__ = "events"
+    __table_args__ = (
+        # Newest-first log pages and keyset cursors
+        Index("ix_events_company_timestamp_id", "company_id", "timestamp", "id"),
+        # Log filters by agent (sender or receiver) and by event type
+        Index("ix_events_company_from_agent_timestamp_id", "company_id", "from_agent_id", "timestamp", "id"),
+        Index("ix_events_company_to_agent_timestamp_id", "company_id", "to_agent_id", "timestamp", "id"),
+        Index("ix_events_company_type_timestamp_id", "company_id", "event_type", "timestamp", "id"),
+        # Timeline histograms: index-only scans binned by timestamp
+        Index(
+            "ix_events_company_timestamp_covering",
+            "company_id",
+            "timestamp",
+            postgresql_include=["event_type", "from_agent_id"],
+        ),
+        # payload @> containment filters
+        Index(
+            "ix_events_payload_gin",
+            "payload",
+            postgresql_using="gin",
+            postgresql_ops={"payload": "jsonb_path_ops"},
+        ),
+        # Monthly partitions, managed by services/partitions.py
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     company_id: UUID = Field(foreign_key="companies.id", index=True)
     from_agent_id: Optional[str] = Field(default=None, max_length=50)
     to_agent_id: Optional[str] = Field(default=None, max_length=50)
     event_type: str = Field(max_length=50)  # WORK_REQUEST, WORK_COMPLETE, etc.
-    payload: dict = Field(default={}, sa_column=Column(JSON))
-    inferred_actions: list = Field(default=[], sa_column=Column(JSON))
-    timestamp: datetime = Field(default_factory=_utc_now, index=True)
+    payload: dict = Field(default={}, sa_column=Column(JSONB))
+    inferred_actions: list = Field(default=[], sa_column=Column(JSONB))
+    # Part of the primary key: unique constraints on a partitioned table must include the partition key
+    timestamp: datetime = Field(default_factory=_utc_now, index=True, primary_key=True)
 
     # Relationships
     company: "Company" = Relationship(back_populates="events")
+
+
+# Generated full-text search column. It is added to the table after mapping,
+# so it stays unmapped: event inserts don't RETURN it and log reads don't load it.
+event_search_vector = Column(
+    "search_vector", TSVECTOR, Computed(text(SEARCH_VECTOR_SQL), persisted=True)
+)
+Event.__table__.append_column(event_search_vector)
+Index("ix_events_search_vector", event_search_vector, postgresql_using="gin")
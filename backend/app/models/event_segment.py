@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EventSegment(SQLModel, table=True):
+    """Archived events of one company: a gzipped NDJSON file in the event archive directory."""
+
+    __tablename__ = "event_segments"
+    __table_args__ = (
+        # Segments overlapping a time range, newest first
+        Index("ix_event_segments_company_max_timestamp", "company_id", "max_timestamp"),
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    company_id: UUID = Field(foreign_key="companies.id")
+    path: str = Field(max_length=255)  # Relative to settings.event_archive_dir
+    source_partition: str = Field(max_length=63)  # events partition the rows came from
+    min_timestamp: datetime
+    max_timestamp: datetime
+    event_count: int
+    created_at: datetime = Field(default_factory=_utc_now)
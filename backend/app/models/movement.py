@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import BigInteger, Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -17,6 +18,10 @@ class Movement(SQLModel, table=True):
     """Pending movement for agent animation."""
 
     __tablename__ = "movements"
+    __table_args__ = (
+        # Pending movements only (polled by /state)
+        Index("ix_movements_company_pending", "company_id", postgresql_where=text("progress < 1.0")),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     company_id: UUID = Field(foreign_key="companies.id", index=True)
@@ -27,6 +32,7 @@ class Movement(SQLModel, table=True):
     artifact: Optional[str] = Field(default=None, max_length=200)
     progress: float = Field(default=0.0)  # 0.0 to 1.0
     created_at: datetime = Field(default_factory=_utc_now)
+    version: int = Field(default=0, sa_type=BigInteger)  # Company version of last change
 
     # Relationships
     company: "Company" = Relationship(back_populates="movements")
@@ -0,0 +1,49 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class AgentStatusRollup(SQLModel, table=True):
+    """Seconds an agent spent in one status during one hourly bucket."""
+
+    __tablename__ = "agent_status_rollups"
+
+    company_id: UUID = Field(foreign_key="companies.id", primary_key=True)
+    agent_id: str = Field(primary_key=True, max_length=50)
+    bucket: datetime = Field(primary_key=True)  # Start of the hour (UTC)
+    status: str = Field(primary_key=True, max_length=50)
+    seconds: float = Field(default=0.0)
+
+
+class AgentActivityRollup(SQLModel, table=True):
+    """Events sent and handoffs by an agent during one hourly bucket."""
+
+    __tablename__ = "agent_activity_rollups"
+
+    company_id: UUID = Field(foreign_key="companies.id", primary_key=True)
+    agent_id: str = Field(primary_key=True, max_length=50)
+    bucket: datetime = Field(primary_key=True)  # Start of the hour (UTC)
+    events: int = Field(default=0)
+    handoffs_sent: int = Field(default=0)
+    handoffs_received: int = Field(default=0)
+
+
+class HandoffEdge(SQLModel, table=True):
+    """Handoffs from one agent to another during one hourly bucket, per event type and artifact."""
+
+    __tablename__ = "handoff_edges"
+    __table_args__ = (
+        # A company's graph over a window
+        Index("ix_handoff_edges_company_bucket", "company_id", "bucket"),
+    )
+
+    company_id: UUID = Field(foreign_key="companies.id", primary_key=True)
+    from_agent_id: str = Field(primary_key=True, max_length=50)
+    to_agent_id: str = Field(primary_key=True, max_length=50)
+    bucket: datetime = Field(primary_key=True)  # Start of the hour (UTC)
+    event_type: str = Field(primary_key=True, max_length=50)
+    artifact: str = Field(default="", primary_key=True, max_length=200)  # "" when none was sent
+    count: int = Field(default=0)
+    last_at: datetime
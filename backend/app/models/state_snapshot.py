@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class StateSnapshot(SQLModel, table=True):
+    """Replayed agent state of a company after every event up to (position_timestamp, position_event_id)."""
+
+    __tablename__ = "state_snapshots"
+    __table_args__ = (
+        # Nearest snapshot at or before a time
+        Index("ix_state_snapshots_company_position", "company_id", "position_timestamp"),
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    company_id: UUID = Field(foreign_key="companies.id")
+    position_timestamp: datetime
+    position_event_id: UUID
+    # {agent_id: [status, zone, current_task]}
+    agents: dict = Field(default={}, sa_column=Column(JSONB, nullable=False))
+    created_at: datetime = Field(default_factory=_utc_now)
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import BigInteger
+from sqlmodel import Field, SQLModel
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class StateTombstone(SQLModel, table=True):
+    """Removal marker so versioned state deltas can report deleted agents/movements."""
+
+    __tablename__ = "state_tombstones"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    company_id: UUID = Field(foreign_key="companies.id", index=True)
+    kind: str = Field(max_length=20)  # "agent" or "movement"
+    key: str = Field(max_length=50)  # agent_id or movement id
+    version: int = Field(sa_type=BigInteger)  # Company version of the removal
+    created_at: datetime = Field(default_factory=_utc_now)
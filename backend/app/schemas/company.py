@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AgentCreate(BaseModel):
@@ -19,6 +19,15 @@ class CompanyCreate(BaseModel):
     name: str
     description: Optional[str] = None
     agents: list[AgentCreate] = []  # Optional - can create company without agents
+    retention_days: Optional[int] = Field(None, ge=1)  # None = global retention only
+
+
+class CompanyUpdate(BaseModel):
+    """Company update request. Only fields that are sent are changed."""
+
+    name: Optional[str] = None
+    description: Optional[str] = None
+    retention_days: Optional[int] = Field(None, ge=1)  # null clears the company window
 
 
 class CompanyResponse(BaseModel):
@@ -27,6 +36,7 @@ class CompanyResponse(BaseModel):
     company_id: UUID
     name: str
     created_at: datetime
+    retention_days: Optional[int] = None
 
 
 class CompanyListItem(BaseModel):
@@ -35,6 +45,7 @@ class CompanyListItem(BaseModel):
     company_id: UUID
     name: str
     agent_count: int
+    event_count: int = 0
     last_activity: Optional[datetime] = None
     status: str  # "active" or "inactive"
 
@@ -43,6 +54,8 @@ class CompanyListResponse(BaseModel):
     """Company list response."""
 
     companies: list[CompanyListItem]
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the following page
 
 
 class AgentCreateRequest(BaseModel):
@@ -106,3 +119,104 @@ class CompanyStateResponse(BaseModel):
     pending_movements: list[PendingMovement]
     role_configs: dict[str, RoleConfigResponse] = {}
     last_updated: datetime
+    version: int = 0  # Pass back as ?since= to receive only later changes
+    is_delta: bool = False
+    removed_agent_ids: list[str] = []
+    removed_movement_ids: list[str] = []
+
+
+class PlaybackControlRequest(BaseModel):
+    """Control of an open playback stream. Only fields that are sent are changed."""
+
+    paused: Optional[bool] = None
+    speed: Optional[float] = Field(None, ge=1, le=50)
+    seek_to: Optional[datetime] = None  # Restart playback at this time, within the range
+
+
+class AgentAnalyticsBucket(BaseModel):
+    """One agent's activity during one hourly bucket."""
+
+    bucket: datetime
+    events: int = 0
+    handoffs_sent: int = 0
+    handoffs_received: int = 0
+    status_seconds: dict[str, float] = {}
+
+
+class AgentAnalytics(BaseModel):
+    """One agent's activity over the analytics range."""
+
+    agent_id: str
+    name: str
+    role: str
+    events: int = 0
+    events_per_hour: float = 0.0
+    handoffs_sent: int = 0
+    handoffs_received: int = 0
+    status_seconds: dict[str, float] = {}  # Includes the current status up to now
+    buckets: list[AgentAnalyticsBucket] = []
+
+
+class CompanyAnalyticsResponse(BaseModel):
+    """Per-agent analytics over [start, end), in whole hourly buckets."""
+
+    company_id: UUID
+    start: datetime
+    end: datetime
+    agents: list[AgentAnalytics]
+
+
+class HandoffGraphNode(BaseModel):
+    """An agent in the handoff graph."""
+
+    agent_id: str
+    role: str
+    sent: int = 0
+    received: int = 0
+
+
+class HandoffArtifact(BaseModel):
+    """An artifact passed along a handoff edge."""
+
+    artifact: str
+    count: int
+
+
+class HandoffGraphEdge(BaseModel):
+    """Handoffs from one agent to another over the window."""
+
+    from_agent: str
+    to_agent: str
+    count: int
+    event_types: dict[str, int]
+    artifacts: list[HandoffArtifact] = []  # Most frequent first
+    last_at: datetime
+
+
+class HandoffGraphResponse(BaseModel):
+    """Weighted agent-to-agent handoff graph."""
+
+    company_id: UUID
+    window: str
+    since: Optional[datetime] = None  # None for window=all
+    nodes: list[HandoffGraphNode]
+    edges: list[HandoffGraphEdge]
+
+
+class TimelineBucket(BaseModel):
+    """Event counts of one timeline bucket."""
+
+    start: datetime
+    total: int = 0
+    counts: dict[str, int] = {}  # Per event type or agent, with group_by
+
+
+class TimelineResponse(BaseModel):
+    """Event density over [start, end), one entry per bucket (empty ones included)."""
+
+    company_id: UUID
+    bucket: str
+    group_by: Optional[str] = None
+    start: datetime
+    end: datetime
+    buckets: list[TimelineBucket]
@@ -13,6 +13,9 @@ KNOWN_EVENT_TYPES = {
     "CUSTOM_EVENT",
 }
 
+# Upper bound on events accepted in a single batch request
+MAX_EVENTS_PER_BATCH = 500
+
 
 class EventCreate(BaseModel):
     """Event creation request from Dev App."""
@@ -32,6 +35,30 @@ class EventResponse(BaseModel):
     status: str = "accepted"
 
 
+class EventBatchCreate(BaseModel):
+    """Batch event creation request from Dev App."""
+
+    events: list[EventCreate] = Field(..., min_length=1, max_length=MAX_EVENTS_PER_BATCH)
+
+
+class EventBatchItemResult(BaseModel):
+    """Per-event outcome within a batch."""
+
+    index: int  # Position of the event in the request array
+    status: str  # "accepted" or "rejected"
+    event_id: Optional[UUID] = None
+    timestamp: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class EventBatchResponse(BaseModel):
+    """Batch event creation response."""
+
+    results: list[EventBatchItemResult]
+    accepted: int
+    rejected: int
+
+
 class LogEntry(BaseModel):
     """Log entry in logs response."""
 
@@ -0,0 +1,176 @@
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from app.models import Agent, Movement
+
+# Communication/work events — sender walks to the target when one is given
+HANDOFF_EVENT_TYPES = frozenset(
+    {"WORK_REQUEST", "WORK_COMPLETE", "REVIEW_REQUEST", "FEEDBACK", "MESSAGE_SEND"}
+)
+
+# Known state events — direct status mapping
+STATE_EVENT_MAP = {
+    "THINKING": "thinking", "WORKING": "working", "EXECUTING": "executing",
+    "IDLE": "idle", "ERROR": "error",
+    "CODING": "coding", "DISCUSSING": "discussing", "REVIEWING": "reviewing", "BREAK": "break",
+}
+
+# Statuses that pick up current_task from the event payload
+TASK_STATUSES = frozenset(
+    {"working", "thinking", "executing", "coding", "discussing", "reviewing"}
+)
+
+
+@dataclass(slots=True, frozen=True)
+class Action:
+    """One visual action inferred from an event, e.g. Dev-001 walk_to QA-001."""
+
+    agent_id: str
+    verb: str  # status, walk_to, handoff, return, task_complete, acknowledge, custom
+    arg: str | None = None
+
+    def render(self) -> str:
+        """String form stored in Event.inferred_actions ("agent:verb[:arg]")."""
+        if self.arg is None:
+            return f"{self.agent_id}:{self.verb}"
+        return f"{self.agent_id}:{self.verb}:{self.arg}"
+
+
+def render_plan(plan: list[Action]) -> list[str]:
+    """Render a plan to the persisted string form."""
+    return [action.render() for action in plan]
+
+
+def infer_actions(
+    event_type: str,
+    agent_id: str,
+    to_agent: str | None,
+    payload: dict | None,
+) -> list[Action]:
+    """
+    Infer visual actions from business event type.
+    Accepts any event_type string — known types get specific handling,
+    unknown types fall through to payload-driven state.
+    """
+    event_type = event_type.upper()  # Normalize
+    payload = payload or {}
+
+    if event_type in HANDOFF_EVENT_TYPES:
+        if to_agent:
+            return [
+                Action(agent_id, "walk_to", to_agent),
+                Action(agent_id, "handoff", to_agent),
+                Action(agent_id, "return"),
+                Action(to_agent, "status", "working"),
+            ]
+        return [Action(agent_id, "status", "working")]
+
+    if event_type in STATE_EVENT_MAP:
+        return [Action(agent_id, "status", STATE_EVENT_MAP[event_type])]
+
+    if event_type == "TASK_COMPLETE":
+        return [Action(agent_id, "status", "idle"), Action(agent_id, "task_complete")]
+
+    if event_type == "MESSAGE_RECEIVE":
+        return [Action(agent_id, "acknowledge")]
+
+    if event_type == "CUSTOM_EVENT":
+        return [Action(agent_id, "custom", payload.get("event_name", "custom"))]
+
+    # Unknown event — try payload.agent_state, fallback to working
+    return [Action(agent_id, "status", payload.get("agent_state") or "working")]
+
+
+def _apply_status(agent: Any, action: Action, payload: dict) -> None:
+    agent.status = action.arg
+
+    # Update current task from payload if available
+    if action.arg in TASK_STATUSES:
+        task = payload.get("task") or payload.get("thought")
+        if task:
+            agent.current_task = task
+    elif action.arg == "idle":
+        agent.current_task = None
+
+
+def _apply_walk_to(agent: Any, action: Action, payload: dict) -> None:
+    agent.status = "walking"
+
+
+# Verbs that change agent state; the rest are visual-only
+_STATE_HANDLERS: dict[str, Callable[[Any, Action, dict], None]] = {
+    "status": _apply_status,
+    "walk_to": _apply_walk_to,
+}
+
+
+def apply_plan(plan: list[Action], payload: dict | None, agents: Mapping[str, Any]) -> list[str]:
+    """
+    Apply a plan's state changes to already-loaded agents keyed by agent_id.
+
+    Agents only need `status` and `current_task` attributes, so ORM rows and
+    in-memory views are handled alike. Actions for unknown agents are skipped.
+    Returns the ids of agents whose state was touched, in plan order.
+    """
+    payload = payload or {}
+    touched: list[str] = []
+    for action in plan:
+        handler = _STATE_HANDLERS.get(action.verb)
+        if handler is None:
+            continue
+        agent = agents.get(action.agent_id)
+        if agent is not None:
+            handler(agent, action, payload)
+            if action.agent_id not in touched:
+                touched.append(action.agent_id)
+    return touched
+
+
+def plan_movements(
+    plan: list[Action],
+    company_id: UUID,
+    from_agent: Agent,
+    to_agent: Agent | None,
+    payload: dict | None,
+) -> list[Movement]:
+    """
+    Build movement records for the sender's walk_to/return actions.
+    """
+    if to_agent is None:
+        return []
+
+    movements = []
+    for action in plan:
+        if action.agent_id != from_agent.agent_id:
+            continue
+
+        # walk_to action - agent walks to target agent's zone
+        if action.verb == "walk_to":
+            movements.append(
+                Movement(
+                    company_id=company_id,
+                    agent_id=action.agent_id,
+                    from_zone=from_agent.position_zone,
+                    to_zone=to_agent.position_zone,
+                    purpose="handoff",
+                    artifact=(payload or {}).get("artifact"),
+                    progress=0.0,
+                )
+            )
+
+        # return action - agent returns to their home zone
+        elif action.verb == "return":
+            movements.append(
+                Movement(
+                    company_id=company_id,
+                    agent_id=action.agent_id,
+                    from_zone=to_agent.position_zone,
+                    to_zone=from_agent.role,  # Return to their role zone
+                    purpose="return",
+                    progress=0.0,
+                )
+            )
+
+    return movements
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import AgentActivityRollup, AgentStatusRollup, HandoffEdge
+
+# Rollup bucket width
+ROLLUP_BUCKET = timedelta(hours=1)
+
+# session.info keys holding rollup increments staged in the current transaction
+_STATUS_KEY = "status_rollups"
+_ACTIVITY_KEY = "activity_rollups"
+_HANDOFF_KEY = "handoff_edges"
+
+_ACTIVITY_COUNTERS = ("events", "handoffs_sent", "handoffs_received")
+_HANDOFF_EDGE_KEY = ("company_id", "from_agent_id", "to_agent_id", "bucket", "event_type", "artifact")
+
+
+def rollup_bucket(at: datetime) -> datetime:
+    """Start of the rollup bucket containing `at`."""
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def split_by_bucket(start: datetime, end: datetime) -> list[tuple[datetime, float]]:
+    """Seconds of [start, end) falling in each rollup bucket, oldest first."""
+    spans = []
+    bucket = rollup_bucket(start)
+    while start < end:
+        bucket_end = min(bucket + ROLLUP_BUCKET, end)
+        spans.append((bucket, (bucket_end - start).total_seconds()))
+        start = bucket = bucket + ROLLUP_BUCKET
+    return spans
+
+
+def record_status_change(
+    session: AsyncSession,
+    company_id: UUID,
+    agent: Any,
+    previous_status: str,
+    at: datetime,
+) -> None:
+    """
+    Stage the time `agent` spent in `previous_status` up to `at`, and start
+    its new status there. Written by `flush_rollups`.
+    """
+    pending = session.info.setdefault(_STATUS_KEY, {})
+    for bucket, seconds in split_by_bucket(agent.status_changed_at, at):
+        key = (company_id, agent.agent_id, bucket, previous_status)
+        pending[key] = pending.get(key, 0.0) + seconds
+    # An event stamped before the last change (e.g. queued) doesn't move the start back
+    agent.status_changed_at = max(agent.status_changed_at, at)
+
+
+def record_activity(
+    session: AsyncSession,
+    company_id: UUID,
+    agent_id: str,
+    at: datetime,
+    events: int = 0,
+    handoffs_sent: int = 0,
+    handoffs_received: int = 0,
+) -> None:
+    """Stage event and handoff counts for an agent's bucket. Written by `flush_rollups`."""
+    pending = session.info.setdefault(_ACTIVITY_KEY, {})
+    key = (company_id, agent_id, rollup_bucket(at))
+    counts = pending.setdefault(key, [0, 0, 0])
+    counts[0] += events
+    counts[1] += handoffs_sent
+    counts[2] += handoffs_received
+
+
+def record_handoff(
+    session: AsyncSession,
+    company_id: UUID,
+    from_agent_id: str,
+    to_agent_id: str,
+    event_type: str,
+    artifact: Any,
+    at: datetime,
+) -> None:
+    """Stage one handoff for the graph edge's bucket. Written by `flush_rollups`."""
+    artifact = "" if artifact is None else str(artifact)[:200]
+    pending = session.info.setdefault(_HANDOFF_KEY, {})
+    key = (company_id, from_agent_id, to_agent_id, rollup_bucket(at), event_type, artifact)
+    count, last_at = pending.get(key, (0, at))
+    pending[key] = (count + 1, max(last_at, at))
+
+
+async def flush_rollups(session: AsyncSession) -> None:
+    """
+    Add the staged increments to the rollup tables, one upsert per table.
+    Call before committing a transaction that staged events or status changes.
+    """
+    status_rows = session.info.pop(_STATUS_KEY, {})
+    if status_rows:
+        statement = insert(AgentStatusRollup).values(
+            [
+                {
+                    "company_id": company_id,
+                    "agent_id": agent_id,
+                    "bucket": bucket,
+                    "status": status,
+                    "seconds": seconds,
+                }
+                for (company_id, agent_id, bucket, status), seconds in status_rows.items()
+            ]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["company_id", "agent_id", "bucket", "status"],
+                set_={"seconds": AgentStatusRollup.seconds + statement.excluded.seconds},
+            )
+        )
+
+    activity_rows = session.info.pop(_ACTIVITY_KEY, {})
+    if activity_rows:
+        statement = insert(AgentActivityRollup).values(
+            [
+                {
+                    "company_id": company_id,
+                    "agent_id": agent_id,
+                    "bucket": bucket,
+                    **dict(zip(_ACTIVITY_COUNTERS, counts)),
+                }
+                for (company_id, agent_id, bucket), counts in activity_rows.items()
+            ]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["company_id", "agent_id", "bucket"],
+                set_={
+                    counter: getattr(AgentActivityRollup, counter) + getattr(statement.excluded, counter)
+                    for counter in _ACTIVITY_COUNTERS
+                },
+            )
+        )
+
+    handoff_rows = session.info.pop(_HANDOFF_KEY, {})
+    if handoff_rows:
+        statement = insert(HandoffEdge).values(
+            [
+                {**dict(zip(_HANDOFF_EDGE_KEY, key)), "count": count, "last_at": last_at}
+                for key, (count, last_at) in handoff_rows.items()
+            ]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(_HANDOFF_EDGE_KEY),
+                set_={
+                    "count": HandoffEdge.count + statement.excluded["count"],
+                    "last_at": func.greatest(HandoffEdge.last_at, statement.excluded.last_at),
+                },
+            )
+        )
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_rollups(session: Session) -> None:
+    session.info.pop(_STATUS_KEY, None)
+    session.info.pop(_ACTIVITY_KEY, None)
+    session.info.pop(_HANDOFF_KEY, None)
@@ -0,0 +1,381 @@
+import asyncio
+import gzip
+import json
+import os
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import select
+
+from app.config import settings
+from app.core.export import ndjson_chunk
+from app.core.tasks import PeriodicTask
+from app.models import Event, EventSegment
+from app.services.partitions import list_event_partitions, partition_end, remove_event_partition
+from app.services.versioning import subtract_company_events
+
+# One event record, as written by /logs/export and to archive segments
+EVENT_RECORD_COLUMNS = (
+    Event.id,
+    Event.timestamp,
+    Event.from_agent_id.label("from_agent"),
+    Event.to_agent_id.label("to_agent"),
+    Event.event_type,
+    Event.payload,
+    Event.inferred_actions,
+)
+
+# Events per segment file; a segment is read back into memory as a whole
+SEGMENT_SIZE = 10000
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _contains(document: Any, part: Any) -> bool:
+    """JSONB containment (`document @> part`) for decoded JSON values."""
+    if isinstance(part, dict):
+        return isinstance(document, dict) and all(
+            key in document and _contains(document[key], value) for key, value in part.items()
+        )
+    if isinstance(part, list):
+        return isinstance(document, list) and all(
+            any(_contains(item, value) for item in document) for value in part
+        )
+    return document == part and isinstance(document, bool) == isinstance(part, bool)
+
+
+@dataclass(slots=True)
+class ArchiveFilter:
+    """The /logs filters, applied to archived event records. Times are naive UTC."""
+
+    agent_id: Optional[str] = None
+    event_type: Optional[str] = None
+    from_time: Optional[datetime] = None
+    to_time: Optional[datetime] = None
+    horizon: Optional[datetime] = None
+    payload: Optional[dict] = None
+
+    @property
+    def lower_bound(self) -> Optional[datetime]:
+        bounds = [bound for bound in (self.from_time, self.horizon) if bound]
+        return max(bounds) if bounds else None
+
+    def covers(self, segment: EventSegment) -> bool:
+        """True if every event in `segment` matches, so its event_count is the match count."""
+        if self.agent_id or self.event_type or self.payload:
+            return False
+        lower = self.lower_bound
+        return (lower is None or segment.min_timestamp >= lower) and (
+            self.to_time is None or segment.max_timestamp < self.to_time
+        )
+
+    def matches(self, record: dict) -> bool:
+        timestamp = record["timestamp"]
+        lower = self.lower_bound
+        if lower and timestamp < lower:
+            return False
+        if self.to_time and timestamp >= self.to_time:
+            return False
+        if self.agent_id and self.agent_id not in (record["from_agent"], record["to_agent"]):
+            return False
+        if self.event_type and record["event_type"] != self.event_type:
+            return False
+        return not self.payload or _contains(record["payload"], self.payload)
+
+
+def segment_file(path: str) -> Path:
+    return Path(settings.event_archive_dir) / path
+
+
+def _write_segment_file(path: Path, records: list[dict]) -> None:
+    # Written aside and renamed, and synced before the partition is dropped
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as compressed:
+            compressed.write(ndjson_chunk(records))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+
+
+def _read_segment_file(path: Path) -> list[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as lines:
+        records = [json.loads(line) for line in lines]
+    for record in records:
+        record["id"] = UUID(record["id"])
+        record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+    return records
+
+
+def _remove_segment_files(paths: list[str]) -> None:
+    for path in paths:
+        segment_file(path).unlink(missing_ok=True)
+
+
+async def remove_segment_files(paths: list[str]) -> None:
+    """Delete segment files whose event_segments rows were deleted."""
+    if paths:
+        await asyncio.to_thread(_remove_segment_files, paths)
+
+
+async def find_segments(
+    session: AsyncSession,
+    company_id: UUID,
+    archive_filter: ArchiveFilter,
+) -> list[EventSegment]:
+    """A company's segments overlapping the filter's time range, oldest first."""
+    query = select(EventSegment).where(EventSegment.company_id == company_id)
+    if archive_filter.lower_bound:
+        query = query.where(EventSegment.max_timestamp >= archive_filter.lower_bound)
+    if archive_filter.to_time:
+        query = query.where(EventSegment.min_timestamp < archive_filter.to_time)
+    result = await session.execute(query.order_by(EventSegment.min_timestamp, EventSegment.max_timestamp))
+    return list(result.scalars().all())
+
+
+async def _segment_records(segment: EventSegment, archive_filter: ArchiveFilter) -> list[dict]:
+    records = await asyncio.to_thread(_read_segment_file, segment_file(segment.path))
+    return [record for record in records if archive_filter.matches(record)]
+
+
+async def archived_batches(
+    segments: list[EventSegment],
+    archive_filter: ArchiveFilter,
+) -> AsyncIterator[list[dict]]:
+    """Matching archived records, oldest first, one batch per segment."""
+    for segment in segments:
+        records = await _segment_records(segment, archive_filter)
+        if records:
+            yield records
+
+
+async def read_archived_page(
+    segments: list[EventSegment],
+    archive_filter: ArchiveFilter,
+    skip: int,
+    limit: int,
+    before: Optional[tuple[datetime, UUID]] = None,
+) -> list[dict]:
+    """
+    Up to `limit` matching archived records, newest first, after skipping
+    `skip` of them. `before` is a (timestamp, id) keyset position.
+    """
+    page: list[dict] = []
+    for segment in reversed(segments):
+        if before is not None and segment.min_timestamp > before[0]:
+            continue
+        if before is None and skip >= segment.event_count and archive_filter.covers(segment):
+            skip -= segment.event_count
+            continue
+        records = await _segment_records(segment, archive_filter)
+        for record in reversed(records):
+            if before is not None and (record["timestamp"], record["id"]) >= before:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            page.append(record)
+            if len(page) == limit:
+                return page
+    return page
+
+
+async def count_archived_events(
+    segments: list[EventSegment],
+    archive_filter: ArchiveFilter,
+    exact: bool = True,
+) -> tuple[int, bool]:
+    """
+    Number of matching archived events; returns (count, is_estimate).
+
+    Segments entirely inside the filter count from the manifest. Others are
+    read when `exact`, otherwise their whole event_count is the estimate.
+    """
+    total = 0
+    estimated = False
+    for segment in segments:
+        if archive_filter.covers(segment):
+            total += segment.event_count
+        elif exact:
+            total += len(await _segment_records(segment, archive_filter))
+        else:
+            total += segment.event_count
+            estimated = True
+    return total, estimated
+
+
+async def _write_segment(company_id: UUID, partition: str, seq: int, records: list[dict]) -> EventSegment:
+    path = f"{company_id}/{partition}_{seq:04d}.ndjson.gz"
+    await asyncio.to_thread(_write_segment_file, segment_file(path), records)
+    return EventSegment(
+        company_id=company_id,
+        path=path,
+        source_partition=partition,
+        min_timestamp=records[0]["timestamp"],
+        max_timestamp=records[-1]["timestamp"],
+        event_count=len(records),
+    )
+
+
+def _rewritten_path(path: str) -> str:
+    """A new, unique file name for a rewritten segment."""
+    return f"{path.removesuffix('.ndjson.gz').split('@')[0]}@{uuid4().hex[:8]}.ndjson.gz"
+
+
+async def remove_agent_from_segments(
+    session: AsyncSession,
+    company_id: UUID,
+    agent_id: str,
+) -> tuple[int, list[str]]:
+    """
+    Rewrite the company's segments without the events `agent_id` sent or
+    received, as deleting the agent does for its events in Postgres.
+    Segments left empty are deleted. Rewritten files get new names, so the
+    old ones stay valid until the caller commits; returns (events removed,
+    replaced paths) and the caller removes those files after committing.
+    """
+    result = await session.execute(
+        select(EventSegment).where(EventSegment.company_id == company_id)
+    )
+    removed = 0
+    replaced = []
+    for segment in result.scalars().all():
+        records = await asyncio.to_thread(_read_segment_file, segment_file(segment.path))
+        kept = [r for r in records if agent_id not in (r["from_agent"], r["to_agent"])]
+        if len(kept) == len(records):
+            continue
+        removed += len(records) - len(kept)
+        replaced.append(segment.path)
+        if not kept:
+            await session.delete(segment)
+            continue
+        segment.path = _rewritten_path(segment.path)
+        await asyncio.to_thread(_write_segment_file, segment_file(segment.path), kept)
+        segment.min_timestamp = kept[0]["timestamp"]
+        segment.max_timestamp = kept[-1]["timestamp"]
+        segment.event_count = len(kept)
+    return removed, replaced
+
+
+async def _archive_partition(session: AsyncSession, name: str, month: date) -> list[EventSegment]:
+    """Write a partition's events to segment files, per company in (timestamp, id) order."""
+    # SHARE MODE makes writes to the month wait until this transaction, which drops the partition, ends
+    await session.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+    query = (
+        select(Event.company_id, *EVENT_RECORD_COLUMNS)
+        # The month's range, so the planner reads only partition `name`
+        .where(
+            Event.timestamp >= datetime.combine(month, datetime.min.time()),
+            Event.timestamp < partition_end(month),
+        )
+        .order_by(Event.company_id, Event.timestamp, Event.id)
+        .limit(SEGMENT_SIZE)
+    )
+    columns = [column.key for column in EVENT_RECORD_COLUMNS]
+
+    segments: list[EventSegment] = []
+    records: list[dict] = []
+    company_id = None
+    position = None
+    while True:
+        # Keyset batches rather than a server-side cursor: an open cursor
+        # would keep the partition busy and block dropping it in this transaction
+        batch_query = query
+        if position is not None:
+            batch_query = query.where(tuple_(Event.company_id, Event.timestamp, Event.id) > position)
+        rows = (await session.execute(batch_query)).mappings().all()
+        if not rows:
+            break
+        for row in rows:
+            if records and (row["company_id"] != company_id or len(records) == SEGMENT_SIZE):
+                segments.append(await _write_segment(company_id, name, len(segments), records))
+                records = []
+            company_id = row["company_id"]
+            records.append({column: row[column] for column in columns})
+        last = rows[-1]
+        position = tuple_(last["company_id"], last["timestamp"], last["id"])
+    if records:
+        segments.append(await _write_segment(company_id, name, len(segments), records))
+    return segments
+
+
+async def archive_event_partitions(
+    session: AsyncSession,
+    archive_after_days: int,
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    Move monthly partitions entirely older than `archive_after_days` to
+    segment files. The segment rows are inserted and the partition dropped
+    in one transaction, so a month is never both archived and in Postgres;
+    a crash before commit only leaves files that the next run overwrites.
+    Returns the partitions archived.
+    """
+    if archive_after_days <= 0:
+        return []
+    cutoff = (now or _utc_now()) - timedelta(days=archive_after_days)
+
+    archived = []
+    for name, month in await list_event_partitions(session):
+        if partition_end(month) > cutoff:
+            break
+        segments = await _archive_partition(session, name, month)
+        session.add_all(segments)
+        await session.flush()
+        await remove_event_partition(session, name)
+        await session.commit()
+        archived.append(name)
+    return archived
+
+
+async def expire_event_segments(
+    session: AsyncSession,
+    retention_days: int,
+    now: datetime | None = None,
+) -> int:
+    """Delete segments entirely older than the global retention window. Returns the number removed."""
+    if retention_days <= 0:
+        return 0
+    cutoff = (now or _utc_now()) - timedelta(days=retention_days)
+    result = await session.execute(
+        delete(EventSegment)
+        .where(EventSegment.max_timestamp < cutoff)
+        .returning(EventSegment.company_id, EventSegment.event_count, EventSegment.path)
+    )
+    paths = []
+    removed: dict[UUID, int] = {}
+    for company_id, event_count, path in result.all():
+        paths.append(path)
+        removed[company_id] = removed.get(company_id, 0) + event_count
+    await subtract_company_events(session, removed)
+    await session.commit()
+    await remove_segment_files(paths)
+    return len(paths)
+
+
+def event_archive_task(session_factory: sessionmaker) -> PeriodicTask:
+    """Periodic job archiving old partitions and expiring old segments."""
+
+    async def archive() -> None:
+        async with session_factory() as session:
+            archived = await archive_event_partitions(session, settings.event_archive_after_days)
+            expired = await expire_event_segments(session, settings.event_retention_days)
+        if archived or expired:
+            print(f"Events partitions archived: {archived}, segments expired: {expired}")
+
+    return PeriodicTask(
+        "events archiver",
+        archive,
+        interval_seconds=settings.event_archive_interval_seconds,
+    )
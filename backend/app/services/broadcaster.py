@@ -0,0 +1,113 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+# session.info keys holding changes and company versions staged in the current transaction
+_PENDING_KEY = "company_changes"
+_VERSIONS_KEY = "company_versions"
+
+# (versions, changes) of a committed transaction
+CommitHook = Callable[[dict[UUID, tuple[int, datetime]], list[tuple[UUID, str, dict[str, Any]]]], None]
+_commit_hooks: list[CommitHook] = []
+
+
+class CompanyBroadcaster:
+    """
+    Fan-out of committed company changes to stream subscribers.
+
+    Each subscriber gets a bounded queue. A subscriber that falls behind has
+    its backlog replaced by a single "resync" message, telling the client to
+    refetch /state instead of blocking publishers.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[UUID, set[asyncio.Queue]] = {}
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self, company_id: UUID) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(company_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, company_id: UUID, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(company_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[company_id]
+
+    def publish(self, company_id: UUID, change_type: str, data: dict[str, Any]) -> None:
+        """Deliver one change to every subscriber of the company."""
+        self.published += 1
+        for queue in self._subscribers.get(company_id, ()):
+            try:
+                queue.put_nowait((change_type, data))
+            except asyncio.QueueFull:
+                self.resyncs += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("resync", {}))
+
+    def stats(self) -> dict:
+        """Subscriber and delivery counters for the health stats endpoint."""
+        return {
+            "companies": len(self._subscribers),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+            "published": self.published,
+            "resyncs": self.resyncs,
+        }
+
+
+company_broadcaster = CompanyBroadcaster(queue_size=settings.stream_queue_size)
+
+
+def record_change(
+    session: AsyncSession,
+    company_id: UUID,
+    change_type: str,
+    data: dict[str, Any],
+) -> None:
+    """
+    Stage a change for stream subscribers; it is published only if the
+    session's transaction commits.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append((company_id, change_type, data))
+
+
+def record_version(session: AsyncSession, company_id: UUID, version: int, updated_at: datetime) -> None:
+    """Stage the company version written by the current transaction for commit hooks."""
+    session.info.setdefault(_VERSIONS_KEY, {})[company_id] = (version, updated_at)
+
+
+def on_commit(hook: CommitHook) -> CommitHook:
+    """Register a hook run with each committed transaction's versions and changes."""
+    _commit_hooks.append(hook)
+    return hook
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, [])
+    versions = session.info.pop(_VERSIONS_KEY, {})
+    if versions or changes:
+        for hook in _commit_hooks:
+            hook(versions, changes)
+    for company_id, change_type, data in changes:
+        company_broadcaster.publish(company_id, change_type, data)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_VERSIONS_KEY, None)
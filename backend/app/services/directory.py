@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.models import Agent, Company
+
+
+@dataclass(slots=True)
+class AgentEntry:
+    """Cached agent facts needed to validate and route events."""
+
+    role: str
+    zone: str
+
+
+@dataclass(slots=True)
+class CompanyEntry:
+    """Cached company with its agents keyed by agent_id."""
+
+    agents: dict[str, AgentEntry]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class CompanyDirectory:
+    """
+    Process-local LRU cache mapping company ids to their agents.
+
+    Entries are loaded lazily on first lookup and dropped by the write
+    endpoints that change companies or agents. The TTL bounds staleness
+    when several API workers each hold their own directory.
+    """
+
+    def __init__(self, max_companies: int, ttl_seconds: float):
+        self.max_companies = max_companies
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, CompanyEntry] = OrderedDict()
+        # Bumped on every invalidation so a load racing with a write is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, session: AsyncSession, company_id: UUID) -> CompanyEntry | None:
+        """Return the cached company entry, loading it on a miss. None if the company doesn't exist."""
+        entry = self._entries.get(company_id)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl_seconds:
+            self._entries.move_to_end(company_id)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        generation = self._generation
+        result = await session.execute(
+            select(Company.id, Agent.agent_id, Agent.role, Agent.position_zone)
+            .outerjoin(Agent, Agent.company_id == Company.id)
+            .where(Company.id == company_id)
+        )
+        rows = result.all()
+
+        if not rows:
+            self._entries.pop(company_id, None)
+            return None
+
+        entry = CompanyEntry(
+            agents={
+                row.agent_id: AgentEntry(role=row.role, zone=row.position_zone)
+                for row in rows
+                if row.agent_id is not None
+            }
+        )
+        if generation == self._generation:
+            self._store(company_id, entry)
+        return entry
+
+    def set_agent_zone(self, company_id: UUID, agent_id: str, zone: str) -> None:
+        """Update a cached agent's zone in place after a movement completes."""
+        entry = self._entries.get(company_id)
+        if entry is not None and agent_id in entry.agents:
+            entry.agents[agent_id].zone = zone
+
+    def invalidate(self, company_id: UUID) -> None:
+        """Drop a company's entry after its agents changed."""
+        self._generation += 1
+        self._entries.pop(company_id, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        self._generation += 1
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters for the health stats endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_companies,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _store(self, company_id: UUID, entry: CompanyEntry) -> None:
+        self._entries[company_id] = entry
+        self._entries.move_to_end(company_id)
+        while len(self._entries) > self.max_companies:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+company_directory = CompanyDirectory(
+    max_companies=settings.directory_cache_size,
+    ttl_seconds=settings.directory_cache_ttl_seconds,
+)
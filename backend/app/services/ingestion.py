@@ -0,0 +1,388 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import select
+
+from app.config import settings
+from app.models import Agent, Company, Event
+from app.schemas.event import EventBatchItemResult, EventCreate
+from app.services.actions import apply_plan, infer_actions, plan_movements, render_plan
+from app.services.analytics import (
+    flush_rollups,
+    record_activity,
+    record_handoff,
+    record_status_change,
+)
+from app.services.broadcaster import record_change
+from app.services.versioning import bump_company_version
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Column limits (max_length on the models) an event's fields are written into
+_EVENT_TYPE_LENGTH = 50  # Event.event_type
+_STATUS_LENGTH = 50  # Agent.status, AgentStatusRollup.status
+_TASK_LENGTH = 500  # Agent.current_task
+_ARTIFACT_LENGTH = 200  # Movement.artifact
+
+
+def column_limit_error(event_in: EventCreate) -> str | None:
+    """
+    Why `event_in` can't be written within the column limits, or None if it
+    fits. Checked before an event is accepted: one that failed at write time
+    would fail its whole transaction, or a queued flush.
+    """
+    if len(event_in.event_type) > _EVENT_TYPE_LENGTH:
+        return f"event_type is longer than {_EVENT_TYPE_LENGTH} characters"
+    payload = event_in.payload or {}
+    # Written to the agent's status for unknown event types (see actions.infer_actions)
+    state = payload.get("agent_state")
+    if state and (not isinstance(state, str) or len(state) > _STATUS_LENGTH):
+        return f"payload agent_state must be a string of at most {_STATUS_LENGTH} characters"
+    # Written to the agent's current_task (see actions._apply_status)
+    task = payload.get("task") or payload.get("thought")
+    if task and (not isinstance(task, str) or len(task) > _TASK_LENGTH):
+        return f"payload task/thought must be a string of at most {_TASK_LENGTH} characters"
+    # Written to handoff movements
+    artifact = payload.get("artifact")
+    if artifact is not None and (not isinstance(artifact, str) or len(artifact) > _ARTIFACT_LENGTH):
+        return f"payload artifact must be a string of at most {_ARTIFACT_LENGTH} characters"
+    return None
+
+
+def stage_event(
+    session: AsyncSession,
+    event_in: EventCreate,
+    agents: dict[str, Agent],
+    version: int,
+    event_id: UUID | None = None,
+    timestamp: datetime | None = None,
+) -> Event:
+    """
+    Add an event, its movements and the resulting agent updates to the session.
+    `agents` must hold the sender (and target, if any) keyed by agent_id;
+    changed rows are stamped with the company state `version`. Rollup
+    increments are staged too; the caller runs `flush_rollups` before commit.
+    """
+    plan = infer_actions(event_in.event_type, event_in.agent_id, event_in.to_agent, event_in.payload)
+
+    event = Event(
+        id=event_id or uuid4(),
+        company_id=event_in.company_id,
+        from_agent_id=event_in.agent_id,
+        to_agent_id=event_in.to_agent,
+        event_type=event_in.event_type.upper(),
+        payload=event_in.payload,
+        inferred_actions=render_plan(plan),
+        timestamp=timestamp or _utc_now(),
+    )
+    session.add(event)
+
+    previous_statuses = {agent_id: agent.status for agent_id, agent in agents.items()}
+    touched = apply_plan(plan, event_in.payload, agents)
+    movements = plan_movements(
+        plan,
+        event_in.company_id,
+        agents[event_in.agent_id],
+        agents.get(event_in.to_agent) if event_in.to_agent else None,
+        event_in.payload,
+    )
+    for agent_id in touched:
+        agents[agent_id].version = version
+    for movement in movements:
+        movement.version = version
+    session.add_all(movements)
+
+    record_activity(session, event_in.company_id, event_in.agent_id, event.timestamp, events=1)
+    for action in plan:
+        if action.verb == "handoff":
+            record_activity(session, event_in.company_id, action.agent_id, event.timestamp, handoffs_sent=1)
+            record_activity(session, event_in.company_id, action.arg, event.timestamp, handoffs_received=1)
+            record_handoff(
+                session,
+                event_in.company_id,
+                action.agent_id,
+                action.arg,
+                event.event_type,
+                (event_in.payload or {}).get("artifact"),
+                event.timestamp,
+            )
+    for agent_id in touched:
+        if agents[agent_id].status != previous_statuses[agent_id]:
+            record_status_change(
+                session, event_in.company_id, agents[agent_id], previous_statuses[agent_id], event.timestamp
+            )
+
+    # Published to stream subscribers once the transaction commits
+    for agent_id in touched:
+        agent = agents[agent_id]
+        record_change(
+            session,
+            event_in.company_id,
+            "agent_status",
+            {"agent_id": agent_id, "status": agent.status, "current_task": agent.current_task},
+        )
+    for movement in movements:
+        record_change(
+            session,
+            event_in.company_id,
+            "movement_created",
+            {
+                "id": str(movement.id),
+                "agent_id": movement.agent_id,
+                "from_zone": movement.from_zone,
+                "to_zone": movement.to_zone,
+                "purpose": movement.purpose,
+                "artifact": movement.artifact,
+                "progress": movement.progress,
+            },
+        )
+    return event
+
+
+async def ingest_events(
+    session: AsyncSession,
+    events: list[EventCreate],
+    stamps: list[tuple[UUID, datetime]] | None = None,
+) -> list[EventBatchItemResult]:
+    """
+    Validate and stage a list of events in the session (caller commits).
+    Rollup increments are written before returning.
+
+    Companies and agents referenced by the whole batch are resolved with a
+    single query, and agent updates are applied to those loaded rows.
+    `stamps` optionally pins (event_id, timestamp) per event, for events
+    acknowledged before they were written.
+    """
+    company_ids = {e.company_id for e in events}
+    agent_ids = {e.agent_id for e in events} | {e.to_agent for e in events if e.to_agent}
+
+    result = await session.execute(
+        select(Company.id, Agent)
+        .outerjoin(
+            Agent,
+            (Agent.company_id == Company.id) & Agent.agent_id.in_(agent_ids),
+        )
+        .where(Company.id.in_(company_ids))
+    )
+    known_companies: set[UUID] = set()
+    agents_by_company: dict[UUID, dict[str, Agent]] = {}
+    for company_id, agent in result.all():
+        known_companies.add(company_id)
+        if agent is not None:
+            agents_by_company.setdefault(company_id, {})[agent.agent_id] = agent
+
+    errors: list[str | None] = []
+    for event_in in events:
+        agents = agents_by_company.get(event_in.company_id, {})
+
+        error = None
+        if event_in.company_id not in known_companies:
+            error = "Company not found"
+        elif event_in.agent_id not in agents:
+            error = f"Agent '{event_in.agent_id}' not found in company"
+        elif event_in.to_agent and event_in.to_agent not in agents:
+            error = f"Target agent '{event_in.to_agent}' not found in company"
+        else:
+            error = column_limit_error(event_in)
+        errors.append(error)
+
+    # Stamped up front so the company's last_activity matches its latest event
+    stamps = stamps or [(None, _utc_now()) for _ in events]
+    accepted: dict[UUID, list[datetime]] = {}
+    for index, (event_in, error) in enumerate(zip(events, errors)):
+        if error is None:
+            accepted.setdefault(event_in.company_id, []).append(stamps[index][1])
+
+    # One version bump per touched company, in a fixed order to avoid lock-order deadlocks
+    versions = {}
+    for company_id in sorted(accepted):
+        timestamps = accepted[company_id]
+        versions[company_id] = await bump_company_version(
+            session, company_id, events=len(timestamps), last_activity=max(timestamps)
+        )
+
+    results = []
+    for index, (event_in, error) in enumerate(zip(events, errors)):
+        if error:
+            results.append(EventBatchItemResult(index=index, status="rejected", error=error))
+            continue
+
+        event_id, timestamp = stamps[index]
+        event = stage_event(
+            session,
+            event_in,
+            agents_by_company[event_in.company_id],
+            versions[event_in.company_id],
+            event_id,
+            timestamp,
+        )
+
+        results.append(
+            EventBatchItemResult(
+                index=index,
+                status="accepted",
+                event_id=event.id,
+                timestamp=event.timestamp,
+            )
+        )
+
+    await flush_rollups(session)
+    return results
+
+
+@dataclass(slots=True)
+class QueuedEvent:
+    """Validated event waiting to be written by the flusher."""
+
+    event: EventCreate
+    event_id: UUID = field(default_factory=uuid4)
+    timestamp: datetime = field(default_factory=_utc_now)
+
+
+class IngestionQueue:
+    """
+    Write-behind buffer for events acknowledged with 202 Accepted.
+
+    A single background flusher drains the queue whenever `flush_size`
+    events are waiting or `flush_interval` seconds have passed since the
+    first one arrived, and writes each batch with `ingest_events` in one
+    transaction. Events that arrive while the queue is full are dropped.
+    """
+
+    def __init__(self, max_size: int, flush_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[QueuedEvent | None] | None = None
+        self._task: asyncio.Task | None = None
+        self._session_factory: sessionmaker | None = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, session_factory: sessionmaker) -> None:
+        """Start the background flusher on the running event loop."""
+        if self.running:
+            return
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the flusher."""
+        if not self.running:
+            return
+        await self._queue.put(None)  # Sentinel: drained after all queued events
+        await self._task
+        self._task = None
+
+    def enqueue(self, event_in: EventCreate) -> QueuedEvent | None:
+        """Queue a validated event. Returns None (and counts a drop) when the queue is full."""
+        if not self.running:
+            raise RuntimeError("Ingestion queue is not running")
+        item = QueuedEvent(event=event_in)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return None
+        self.enqueued += 1
+        return item
+
+    def stats(self) -> dict:
+        """Queue depth, flush latency and drop counters for the health stats endpoint."""
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.flush_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[QueuedEvent]) -> None:
+        started = time.perf_counter()
+        try:
+            async with self._session_factory() as session:
+                results = await ingest_events(
+                    session,
+                    [item.event for item in batch],
+                    [(item.event_id, item.timestamp) for item in batch],
+                )
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                print(f"Ingestion flush error (1 event lost): {e}")
+                return
+            # Every event was acknowledged: retry the halves so only a bad event is lost
+            middle = len(batch) // 2
+            await self._flush(batch[:middle])
+            await self._flush(batch[middle:])
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        accepted = sum(1 for r in results if r.status == "accepted")
+        self.flushed += accepted
+        self.rejected += len(results) - accepted
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+
+ingestion_queue = IngestionQueue(
+    max_size=settings.ingest_queue_max_size,
+    flush_size=settings.ingest_flush_size,
+    flush_interval=settings.ingest_flush_interval_ms / 1000,
+)
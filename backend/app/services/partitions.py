@@ -0,0 +1,199 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.tasks import PeriodicTask
+from app.services.versioning import subtract_company_events
+
+DEFAULT_PARTITION = "events_default"
+_PARTITION_NAME = re.compile(r"^events_p(\d{4})_(\d{2})$")
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month `count` months after `month`."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the events partition holding `month`, e.g. events_p2026_10."""
+    return f"events_p{month:%Y_%m}"
+
+
+def partition_end(month: date) -> datetime:
+    """Exclusive upper bound of the partition for `month`."""
+    return datetime.combine(add_months(month, 1), datetime.min.time())
+
+
+async def remove_event_partition(session: AsyncSession, name: str, drop: bool = True) -> None:
+    """Detach a partition from events and, unless `drop` is False, drop its table."""
+    await session.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+    if drop:
+        await session.execute(text(f"DROP TABLE {name}"))
+
+
+async def create_event_partition(session: AsyncSession, month: date) -> bool:
+    """Create the partition for the month containing `month`. Returns False if it already exists."""
+    month = month.replace(day=1)
+    name = partition_name(month)
+    exists = await session.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if exists:
+        return False
+    await session.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF events "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+    )
+    return True
+
+
+async def list_event_partitions(session: AsyncSession) -> list[tuple[str, date]]:
+    """Attached monthly partitions as (name, first day of month), oldest first."""
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'events'"
+        )
+    )
+    partitions = []
+    for (name,) in result.all():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def ensure_event_partitions(
+    session: AsyncSession,
+    months_ahead: int,
+    today: date | None = None,
+) -> list[str]:
+    """
+    Create the default partition and monthly partitions from the current
+    month through `months_ahead`. Each partition is committed on its own, so
+    one failure (e.g. rows for that month already in the default partition)
+    doesn't block the others. Returns the names created.
+    """
+    await session.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF events DEFAULT")
+    )
+    await session.commit()
+
+    current = (today or _utc_now().date()).replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        try:
+            if await create_event_partition(session, month):
+                created.append(partition_name(month))
+            await session.commit()
+        except DBAPIError as e:
+            await session.rollback()
+            print(f"Could not create events partition {partition_name(month)}: {e}")
+    return created
+
+
+async def expire_event_partitions(
+    session: AsyncSession,
+    retention_days: int,
+    action: str = "drop",
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    Detach (and, for action "drop", drop) monthly partitions whose whole range
+    is older than `retention_days`. Returns the names removed. Rows are never
+    deleted one by one; partial months stay until they fully expire. The
+    companies' event_count drops by their events in the partition. Rows in
+    the default partition are handled by expire_default_partition_events.
+    """
+    if retention_days <= 0:
+        return []
+    cutoff = (now or _utc_now()) - timedelta(days=retention_days)
+
+    expired = []
+    for name, month in await list_event_partitions(session):
+        if partition_end(month) > cutoff:
+            break
+        counts = await session.execute(text(f"SELECT company_id, count(*) FROM {name} GROUP BY company_id"))
+        await subtract_company_events(session, dict(counts.all()))
+        await remove_event_partition(session, name, drop=action == "drop")
+        await session.commit()
+        expired.append(name)
+    return expired
+
+
+async def expire_default_partition_events(
+    session: AsyncSession,
+    retention_days: int,
+    now: datetime | None = None,
+) -> int:
+    """
+    Delete rows older than `retention_days` from the default partition, which
+    holds events for months without their own partition and so is never
+    dropped. These rows can't be detached on their own, so they are deleted
+    whatever the retention action. Returns the number of rows deleted.
+    """
+    if retention_days <= 0:
+        return 0
+    cutoff = (now or _utc_now()) - timedelta(days=retention_days)
+
+    counts = await session.execute(
+        text(
+            f"WITH removed AS (DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff RETURNING company_id) "
+            "SELECT company_id, count(*) FROM removed GROUP BY company_id"
+        ),
+        {"cutoff": cutoff},
+    )
+    removed = dict(counts.all())
+    await subtract_company_events(session, removed)
+    await session.commit()
+    return sum(removed.values())
+
+
+def event_read_horizon(company_retention_days: int | None, now: datetime | None = None) -> datetime | None:
+    """
+    Oldest event timestamp a company's logs may show, from the global and
+    per-company retention (the shorter wins). None if events are kept forever.
+
+    Rounded down to the hour so responses (and their ETags) only change hourly.
+    """
+    windows = [days for days in (settings.event_retention_days, company_retention_days) if days]
+    if not windows:
+        return None
+    horizon = (now or _utc_now()) - timedelta(days=min(windows))
+    return horizon.replace(minute=0, second=0, microsecond=0)
+
+
+def partition_maintenance_task(session_factory: sessionmaker) -> PeriodicTask:
+    """Periodic job creating upcoming partitions and expiring old ones."""
+
+    async def maintain() -> None:
+        async with session_factory() as session:
+            created = await ensure_event_partitions(session, settings.event_partition_months_ahead)
+            expired = await expire_event_partitions(
+                session, settings.event_retention_days, settings.event_retention_action
+            )
+            deleted = await expire_default_partition_events(session, settings.event_retention_days)
+        if created or expired:
+            print(f"Events partitions created: {created}, expired: {expired}")
+        if deleted:
+            print(f"Deleted {deleted} expired events from {DEFAULT_PARTITION}")
+
+    return PeriodicTask(
+        "events partition maintenance",
+        maintain,
+        interval_seconds=settings.partition_maintenance_interval_seconds,
+    )
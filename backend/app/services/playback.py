@@ -0,0 +1,247 @@
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import select
+
+from app.core.sse import SSE_KEEPALIVE, format_sse
+from app.models import Agent, Event
+from app.services.archive import (
+    EVENT_RECORD_COLUMNS,
+    ArchiveFilter,
+    archived_batches,
+    find_segments,
+)
+from app.services.projection import AgentView
+from app.services.replay import initial_view, replay_event, state_replay
+from app.services.roles import role_registry
+
+# Playback speed multipliers accepted by the API
+MIN_PLAYBACK_SPEED = 1.0
+MAX_PLAYBACK_SPEED = 50.0
+
+# Rows fetched per keyset round trip
+_PLAYBACK_BATCH_SIZE = 500
+
+
+@dataclass(slots=True)
+class PlaybackControl:
+    """Shared state between a playback stream and its control requests."""
+
+    company_id: UUID
+    start: datetime
+    end: datetime
+    speed: float
+    id: UUID = field(default_factory=uuid4)
+    paused: bool = False
+    seek_to: datetime | None = None
+    # Set whenever a control request changes something, to wake a waiting stream
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def update(self, paused: bool | None, speed: float | None, seek_to: datetime | None) -> None:
+        if paused is not None:
+            self.paused = paused
+        if speed is not None:
+            self.speed = speed
+        if seek_to is not None:
+            self.seek_to = seek_to
+        self.changed.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "playback_id": str(self.id),
+            "from": self.start.isoformat(),
+            "to": self.end.isoformat(),
+            "speed": self.speed,
+            "paused": self.paused,
+        }
+
+
+class PlaybackRegistry:
+    """Open playback streams of this process, so control requests can reach them."""
+
+    def __init__(self):
+        self._playbacks: dict[UUID, PlaybackControl] = {}
+
+    def open(self, company_id: UUID, start: datetime, end: datetime, speed: float) -> PlaybackControl:
+        control = PlaybackControl(company_id=company_id, start=start, end=end, speed=speed)
+        self._playbacks[control.id] = control
+        return control
+
+    def get(self, playback_id: UUID) -> PlaybackControl | None:
+        return self._playbacks.get(playback_id)
+
+    def close(self, playback_id: UUID) -> None:
+        self._playbacks.pop(playback_id, None)
+
+    def stats(self) -> dict:
+        return {"open": len(self._playbacks)}
+
+
+async def _recorded_events(
+    session_factory: sessionmaker,
+    company_id: UUID,
+    start: datetime,
+    end: datetime,
+) -> AsyncIterator[dict]:
+    """
+    A company's events in [start, end) in (timestamp, id) order, archived ones
+    first. Stored events are read in keyset batches, each in its own short
+    session: nothing stays open on events while the caller waits between
+    records, which would block detaching or dropping a partition.
+    """
+    archive_filter = ArchiveFilter(from_time=start, to_time=end)
+    async with session_factory() as session:
+        segments = await find_segments(session, company_id, archive_filter)
+    async for records in archived_batches(segments, archive_filter):
+        for record in records:
+            yield record
+
+    query = (
+        select(*EVENT_RECORD_COLUMNS)
+        .where(Event.company_id == company_id, Event.timestamp >= start, Event.timestamp < end)
+        .order_by(Event.timestamp, Event.id)
+        .limit(_PLAYBACK_BATCH_SIZE)
+    )
+    position = None
+    while True:
+        batch_query = query
+        if position is not None:
+            batch_query = query.where(
+                Event.timestamp >= position[0], tuple_(Event.timestamp, Event.id) > tuple_(*position)
+            )
+        async with session_factory() as session:
+            rows = (await session.execute(batch_query)).mappings().all()
+        for row in rows:
+            yield dict(row)
+        if len(rows) < _PLAYBACK_BATCH_SIZE:
+            return
+        position = (rows[-1]["timestamp"], rows[-1]["id"])
+
+
+async def _agent_states(session: AsyncSession, agents: list[AgentView]) -> list[dict]:
+    states = []
+    for agent in agents:
+        states.append(agent.to_state(await role_registry.resolve(session, agent.role)))
+    return states
+
+
+async def _join_agents(
+    session: AsyncSession,
+    company_id: UUID,
+    agents: dict[str, AgentView],
+    agent_ids: list[str | None],
+) -> list[str]:
+    """Add agents created after the roster was loaded to `agents`; returns the ids added."""
+    missing = [agent_id for agent_id in agent_ids if agent_id and agent_id not in agents]
+    if not missing:
+        return []
+    result = await session.execute(
+        select(Agent).where(Agent.company_id == company_id, Agent.agent_id.in_(missing))
+    )
+    joined = []
+    for agent in result.scalars().all():
+        agents[agent.agent_id] = initial_view(agent)
+        joined.append(agent.agent_id)
+    return joined
+
+
+async def play_events(
+    session_factory: sessionmaker,
+    control: PlaybackControl,
+    max_gap_seconds: float,
+    keepalive_seconds: float,
+    max_pause_seconds: float,
+) -> AsyncIterator[str]:
+    """
+    SSE messages replaying a company's recorded events in real time, scaled by
+    `control.speed`.
+
+    Sends "playback" (the control id), then "state" (agents just before the
+    range, or the seek point), then one "event" per recorded event with the
+    agents it changed, and "end". Gaps between events are capped at
+    `max_gap_seconds` before scaling, so long idle stretches don't stall the
+    playback. A playback paused for longer than `max_pause_seconds` ends, with
+    "paused_too_long" set on "end". No database session is held between
+    messages, so a paused or slow playback doesn't hold locks on events.
+    """
+    yield format_sse("playback", control.to_dict())
+    loop = asyncio.get_running_loop()
+    position = control.start
+
+    while True:
+        control.seek_to = None
+        async with session_factory() as session:
+            agent_list, _ = await state_replay.state_at(session, control.company_id, position - timedelta.resolution)
+            states = await _agent_states(session, agent_list)
+        agents = {agent.agent_id: agent for agent in agent_list}
+        yield format_sse("state", {"at": position.isoformat(), "agents": states})
+
+        previous = None
+        events = _recorded_events(session_factory, control.company_id, position, control.end)
+        try:
+            async for record in events:
+                # Wait the scaled gap; pausing stops the clock, a seek abandons the wait
+                remaining = 0.0
+                if previous is not None:
+                    gap = (record["timestamp"] - previous).total_seconds()
+                    remaining = min(gap, max_gap_seconds) / control.speed
+                paused_since = None
+                while (remaining > 0 or control.paused) and control.seek_to is None:
+                    if control.paused:
+                        paused_since = paused_since or loop.time()
+                        paused_left = max_pause_seconds - (loop.time() - paused_since)
+                        if paused_left <= 0:
+                            yield format_sse("end", {"to": control.end.isoformat(), "paused_too_long": True})
+                            return
+                        timeout = min(keepalive_seconds, paused_left)
+                    else:
+                        paused_since = None
+                        timeout = min(remaining, keepalive_seconds)
+                    control.changed.clear()
+                    started = loop.time()
+                    try:
+                        await asyncio.wait_for(control.changed.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        if timeout == keepalive_seconds:
+                            yield SSE_KEEPALIVE
+                    if not control.paused:
+                        remaining -= loop.time() - started
+                if control.seek_to is not None:
+                    break
+
+                async with session_factory() as session:
+                    # Agents created during the range join the roster with their first event
+                    joined = await _join_agents(
+                        session, control.company_id, agents, [record["from_agent"], record["to_agent"]]
+                    )
+                    touched = replay_event(
+                        agents, record["event_type"], record["from_agent"], record["to_agent"], record["payload"]
+                    )
+                    touched += [agent_id for agent_id in joined if agent_id not in touched]
+                    states = await _agent_states(session, [agents[agent_id] for agent_id in touched])
+                previous = record["timestamp"]
+                yield format_sse(
+                    "event",
+                    {
+                        **record,
+                        "id": str(record["id"]),
+                        "timestamp": record["timestamp"].isoformat(),
+                        "agents": states,
+                    },
+                )
+        finally:
+            await events.aclose()
+
+        if control.seek_to is None:
+            yield format_sse("end", {"to": control.end.isoformat()})
+            return
+        position = control.seek_to
+
+
+playbacks = PlaybackRegistry()
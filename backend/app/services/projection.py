@@ -0,0 +1,335 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.models import Agent, Company, Movement
+from app.services.broadcaster import on_commit
+
+
+@dataclass(slots=True)
+class AgentView:
+    """Compact in-memory copy of an agent's visible state."""
+
+    agent_id: str
+    name: str
+    role: str
+    status: str
+    zone: str
+    x: float
+    y: float
+    current_task: str | None
+    version: int
+
+    @classmethod
+    def from_row(cls, agent: Agent) -> "AgentView":
+        return cls(
+            agent_id=agent.agent_id,
+            name=agent.name,
+            role=agent.role,
+            status=agent.status,
+            zone=agent.position_zone,
+            x=agent.position_x,
+            y=agent.position_y,
+            current_task=agent.current_task,
+            version=agent.version,
+        )
+
+    def to_state(self, role_config: Any) -> dict:
+        """Agent entry of the /state response."""
+        return {
+            "agent_id": self.agent_id,
+            "role": self.role,
+            "name": self.name,
+            "status": self.status,
+            "position": {"zone": self.zone, "x": self.x, "y": self.y},
+            "current_task": self.current_task,
+            "role_config": role_config,
+        }
+
+
+@dataclass(slots=True)
+class MovementView:
+    """Compact in-memory copy of a pending movement."""
+
+    id: str
+    agent_id: str
+    from_zone: str
+    to_zone: str
+    purpose: str
+    artifact: str | None
+    progress: float
+    version: int
+
+    @classmethod
+    def from_row(cls, movement: Movement) -> "MovementView":
+        return cls(
+            id=str(movement.id),
+            agent_id=movement.agent_id,
+            from_zone=movement.from_zone,
+            to_zone=movement.to_zone,
+            purpose=movement.purpose,
+            artifact=movement.artifact,
+            progress=movement.progress,
+            version=movement.version,
+        )
+
+    def to_state(self) -> dict:
+        """Pending movement entry of the /state response."""
+        return {
+            "id": self.id,
+            "agent_id": self.agent_id,
+            "from_zone": self.from_zone,
+            "to_zone": self.to_zone,
+            "purpose": self.purpose,
+            "artifact": self.artifact,
+            "progress": self.progress,
+        }
+
+
+@dataclass(slots=True)
+class CompanyProjection:
+    """
+    Materialized /state of one company at `version`.
+
+    `removals` lists (version, kind, key) for agents and movements that left
+    the state after `history_floor`, so deltas since any version at or above
+    the floor can be answered from memory.
+    """
+
+    version: int
+    updated_at: datetime
+    agents: dict[str, AgentView]
+    movements: dict[str, MovementView]  # Pending only (progress < 1.0)
+    history_floor: int
+    removals: list[tuple[int, str, str]] = field(default_factory=list)
+
+
+class _ProjectionError(Exception):
+    """A committed change can't be applied; the projection must be rebuilt."""
+
+
+class ProjectionStore:
+    """
+    Process-local LRU of company projections kept current from committed writes.
+
+    Each committed transaction that bumped a company's version is applied to
+    that company's projection when it is exactly one version ahead; anything
+    else (a write from another worker, an unexpected change) drops the
+    projection and the next read rebuilds it from the database.
+    """
+
+    def __init__(self, max_companies: int, max_removals: int):
+        self.max_companies = max_companies
+        self.max_removals = max_removals
+        self._entries: OrderedDict[UUID, CompanyProjection] = OrderedDict()
+        # Bumped on every applied commit so a rebuild racing with a write is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.applied = 0
+        self.dropped = 0
+        self.evictions = 0
+
+    def get(self, company_id: UUID, version: int) -> CompanyProjection | None:
+        """Return the company's projection if it is current at `version`."""
+        projection = self._entries.get(company_id)
+        if projection is not None and projection.version == version:
+            self._entries.move_to_end(company_id)
+            self.hits += 1
+            return projection
+        if projection is not None:
+            del self._entries[company_id]
+        self.misses += 1
+        return None
+
+    async def load(self, session: AsyncSession, company_id: UUID) -> CompanyProjection | None:
+        """Rebuild a company's projection from the database. None if the company doesn't exist."""
+        generation = self._generation
+        result = await session.execute(
+            select(Company.version, Company.updated_at).where(Company.id == company_id)
+        )
+        row = result.first()
+        if row is None:
+            self._entries.pop(company_id, None)
+            return None
+
+        agent_result = await session.execute(select(Agent).where(Agent.company_id == company_id))
+        agents = {a.agent_id: AgentView.from_row(a) for a in agent_result.scalars().all()}
+
+        movement_result = await session.execute(
+            select(Movement).where(Movement.company_id == company_id, Movement.progress < 1.0)
+        )
+        movements = {str(m.id): MovementView.from_row(m) for m in movement_result.scalars().all()}
+
+        projection = CompanyProjection(
+            version=row.version,
+            updated_at=row.updated_at,
+            agents=agents,
+            movements=movements,
+            history_floor=row.version,
+        )
+        if generation == self._generation:
+            self._store(company_id, projection)
+        return projection
+
+    def apply_committed(
+        self,
+        versions: dict[UUID, tuple[int, datetime]],
+        changes: list[tuple[UUID, str, dict[str, Any]]],
+    ) -> None:
+        """Advance projections by one committed transaction (registered as a commit hook)."""
+        self._generation += 1
+        for company_id, (version, updated_at) in versions.items():
+            projection = self._entries.get(company_id)
+            if projection is None:
+                continue
+            if projection.version != version - 1:
+                self._drop(company_id)
+                continue
+            try:
+                for change_company_id, change_type, data in changes:
+                    if change_company_id == company_id:
+                        _CHANGE_HANDLERS[change_type](projection, data, version)
+            except (_ProjectionError, KeyError):
+                self._drop(company_id)
+                continue
+            projection.version = version
+            projection.updated_at = updated_at
+            self._trim_removals(projection)
+            self.applied += 1
+
+    def invalidate(self, company_id: UUID) -> None:
+        """Drop a company's projection."""
+        self._generation += 1
+        self._entries.pop(company_id, None)
+
+    def clear(self) -> None:
+        """Drop all projections and reset counters."""
+        self._generation += 1
+        self._entries.clear()
+        self.hits = self.misses = self.applied = self.dropped = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters for the health stats endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_companies,
+            "hits": self.hits,
+            "misses": self.misses,
+            "applied": self.applied,
+            "dropped": self.dropped,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _drop(self, company_id: UUID) -> None:
+        del self._entries[company_id]
+        self.dropped += 1
+
+    def _store(self, company_id: UUID, projection: CompanyProjection) -> None:
+        self._entries[company_id] = projection
+        self._entries.move_to_end(company_id)
+        while len(self._entries) > self.max_companies:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_removals(self, projection: CompanyProjection) -> None:
+        if len(projection.removals) <= self.max_removals:
+            return
+        cut = len(projection.removals) - self.max_removals // 2
+        projection.history_floor = projection.removals[cut - 1][0]
+        del projection.removals[:cut]
+
+
+def _agent_status(projection: CompanyProjection, data: dict, version: int) -> None:
+    agent = projection.agents.get(data["agent_id"])
+    if agent is None:
+        raise _ProjectionError
+    agent.status = data["status"]
+    agent.current_task = data["current_task"]
+    agent.version = version
+
+
+def _agent_added(projection: CompanyProjection, data: dict, version: int) -> None:
+    projection.agents[data["agent_id"]] = AgentView(
+        agent_id=data["agent_id"],
+        name=data["name"],
+        role=data["role"],
+        status=data["status"],
+        zone=data["zone"],
+        x=data["x"],
+        y=data["y"],
+        current_task=None,
+        version=version,
+    )
+
+
+def _agent_removed(projection: CompanyProjection, data: dict, version: int) -> None:
+    agent_id = data["agent_id"]
+    projection.agents.pop(agent_id, None)
+    projection.removals.append((version, "agent", agent_id))
+    for movement_id in [m.id for m in projection.movements.values() if m.agent_id == agent_id]:
+        del projection.movements[movement_id]
+        projection.removals.append((version, "movement", movement_id))
+
+
+def _movement_created(projection: CompanyProjection, data: dict, version: int) -> None:
+    projection.movements[data["id"]] = MovementView(
+        id=data["id"],
+        agent_id=data["agent_id"],
+        from_zone=data["from_zone"],
+        to_zone=data["to_zone"],
+        purpose=data["purpose"],
+        artifact=data["artifact"],
+        progress=data["progress"],
+        version=version,
+    )
+
+
+def _movement_progress(projection: CompanyProjection, data: dict, version: int) -> None:
+    movement_id = data["movement_id"]
+    movement = projection.movements.get(movement_id)
+    if data["progress"] >= 1.0:
+        projection.movements.pop(movement_id, None)
+        projection.removals.append((version, "movement", movement_id))
+    elif movement is None:
+        raise _ProjectionError
+    else:
+        movement.progress = data["progress"]
+        movement.version = version
+
+
+def _movement_completed(projection: CompanyProjection, data: dict, version: int) -> None:
+    movement_id = data["movement_id"]
+    projection.movements.pop(movement_id, None)
+    projection.removals.append((version, "movement", movement_id))
+    agent = projection.agents.get(data["agent_id"])
+    if agent is not None:
+        agent.zone = data["zone"]
+        agent.status = data["status"]
+        agent.version = version
+
+
+_CHANGE_HANDLERS: dict[str, Callable[[CompanyProjection, dict, int], None]] = {
+    "agent_status": _agent_status,
+    "agent_added": _agent_added,
+    "agent_removed": _agent_removed,
+    "movement_created": _movement_created,
+    "movement_progress": _movement_progress,
+    "movement_completed": _movement_completed,
+}
+
+
+company_projections = ProjectionStore(
+    max_companies=settings.state_projection_size,
+    max_removals=settings.state_projection_max_removals,
+)
+on_commit(company_projections.apply_committed)
@@ -0,0 +1,382 @@
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import select
+
+from app.config import settings
+from app.core.tasks import PeriodicTask
+from app.models import Agent, Company, Event, StateSnapshot
+from app.services.actions import apply_plan, infer_actions
+from app.services.archive import ArchiveFilter, archived_batches, find_segments
+from app.services.broadcaster import on_commit
+from app.services.projection import AgentView
+
+# Payload keys the action inference reads; replay fetches only these
+REPLAY_PAYLOAD_KEYS = ("task", "thought", "agent_state", "event_name")
+
+# Events fetched per keyset round trip
+_REPLAY_BATCH_SIZE = 5000
+
+# Queued ingestion stamps events before they are written, so history this
+# recent may still change and is not checkpointed
+_CHECKPOINT_SETTLE = timedelta(seconds=60)
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def initial_view(agent: Agent) -> AgentView:
+    """An agent as created: idle in its role zone."""
+    return AgentView(
+        agent_id=agent.agent_id,
+        name=agent.name,
+        role=agent.role,
+        status="idle",
+        zone=agent.role,
+        x=agent.position_x,
+        y=agent.position_y,
+        current_task=None,
+        version=0,
+    )
+
+
+def replay_event(
+    agents: dict[str, AgentView],
+    event_type: str,
+    from_agent: str | None,
+    to_agent: str | None,
+    payload: dict | None,
+) -> list[str]:
+    """
+    Apply one persisted event to agent views, as ingestion applied it.
+
+    Movements started by the event are taken as finished, the way
+    complete_movement leaves agents: at the walk target, then back home and
+    idle after a return. Returns the ids of agents whose view changed.
+    """
+    plan = infer_actions(event_type, from_agent, to_agent, payload)
+    touched = apply_plan(plan, payload, agents)
+    for action in plan:
+        agent = agents.get(action.agent_id)
+        if agent is None:
+            continue
+        if action.verb == "walk_to":
+            target = agents.get(action.arg)
+            if target is not None:
+                agent.zone = target.zone
+        elif action.verb == "return":
+            agent.zone = agent.role
+            agent.status = "idle"
+        else:
+            continue
+        if action.agent_id not in touched:
+            touched.append(action.agent_id)
+    return touched
+
+
+# An agent's replayed state: (status, zone, current_task)
+AgentReplayState = tuple[str, str, str | None]
+
+
+@dataclass(slots=True)
+class ReplayCheckpoint:
+    """Agent states after replaying every event up to `position` (timestamp, id)."""
+
+    position: tuple[datetime, UUID]
+    agents: dict[str, AgentReplayState]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: StateSnapshot) -> "ReplayCheckpoint":
+        return cls(
+            position=(snapshot.position_timestamp, snapshot.position_event_id),
+            agents={agent_id: tuple(state) for agent_id, state in snapshot.agents.items()},
+        )
+
+
+def _replay_states(agents: dict[str, AgentView]) -> dict[str, AgentReplayState]:
+    return {agent_id: (view.status, view.zone, view.current_task) for agent_id, view in agents.items()}
+
+
+@dataclass(slots=True)
+class _ReplayRun:
+    agents: dict[str, AgentView]
+    position: tuple[datetime, UUID] | None
+    settled: datetime
+    checkpoints: list[ReplayCheckpoint] = field(default_factory=list)
+    since_checkpoint: int = 0
+    events: int = 0
+
+    def apply(self, timestamp, event_id, event_type, from_agent, to_agent, payload, interval: int) -> None:
+        replay_event(self.agents, event_type, from_agent, to_agent, payload)
+        self.position = (timestamp, event_id)
+        self.events += 1
+        self.since_checkpoint += 1
+        if self.since_checkpoint >= interval and timestamp < self.settled:
+            self.checkpoints.append(ReplayCheckpoint(self.position, _replay_states(self.agents)))
+            self.since_checkpoint = 0
+
+
+class StateReplay:
+    """
+    Rebuild a company's agent state at a past time by replaying its events.
+
+    Replay starts from the nearest earlier persisted snapshot (see
+    snapshot_company_states) or in-memory checkpoint. Every
+    `checkpoint_interval` replayed events the agent states are checkpointed in
+    memory, so scrubbing back and forth only replays the events since the
+    nearest one. Checkpoints of a company are dropped when its history changes
+    (an agent and its events are deleted).
+    """
+
+    def __init__(self, max_companies: int, checkpoint_interval: int, max_checkpoints: int):
+        self.max_companies = max_companies
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        self._checkpoints: OrderedDict[UUID, list[ReplayCheckpoint]] = OrderedDict()
+        self.replays = 0
+        self.snapshot_hits = 0
+        self.checkpoint_hits = 0
+        self.events_replayed = 0
+
+    async def state_at(
+        self,
+        session: AsyncSession,
+        company_id: UUID,
+        at: datetime,
+    ) -> tuple[list[AgentView], tuple[datetime, UUID] | None]:
+        """
+        Agent views after every event with timestamp <= `at` (naive UTC), and
+        the (timestamp, id) position of the last such event.
+        """
+        agent_result = await session.execute(
+            select(Agent).where(Agent.company_id == company_id, Agent.created_at <= at)
+        )
+        roster = {agent.agent_id: agent for agent in agent_result.scalars().all()}
+
+        checkpoints = self._checkpoints.get(company_id, [])
+        index = bisect_right(checkpoints, at, key=lambda checkpoint: checkpoint.position[0])
+        start = checkpoints[index - 1] if index else None
+        snapshot_query = select(StateSnapshot).where(
+            StateSnapshot.company_id == company_id, StateSnapshot.position_timestamp <= at
+        )
+        if start is not None:
+            snapshot_query = snapshot_query.where(StateSnapshot.position_timestamp > start.position[0])
+        snapshot_result = await session.execute(
+            snapshot_query.order_by(StateSnapshot.position_timestamp.desc()).limit(1)
+        )
+        snapshot = snapshot_result.scalars().first()
+        if snapshot is not None:
+            start = ReplayCheckpoint.from_snapshot(snapshot)
+            self.snapshot_hits += 1
+        elif start is not None:
+            self.checkpoint_hits += 1
+
+        agents = {}
+        for agent_id, agent in roster.items():
+            view = initial_view(agent)
+            if start is not None and agent_id in start.agents:
+                view.status, view.zone, view.current_task = start.agents[agent_id]
+            agents[agent_id] = view
+
+        run = _ReplayRun(agents, start.position if start else None, _utc_now() - _CHECKPOINT_SETTLE)
+        await self._replay_archived(session, company_id, at, run)
+        await self._replay_stored(session, company_id, at, run)
+
+        self.replays += 1
+        self.events_replayed += run.events
+        if run.checkpoints:
+            self._save_checkpoints(company_id, run.checkpoints)
+        return list(run.agents.values()), run.position
+
+    async def _replay_archived(self, session: AsyncSession, company_id: UUID, at: datetime, run: _ReplayRun) -> None:
+        # Archived events are all older than the ones still in Postgres
+        archive_filter = ArchiveFilter(
+            from_time=run.position[0] if run.position else None,
+            to_time=at + timedelta(microseconds=1),
+        )
+        segments = await find_segments(session, company_id, archive_filter)
+        async for records in archived_batches(segments, archive_filter):
+            for record in records:
+                if run.position is not None and (record["timestamp"], record["id"]) <= run.position:
+                    continue
+                run.apply(
+                    record["timestamp"],
+                    record["id"],
+                    record["event_type"],
+                    record["from_agent"],
+                    record["to_agent"],
+                    record["payload"],
+                    self.checkpoint_interval,
+                )
+
+    async def _replay_stored(self, session: AsyncSession, company_id: UUID, at: datetime, run: _ReplayRun) -> None:
+        payload = func.jsonb_strip_nulls(
+            func.jsonb_build_object(*(part for key in REPLAY_PAYLOAD_KEYS for part in (key, Event.payload[key])))
+        )
+        query = (
+            select(
+                Event.timestamp,
+                Event.id,
+                Event.event_type,
+                Event.from_agent_id,
+                Event.to_agent_id,
+                payload.label("payload"),
+            )
+            .where(Event.company_id == company_id, Event.timestamp <= at)
+            .order_by(Event.timestamp, Event.id)
+            .limit(_REPLAY_BATCH_SIZE)
+        )
+        while True:
+            batch_query = query
+            if run.position is not None:
+                # The plain lower bound lets the planner skip older partitions
+                batch_query = query.where(
+                    Event.timestamp >= run.position[0],
+                    tuple_(Event.timestamp, Event.id) > tuple_(*run.position),
+                )
+            rows = (await session.execute(batch_query)).all()
+            for row in rows:
+                run.apply(*row, self.checkpoint_interval)
+            if len(rows) < _REPLAY_BATCH_SIZE:
+                return
+
+    def _save_checkpoints(self, company_id: UUID, new: list[ReplayCheckpoint]) -> None:
+        checkpoints = self._checkpoints.setdefault(company_id, [])
+        for checkpoint in new:
+            insort(checkpoints, checkpoint, key=lambda c: c.position)
+        if len(checkpoints) > self.max_checkpoints:
+            # Thin out evenly rather than forgetting whole stretches of history
+            checkpoints[:] = checkpoints[1::2]
+        self._checkpoints.move_to_end(company_id)
+        while len(self._checkpoints) > self.max_companies:
+            self._checkpoints.popitem(last=False)
+
+    def apply_committed(
+        self,
+        versions: dict[UUID, tuple[int, datetime]],
+        changes: list[tuple[UUID, str, dict[str, Any]]],
+    ) -> None:
+        """Drop checkpoints of companies whose history changed (registered as a commit hook)."""
+        for company_id, change_type, _ in changes:
+            if change_type == "agent_removed":
+                self.invalidate(company_id)
+
+    def invalidate(self, company_id: UUID) -> None:
+        self._checkpoints.pop(company_id, None)
+
+    def clear(self) -> None:
+        self._checkpoints.clear()
+
+    def stats(self) -> dict:
+        """Counters for the health stats endpoint."""
+        return {
+            "companies": len(self._checkpoints),
+            "checkpoints": sum(len(checkpoints) for checkpoints in self._checkpoints.values()),
+            "replays": self.replays,
+            "snapshot_hits": self.snapshot_hits,
+            "checkpoint_hits": self.checkpoint_hits,
+            "events_replayed": self.events_replayed,
+        }
+
+
+state_replay = StateReplay(
+    max_companies=settings.state_replay_cache_size,
+    checkpoint_interval=settings.state_replay_checkpoint_interval,
+    max_checkpoints=settings.state_replay_max_checkpoints,
+)
+on_commit(state_replay.apply_committed)
+
+
+async def snapshot_company_states(
+    session: AsyncSession,
+    every_events: int,
+    max_age: timedelta,
+    now: datetime | None = None,
+) -> int:
+    """
+    Persist a replayed state snapshot for each company that has at least
+    `every_events` events since its latest snapshot, or any new events and a
+    latest snapshot (or first event) older than `max_age`. Returns the number
+    taken.
+    """
+    settled = (now or _utc_now()) - _CHECKPOINT_SETTLE
+    latest = (
+        select(func.max(StateSnapshot.position_timestamp).label("position"))
+        .where(StateSnapshot.company_id == Company.id)
+        .lateral()
+    )
+    # Candidates from the denormalized counters: companies with events newer
+    # than their latest snapshot. Idle, already snapshotted or empty companies
+    # are skipped without counting
+    result = await session.execute(
+        select(Company.id, latest.c.position)
+        .join(latest, true())
+        .where(
+            Company.event_count > 0,
+            Company.last_activity.is_not(None),
+            latest.c.position.is_(None) | (Company.last_activity > latest.c.position),
+        )
+    )
+
+    taken = 0
+    for company_id, position in result.all():
+        new_events = select(Event.id).where(Event.company_id == company_id, Event.timestamp <= settled)
+        if position is not None:
+            new_events = new_events.where(Event.timestamp > position)
+        # Count no further than the threshold
+        count = await session.scalar(
+            select(func.count()).select_from(new_events.limit(every_events).subquery())
+        )
+        if count < every_events:
+            if not count:
+                continue
+            # Age of the unsnapshotted history: since the last snapshot, or the first event
+            since = position or await session.scalar(
+                select(func.min(Event.timestamp)).where(Event.company_id == company_id)
+            )
+            if settled - since < max_age:
+                continue
+
+        agents, last = await state_replay.state_at(session, company_id, settled)
+        if last is None:
+            continue
+        session.add(
+            StateSnapshot(
+                company_id=company_id,
+                position_timestamp=last[0],
+                position_event_id=last[1],
+                agents=_replay_states({view.agent_id: view for view in agents}),
+            )
+        )
+        await session.commit()
+        taken += 1
+    return taken
+
+
+def state_snapshot_task(session_factory: sessionmaker) -> PeriodicTask:
+    """Periodic job persisting state snapshots of active companies."""
+
+    async def snapshot() -> None:
+        async with session_factory() as session:
+            taken = await snapshot_company_states(
+                session,
+                settings.state_snapshot_every_events,
+                timedelta(minutes=settings.state_snapshot_max_age_minutes),
+            )
+        if taken:
+            print(f"State snapshots taken: {taken}")
+
+    return PeriodicTask(
+        "state snapshots",
+        snapshot,
+        interval_seconds=settings.state_snapshot_interval_seconds,
+    )
@@ -0,0 +1,186 @@
+import hashlib
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import RoleConfig
+from app.models.role_config import CUSTOM_ROLE_COLORS, DEFAULT_ROLES
+from app.schemas.company import RoleConfigResponse
+
+_DEFAULT_ROLES_BY_ID = {role["role_id"]: role for role in DEFAULT_ROLES}
+
+# pg_advisory_xact_lock key serializing custom role color assignment
+_COLOR_INDEX_LOCK_KEY = 0x524F4C45  # "ROLE"
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _to_response(role_config: RoleConfig) -> RoleConfigResponse:
+    return RoleConfigResponse(
+        role_id=role_config.role_id,
+        display_name=role_config.display_name,
+        color=role_config.color,
+        zone_color=role_config.zone_color,
+        is_default=role_config.is_default,
+    )
+
+
+class RoleRegistry:
+    """
+    Process-wide cache of role configs.
+
+    Role configs never change once created, so after the first lookup every
+    read is a dict access. Missing roles are created in their own short
+    transaction so the cached config is always one that was committed.
+    """
+
+    def __init__(self):
+        self._configs: dict[str, RoleConfigResponse] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def preload(self, session: AsyncSession) -> None:
+        """Seed DEFAULT_ROLES if missing and cache every stored role config."""
+        await session.execute(
+            pg_insert(RoleConfig)
+            .values([{"id": uuid4(), "created_at": _utc_now(), **role} for role in DEFAULT_ROLES])
+            .on_conflict_do_nothing(index_elements=["role_id"])
+        )
+        await session.commit()
+
+        result = await session.execute(select(RoleConfig))
+        for role_config in result.scalars().all():
+            self._configs[role_config.role_id] = _to_response(role_config)
+
+    def get(self, role: str) -> RoleConfigResponse | None:
+        """Cached config for a role, without touching the database."""
+        return self._configs.get(role)
+
+    async def resolve(self, session: AsyncSession, role: str) -> RoleConfigResponse:
+        """Return a role's config, creating it for unknown (custom) roles."""
+        config = self._configs.get(role)
+        if config is not None:
+            self.hits += 1
+            return config
+
+        self.misses += 1
+        async with AsyncSession(session.bind, expire_on_commit=False) as role_session:
+            role_config = await self._load(role_session, role)
+            if role_config is None:
+                role_config = await self._create(role_session, role)
+            await role_session.commit()
+
+        config = _to_response(role_config)
+        self._configs[role] = config
+        return config
+
+    def clear(self) -> None:
+        """Drop all cached configs and reset counters."""
+        self._configs.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters for the health stats endpoint."""
+        return {"size": len(self._configs), "hits": self.hits, "misses": self.misses}
+
+    async def _load(self, session: AsyncSession, role: str) -> RoleConfig | None:
+        result = await session.execute(select(RoleConfig).where(RoleConfig.role_id == role))
+        return result.scalars().first()
+
+    async def _create(self, session: AsyncSession, role: str) -> RoleConfig:
+        values = _DEFAULT_ROLES_BY_ID.get(role)
+        if values is None:
+            # Serialize color assignment so concurrent custom roles get distinct palette slots
+            await session.execute(select(func.pg_advisory_xact_lock(_COLOR_INDEX_LOCK_KEY)))
+            result = await session.execute(
+                select(func.count(RoleConfig.id)).where(RoleConfig.is_default == False)  # noqa: E712
+            )
+            custom_role_count = result.scalar_one()
+
+            # Use extended palette if available, otherwise generate HSL from hash
+            if custom_role_count < len(CUSTOM_ROLE_COLORS):
+                color, zone_color = CUSTOM_ROLE_COLORS[custom_role_count]
+            else:
+                color, zone_color = _generate_hsl_color_from_hash(role)
+
+            values = {
+                "role_id": role,
+                # Convert snake_case to Title Case
+                "display_name": " ".join(word.capitalize() for word in role.split("_")),
+                "color": color,
+                "zone_color": zone_color,
+                "is_default": False,
+            }
+
+        # A concurrent creator may win; its row is then the one returned
+        await session.execute(
+            pg_insert(RoleConfig)
+            .values(id=uuid4(), created_at=_utc_now(), **values)
+            .on_conflict_do_nothing(index_elements=["role_id"])
+        )
+        return await self._load(session, role)
+
+
+role_registry = RoleRegistry()
+
+
+def _generate_hsl_color_from_hash(role: str) -> tuple[str, str]:
+    """Generate deterministic HSL color from role name hash."""
+    # Hash the role name for deterministic color
+    hash_bytes = hashlib.md5(role.encode()).digest()
+    hash_int = int.from_bytes(hash_bytes[:4], 'big')
+
+    # Generate HSL values
+    # Hue: 0-360 (full spectrum)
+    # Saturation: 60-80% (vibrant but not oversaturated)
+    # Lightness: 45-55% (visible on dark background)
+    hue = hash_int % 360
+    saturation = 60 + (hash_int >> 8) % 20  # 60-80%
+    lightness = 45 + (hash_int >> 16) % 10  # 45-55%
+
+    # Convert HSL to hex color
+    color_hex = _hsl_to_hex(hue, saturation, lightness)
+    zone_color = f"rgba({_hsl_to_rgb(hue, saturation, lightness)}, 0.3)"
+
+    return color_hex, zone_color
+
+
+def _hsl_to_hex(h: int, s: int, l: int) -> str:
+    """Convert HSL to hex color string."""
+    r, g, b = _hsl_to_rgb_values(h, s / 100, l / 100)
+    return f"#{int(r):02x}{int(g):02x}{int(b):02x}".upper()
+
+
+def _hsl_to_rgb(h: int, s: int, l: int) -> str:
+    """Convert HSL to RGB string for rgba()."""
+    r, g, b = _hsl_to_rgb_values(h, s / 100, l / 100)
+    return f"{int(r)}, {int(g)}, {int(b)}"
+
+
+def _hsl_to_rgb_values(h: int, s: float, l: float) -> tuple[float, float, float]:
+    """Convert HSL to RGB values (0-255)."""
+    c = (1 - abs(2 * l - 1)) * s
+    x = c * (1 - abs((h / 60) % 2 - 1))
+    m = l - c / 2
+
+    if h < 60:
+        r, g, b = c, x, 0
+    elif h < 120:
+        r, g, b = x, c, 0
+    elif h < 180:
+        r, g, b = 0, c, x
+    elif h < 240:
+        r, g, b = 0, x, c
+    elif h < 300:
+        r, g, b = x, 0, c
+    else:
+        r, g, b = c, 0, x
+
+    return (r + m) * 255, (g + m) * 255, (b + m) * 255
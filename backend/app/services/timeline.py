@@ -0,0 +1,209 @@
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.models import Event
+from app.services.archive import ArchiveFilter, archived_batches, find_segments
+from app.services.broadcaster import on_commit
+
+# Bucket boundaries are aligned to this origin (date_bin's own default)
+TIMELINE_ORIGIN = datetime(2000, 1, 1)
+
+# group_by values and the event column (or archived record key) they group on
+TIMELINE_GROUPS = {"event_type": "event_type", "agent": "from_agent"}
+_GROUP_COLUMNS = {"event_type": Event.event_type, "agent": Event.from_agent_id}
+
+_BUCKET_WIDTH = re.compile(r"^(\d+)([smhd])$")
+_BUCKET_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+# A bucket is closed, and its counts cached, once it ended this long ago:
+# later writes (e.g. queued events) are stamped when they were received
+_BUCKET_SETTLE = timedelta(seconds=60)
+
+# {bucket start: {group key: count}}; the key is "" without group_by
+BucketCounts = dict[datetime, dict[str, int]]
+
+
+def parse_bucket_width(value: str) -> Optional[timedelta]:
+    """A bucket width like "30s", "1m", "1h" or "1d". None if invalid."""
+    match = _BUCKET_WIDTH.match(value)
+    if not match or int(match[1]) == 0:
+        return None
+    return timedelta(**{_BUCKET_UNITS[match[2]]: int(match[1])})
+
+
+def bucket_start(at: datetime, width: timedelta) -> datetime:
+    """Start of the bucket containing `at`, like date_bin(width, at, TIMELINE_ORIGIN)."""
+    return TIMELINE_ORIGIN + (at - TIMELINE_ORIGIN) // width * width
+
+
+def bucket_ceil(at: datetime, width: timedelta) -> datetime:
+    """`at` if it is a bucket boundary, else the start of the next bucket."""
+    start = bucket_start(at, width)
+    return start if start == at else start + width
+
+
+async def count_buckets(
+    session: AsyncSession,
+    company_id: UUID,
+    width: timedelta,
+    group_by: Optional[str],
+    start: datetime,
+    end: datetime,
+) -> BucketCounts:
+    """
+    Event counts per bucket in [start, end), bucket-aligned, from Postgres and
+    archived segments. Postgres rows are binned with date_bin; the
+    (company_id, timestamp) index covers event_type and from_agent_id, so
+    this is an index-only scan.
+    """
+    counts: BucketCounts = {}
+
+    archive_filter = ArchiveFilter(from_time=start, to_time=end)
+    async for records in archived_batches(
+        await find_segments(session, company_id, archive_filter), archive_filter
+    ):
+        for record in records:
+            bucket = counts.setdefault(bucket_start(record["timestamp"], width), {})
+            key = (record[TIMELINE_GROUPS[group_by]] or "") if group_by else ""
+            bucket[key] = bucket.get(key, 0) + 1
+
+    binned = func.date_bin(width, Event.timestamp, TIMELINE_ORIGIN).label("bucket")
+    columns = [binned]
+    if group_by:
+        columns.append(_GROUP_COLUMNS[group_by].label("key"))
+    query = (
+        select(*columns, func.count().label("count"))
+        .where(Event.company_id == company_id, Event.timestamp >= start, Event.timestamp < end)
+        .group_by(*columns)
+    )
+    for row in (await session.execute(query)).all():
+        bucket = counts.setdefault(row.bucket, {})
+        key = (row.key or "") if group_by else ""
+        bucket[key] = bucket.get(key, 0) + row.count
+    return counts
+
+
+@dataclass(slots=True)
+class _CachedRange:
+    """Counts of the closed buckets in [start, end); buckets without events are absent."""
+
+    start: datetime
+    end: datetime
+    counts: BucketCounts = field(default_factory=dict)
+
+
+class TimelineCache:
+    """
+    Closed timeline buckets per (company, bucket width, group_by), LRU.
+
+    A bucket that ended more than a minute ago no longer changes, so its
+    counts are kept and only the still-open tail of a range is counted
+    again. Each entry covers one contiguous range of buckets, extended as
+    neighbouring ranges are requested, up to `max_range_buckets`. A
+    company's entries are dropped when its history changes (an agent and
+    its events are deleted).
+    """
+
+    def __init__(self, max_entries: int, max_range_buckets: int):
+        self.max_entries = max_entries
+        self.max_range_buckets = max_range_buckets
+        self._entries: OrderedDict[tuple, _CachedRange] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def counts(
+        self,
+        session: AsyncSession,
+        company_id: UUID,
+        width: timedelta,
+        group_by: Optional[str],
+        start: datetime,
+        end: datetime,
+        now: datetime,
+    ) -> BucketCounts:
+        """Counts per bucket in the bucket-aligned range [start, end)."""
+        closed_end = min(end, bucket_start(now - _BUCKET_SETTLE, width))
+        if closed_end <= start:
+            self.misses += 1
+            return await count_buckets(session, company_id, width, group_by, start, end)
+
+        key = (company_id, width, group_by)
+        cached = self._entries.get(key)
+        if (
+            cached is None
+            or cached.end < start
+            or closed_end < cached.start
+            or max(cached.end, closed_end) - min(cached.start, start) > width * self.max_range_buckets
+        ):
+            # Nothing cached, not adjacent to the request, or grown too long: start a new range
+            cached = _CachedRange(start, start)
+            self._entries[key] = cached
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        missed = False
+        if start < cached.start:
+            cached.counts.update(
+                await count_buckets(session, company_id, width, group_by, start, cached.start)
+            )
+            cached.start = start
+            missed = True
+        if cached.end < closed_end:
+            cached.counts.update(
+                await count_buckets(session, company_id, width, group_by, cached.end, closed_end)
+            )
+            cached.end = closed_end
+            missed = True
+        if missed:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        counts = {bucket: c for bucket, c in cached.counts.items() if start <= bucket < closed_end}
+        if closed_end < end:
+            counts.update(await count_buckets(session, company_id, width, group_by, closed_end, end))
+        return counts
+
+    def apply_committed(
+        self,
+        versions: dict[UUID, tuple[int, datetime]],
+        changes: list[tuple[UUID, str, dict[str, Any]]],
+    ) -> None:
+        """Drop entries of companies whose history changed (registered as a commit hook)."""
+        for company_id, change_type, _ in changes:
+            if change_type == "agent_removed":
+                self.invalidate(company_id)
+
+    def invalidate(self, company_id: UUID) -> None:
+        for key in [key for key in self._entries if key[0] == company_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters for the health stats endpoint."""
+        return {
+            "entries": len(self._entries),
+            "buckets": sum(len(entry.counts) for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+timeline_cache = TimelineCache(
+    max_entries=settings.timeline_cache_size,
+    # A few responses' worth of buckets per entry
+    max_range_buckets=settings.timeline_max_buckets * 4,
+)
+on_commit(timeline_cache.apply_committed)
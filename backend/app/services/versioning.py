@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import Company, CompanyListMarker, StateTombstone
+from app.services.broadcaster import record_version
+
+
+def _utc_now() -> datetime:
+    """Return current UTC time as naive datetime (for TIMESTAMP WITHOUT TIME ZONE)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def bump_company_version(
+    session: AsyncSession,
+    company_id: UUID,
+    agents: int = 0,
+    events: int = 0,
+    last_activity: datetime | None = None,
+) -> int:
+    """
+    Increment and return the company's state version.
+
+    The UPDATE holds the company row lock until commit, so concurrent writers
+    to one company commit in version order and a delta reader never misses a
+    lower version that commits later. Rows changed in the same transaction
+    should be stamped with the returned version. Also bumps updated_at, the
+    change marker for the company list, and adds the `agents` and `events`
+    created (or removed, if negative) to the list's denormalized counters.
+    """
+    now = _utc_now()
+    values = {"version": Company.version + 1, "updated_at": now}
+    if agents:
+        values["agent_count"] = Company.agent_count + agents
+    if events:
+        values["event_count"] = Company.event_count + events
+    if last_activity is not None:
+        # Queued events may be written after later ones
+        values["last_activity"] = func.greatest(Company.last_activity, last_activity)
+    result = await session.execute(
+        update(Company)
+        .where(Company.id == company_id)
+        .values(**values)
+        .returning(Company.version)
+        .execution_options(synchronize_session=False)
+    )
+    version = result.scalar_one()
+    record_version(session, company_id, version, now)
+    return version
+
+
+async def bump_company_list_generation(session: AsyncSession) -> None:
+    """Mark the company list changed by a company being created or deleted in this transaction."""
+    statement = postgresql.insert(CompanyListMarker).values(id=1, generation=1)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["id"], set_={"generation": CompanyListMarker.generation + 1}
+        )
+    )
+
+
+async def subtract_company_events(session: AsyncSession, removed: dict[UUID, int]) -> None:
+    """Take events deleted or expired in this transaction off the companies' event_count."""
+    now = _utc_now()
+    for company_id, count in sorted(removed.items()):
+        if count:
+            await session.execute(
+                update(Company)
+                .where(Company.id == company_id)
+                .values(event_count=Company.event_count - count, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+
+async def record_removals(
+    session: AsyncSession,
+    company_id: UUID,
+    kind: str,
+    keys: list[str],
+    version: int,
+) -> None:
+    """Write tombstones for agents or movements removed at `version`."""
+    if not keys:
+        return
+    now = _utc_now()
+    await session.execute(
+        insert(StateTombstone),
+        [
+            {
+                "id": uuid4(),
+                "company_id": company_id,
+                "kind": kind,
+                "key": key,
+                "version": version,
+                "created_at": now,
+            }
+            for key in keys
+        ],
+    )
+
+
+async def prune_tombstones(session: AsyncSession, company_id: UUID, max_age_seconds: int) -> None:
+    """
+    Drop tombstones older than `max_age_seconds` and raise the company's
+    min_delta_version so clients behind the pruned range get a full snapshot.
+    """
+    cutoff = _utc_now() - timedelta(seconds=max_age_seconds)
+    result = await session.execute(
+        select(func.max(StateTombstone.version)).where(
+            StateTombstone.company_id == company_id,
+            StateTombstone.created_at < cutoff,
+        )
+    )
+    pruned_version = result.scalar()
+    if pruned_version is None:
+        return
+
+    await session.execute(
+        StateTombstone.__table__.delete().where(
+            StateTombstone.company_id == company_id,
+            StateTombstone.version <= pruned_version,
+        )
+    )
+    await session.execute(
+        update(Company)
+        .where(Company.id == company_id, Company.min_delta_version < pruned_version)
+        .values(min_delta_version=pruned_version)
+        .execution_options(synchronize_session=False)
+    )
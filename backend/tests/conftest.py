@@ -11,7 +11,12 @@ from sqlmodel import SQLModel, text
 
 from app.main import app
 from app.config import settings
-from app.database import get_session
+from app.database import get_session, get_session_factory
+from app.services.directory import company_directory
+from app.services.projection import company_projections
+from app.services.replay import state_replay
+from app.services.roles import role_registry
+from app.services.timeline import timeline_cache
 
 # Import all models to ensure they're registered with SQLModel
 from app.models.company import Company
@@ -39,9 +44,16 @@ async def client(test_engine) -> AsyncGenerator[AsyncClient, None]:
     # Truncate all tables before test using actual table names
     async with test_engine.begin() as conn:
         await conn.execute(
-            text("TRUNCATE TABLE events, movements, agents, role_configs, companies RESTART IDENTITY CASCADE")
+            text("TRUNCATE TABLE events, event_segments, movements, agents, role_configs, state_tombstones, state_snapshots, agent_status_rollups, agent_activity_rollups, handoff_edges, companies RESTART IDENTITY CASCADE")
         )
 
+    # Drop cached rows from previous tests
+    company_directory.clear()
+    company_projections.clear()
+    state_replay.clear()
+    timeline_cache.clear()
+    role_registry.clear()
+
     # Create session factory for this test
     TestAsyncSession = sessionmaker(
         test_engine,
@@ -56,6 +68,7 @@ async def client(test_engine) -> AsyncGenerator[AsyncClient, None]:
 
     # Override the dependency
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = lambda: TestAsyncSession
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -66,7 +79,7 @@ async def client(test_engine) -> AsyncGenerator[AsyncClient, None]:
     # Cleanup after test
     async with test_engine.begin() as conn:
         await conn.execute(
-            text("TRUNCATE TABLE events, movements, agents, role_configs, companies RESTART IDENTITY CASCADE")
+            text("TRUNCATE TABLE events, event_segments, movements, agents, role_configs, state_tombstones, state_snapshots, agent_status_rollups, agent_activity_rollups, handoff_edges, companies RESTART IDENTITY CASCADE")
         )
 
     # Clear dependency override
@@ -0,0 +1,44 @@
+"""Tests for action plan inference and dispatch."""
+
+from types import SimpleNamespace
+
+from app.services.actions import Action, apply_plan, infer_actions, render_plan
+
+
+def test_handoff_plan_renders_legacy_strings():
+    """Test the stored string form is unchanged by the typed plan."""
+    plan = infer_actions("work_request", "BA-001", "DEV-001", {})
+
+    assert render_plan(plan) == [
+        "BA-001:walk_to:DEV-001",
+        "BA-001:handoff:DEV-001",
+        "BA-001:return",
+        "DEV-001:status:working",
+    ]
+
+
+def test_unknown_event_uses_payload_agent_state():
+    """Test unknown event types fall back to payload.agent_state."""
+    assert infer_actions("DEPLOYING", "DEV-001", None, {"agent_state": "executing"}) == [
+        Action("DEV-001", "status", "executing")
+    ]
+    assert infer_actions("DEPLOYING", "DEV-001", None, {}) == [Action("DEV-001", "status", "working")]
+
+
+def test_apply_plan_updates_loaded_agents():
+    """Test the dispatcher updates status and task without touching unknown agents."""
+    sender = SimpleNamespace(status="idle", current_task=None)
+    target = SimpleNamespace(status="idle", current_task="old")
+    agents = {"BA-001": sender, "DEV-001": target}
+
+    apply_plan(infer_actions("WORK_REQUEST", "BA-001", "DEV-001", {"task": "Build API"}), {"task": "Build API"}, agents)
+
+    assert sender.status == "walking"
+    assert target.status == "working"
+    assert target.current_task == "Build API"
+
+    apply_plan(infer_actions("TASK_COMPLETE", "DEV-001", None, {}), {}, agents)
+    apply_plan(infer_actions("IDLE", "GHOST-001", None, {}), {}, agents)
+
+    assert target.status == "idle"
+    assert target.current_task is None
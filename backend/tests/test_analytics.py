@@ -0,0 +1,191 @@
+"""Tests for per-agent analytics rollups and the handoff graph."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import text, update
+
+from app.models import Agent
+from app.services.analytics import split_by_bucket
+
+
+async def _create_company(client) -> str:
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Analytics Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+async def _send(client, company_id, agent_id, event_type, **fields) -> None:
+    resp = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": agent_id, "event_type": event_type, **fields}
+    )
+    assert resp.status_code == 200
+
+
+async def _analytics(client, company_id, **params) -> dict:
+    resp = await client.get(f"/api/companies/{company_id}/analytics", params=params)
+    assert resp.status_code == 200
+    return {a["agent_id"]: a for a in resp.json()["agents"]}
+
+
+# ============== Rollups ==============
+
+@pytest.mark.asyncio
+async def test_events_and_handoffs_are_counted(client):
+    """Test events and handoffs are counted per agent as they are ingested."""
+    company_id = await _create_company(client)
+    await _send(client, company_id, "BA-001", "WORK_REQUEST", to_agent="DEV-001")
+    await _send(client, company_id, "DEV-001", "CODING", payload={"task": "Login"})
+    await client.post(
+        "/api/events/batch",
+        json={"events": [{"company_id": company_id, "agent_id": "DEV-001", "event_type": "THINKING"}]},
+    )
+
+    agents = await _analytics(client, company_id)
+
+    assert agents["BA-001"]["events"] == 1
+    assert agents["BA-001"]["handoffs_sent"] == 1
+    assert agents["DEV-001"]["events"] == 2
+    assert agents["DEV-001"]["handoffs_received"] == 1
+    assert agents["DEV-001"]["events_per_hour"] == round(2 / 24, 3)
+    assert sum(b["events"] for b in agents["DEV-001"]["buckets"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_time_in_status_is_rolled_up(client, test_engine):
+    """Test a status change records the time spent in the previous status."""
+    company_id = await _create_company(client)
+    two_hours_ago = datetime.utcnow() - timedelta(hours=2)
+    async with AsyncSession(test_engine) as session:
+        await session.execute(
+            update(Agent).where(Agent.company_id == company_id).values(status_changed_at=two_hours_ago)
+        )
+        await session.commit()
+
+    await _send(client, company_id, "DEV-001", "CODING", payload={"task": "Login"})
+    # Same status again: not a transition
+    await _send(client, company_id, "DEV-001", "CODING", payload={"task": "Logout"})
+
+    agents = await _analytics(client, company_id, **{"from": (two_hours_ago - timedelta(hours=1)).isoformat()})
+
+    dev = agents["DEV-001"]
+    assert dev["status_seconds"]["idle"] == pytest.approx(7200, abs=5)
+    assert dev["status_seconds"]["coding"] == pytest.approx(0, abs=5)
+    assert len([b for b in dev["buckets"] if "idle" in b["status_seconds"]]) >= 2
+    # BA-001 never changed status: its current status counts up to now
+    assert agents["BA-001"]["status_seconds"]["idle"] == pytest.approx(7200, abs=5)
+
+
+@pytest.mark.asyncio
+async def test_analytics_reads_rollups_not_events(client, test_engine):
+    """Test analytics are served from the rollups, without the raw events."""
+    company_id = await _create_company(client)
+    await _send(client, company_id, "BA-001", "WORK_REQUEST", to_agent="DEV-001")
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM events"))
+
+    agents = await _analytics(client, company_id)
+
+    assert agents["BA-001"]["events"] == 1
+    assert agents["DEV-001"]["handoffs_received"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analytics_filters_agent_and_validates(client):
+    """Test the agent filter, unknown companies and empty ranges."""
+    company_id = await _create_company(client)
+    await _send(client, company_id, "BA-001", "THINKING")
+
+    agents = await _analytics(client, company_id, agent_id="BA-001")
+    assert list(agents) == ["BA-001"]
+
+    missing_resp = await client.get("/api/companies/00000000-0000-0000-0000-000000000000/analytics")
+    assert missing_resp.status_code == 404
+
+    now = datetime.utcnow()
+    empty_resp = await client.get(
+        f"/api/companies/{company_id}/analytics",
+        params={"from": now.isoformat(), "to": (now - timedelta(hours=2)).isoformat()},
+    )
+    assert empty_resp.status_code == 400
+
+
+def test_split_by_bucket_spans_hours():
+    """Test an interval is split at hour boundaries."""
+    spans = split_by_bucket(datetime(2026, 10, 17, 9, 30), datetime(2026, 10, 17, 11, 15))
+
+    assert spans == [
+        (datetime(2026, 10, 17, 9), 1800.0),
+        (datetime(2026, 10, 17, 10), 3600.0),
+        (datetime(2026, 10, 17, 11), 900.0),
+    ]
+    assert split_by_bucket(datetime(2026, 10, 17, 9, 30), datetime(2026, 10, 17, 9, 30)) == []
+
+
+# ============== Handoff Graph ==============
+
+@pytest.mark.asyncio
+async def test_handoff_graph_weights_edges(client):
+    """Test handoffs are counted per agent pair, with event types and artifacts."""
+    company_id = await _create_company(client)
+    await _send(client, company_id, "BA-001", "WORK_REQUEST", to_agent="DEV-001", payload={"artifact": "spec.md"})
+    await _send(client, company_id, "BA-001", "FEEDBACK", to_agent="DEV-001", payload={"artifact": "spec.md"})
+    await _send(client, company_id, "DEV-001", "REVIEW_REQUEST", to_agent="BA-001")
+    # Not a handoff: no target
+    await _send(client, company_id, "DEV-001", "WORK_REQUEST")
+
+    resp = await client.get(f"/api/companies/{company_id}/handoff-graph", params={"window": "24h"})
+
+    assert resp.status_code == 200
+    graph = resp.json()
+    assert graph["since"] is not None
+    edges = {(e["from_agent"], e["to_agent"]): e for e in graph["edges"]}
+    assert set(edges) == {("BA-001", "DEV-001"), ("DEV-001", "BA-001")}
+    assert edges["BA-001", "DEV-001"]["count"] == 2
+    assert edges["BA-001", "DEV-001"]["event_types"] == {"WORK_REQUEST": 1, "FEEDBACK": 1}
+    assert edges["BA-001", "DEV-001"]["artifacts"] == [{"artifact": "spec.md", "count": 2}]
+    assert edges["DEV-001", "BA-001"]["artifacts"] == []
+    nodes = {n["agent_id"]: n for n in graph["nodes"]}
+    assert (nodes["BA-001"]["sent"], nodes["BA-001"]["received"]) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_handoff_graph_window(client, test_engine):
+    """Test the window excludes older buckets and validates its format."""
+    company_id = await _create_company(client)
+    await _send(client, company_id, "BA-001", "WORK_REQUEST", to_agent="DEV-001")
+    async with test_engine.begin() as conn:
+        await conn.execute(text("UPDATE handoff_edges SET bucket = bucket - interval '3 days'"))
+
+    recent = (await client.get(f"/api/companies/{company_id}/handoff-graph", params={"window": "1d"})).json()
+    everything = (await client.get(f"/api/companies/{company_id}/handoff-graph", params={"window": "all"})).json()
+
+    assert recent["edges"] == []
+    assert everything["edges"][0]["count"] == 1
+    assert everything["since"] is None
+
+    invalid_resp = await client.get(f"/api/companies/{company_id}/handoff-graph", params={"window": "week"})
+    assert invalid_resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_removed_agent_leaves_handoff_graph(client):
+    """Test removing an agent drops its edges from the graph."""
+    company_id = await _create_company(client)
+    await _send(client, company_id, "BA-001", "WORK_REQUEST", to_agent="DEV-001")
+
+    await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+    graph = (await client.get(f"/api/companies/{company_id}/handoff-graph")).json()
+
+    assert graph["edges"] == []
+    assert [n["agent_id"] for n in graph["nodes"]] == ["BA-001"]
@@ -0,0 +1,192 @@
+"""Tests for archiving old events partitions to compressed segment files."""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, text
+
+from app.config import settings
+from app.models import Event, EventSegment
+from app.services.archive import archive_event_partitions, expire_event_segments, segment_file
+from app.services.partitions import create_event_partition
+
+OLD_EVENTS = [
+    (datetime(2020, 1, 5), "DEV-001", "THINKING", {"task": "Plan"}),
+    (datetime(2020, 1, 6), "BA-001", "WORKING", {"task": "Specs"}),
+    (datetime(2020, 1, 6), "DEV-001", "CODING", {"task": "Login"}),
+    (datetime(2020, 2, 10), "DEV-001", "WORKING", {"task": "Login", "priority": "high"}),
+    (datetime(2020, 2, 11), "BA-001", "THINKING", {"task": "Review"}),
+]
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "event_archive_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+async def company_id(client, test_engine, archive_dir):
+    """A company with events in two old monthly partitions and two recent ones."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Archive Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    company_id = company_resp.json()["company_id"]
+
+    async with AsyncSession(test_engine) as session:
+        await create_event_partition(session, date(2020, 1, 1))
+        await create_event_partition(session, date(2020, 2, 1))
+        for timestamp, agent_id, event_type, payload in OLD_EVENTS:
+            session.add(
+                Event(
+                    company_id=company_id,
+                    from_agent_id=agent_id,
+                    event_type=event_type,
+                    payload=payload,
+                    timestamp=timestamp,
+                )
+            )
+        await session.commit()
+    for event_type in ("THINKING", "WORKING"):
+        await client.post(
+            "/api/events",
+            json={"company_id": company_id, "agent_id": "DEV-001", "event_type": event_type}
+        )
+
+    yield company_id
+
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS events_p2020_01, events_p2020_02"))
+
+
+async def _archive(test_engine) -> list[str]:
+    async with AsyncSession(test_engine) as session:
+        return await archive_event_partitions(session, 30, now=datetime(2020, 4, 1))
+
+
+async def _walk_cursor(client, company_id: str, **params) -> list[str]:
+    ids, cursor = [], None
+    while True:
+        query = {"limit": 2, "count": "none", **params, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get(f"/api/companies/{company_id}/logs", params=query)).json()
+        ids.extend(log["id"] for log in page["logs"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.asyncio
+async def test_archiving_moves_partitions_to_segments(client, test_engine, company_id, archive_dir):
+    """Test old partitions are written to segment files and dropped."""
+    archived = await _archive(test_engine)
+
+    assert archived == ["events_p2020_01", "events_p2020_02"]
+    async with AsyncSession(test_engine) as session:
+        remaining = await session.scalar(text("SELECT count(*) FROM events"))
+        dropped = await session.scalar(text("SELECT to_regclass('events_p2020_01') IS NULL"))
+        segments = (await session.execute(select(EventSegment).order_by(EventSegment.min_timestamp))).scalars().all()
+
+    assert remaining == 2
+    assert dropped
+    assert [(s.min_timestamp, s.max_timestamp, s.event_count) for s in segments] == [
+        (datetime(2020, 1, 5), datetime(2020, 1, 6), 3),
+        (datetime(2020, 2, 10), datetime(2020, 2, 11), 2),
+    ]
+    assert all(segment_file(s.path).exists() for s in segments)
+
+
+@pytest.mark.asyncio
+async def test_logs_read_archived_events_transparently(client, test_engine, company_id):
+    """Test logs, filters, counts and both pagination styles are unchanged by archiving."""
+    url = f"/api/companies/{company_id}/logs"
+    queries = [
+        {},
+        {"event_type": "WORKING"},
+        {"agent_id": "BA-001"},
+        {"payload.task": "Login"},
+        {"from": "2020-01-06T00:00:00", "to": "2020-02-11T00:00:00"},
+        {"limit": 2, "offset": 3},
+        {"limit": 2, "offset": 5},
+    ]
+
+    async def snapshot():
+        results = []
+        for params in queries:
+            page = (await client.get(url, params=params)).json()
+            results.append(([log["id"] for log in page["logs"]], page["total"], page["has_more"]))
+        results.append(await _walk_cursor(client, company_id))
+        results.append(await _walk_cursor(client, company_id, agent_id="DEV-001"))
+        return results
+
+    before = await snapshot()
+    await _archive(test_engine)
+    after = await snapshot()
+
+    assert after == before
+    assert len(after[0][0]) == 7
+    assert after[3][1] == 2
+
+
+@pytest.mark.asyncio
+async def test_export_includes_archived_events(client, test_engine, company_id):
+    """Test export streams archived events before the ones in Postgres."""
+    url = f"/api/companies/{company_id}/logs/export"
+    before = (await client.get(url)).text
+    before_csv = (await client.get(url, params={"format": "csv", "agent_id": "DEV-001"})).text
+
+    await _archive(test_engine)
+
+    assert (await client.get(url)).text == before
+    assert (await client.get(url, params={"format": "csv", "agent_id": "DEV-001"})).text == before_csv
+    assert len(before.splitlines()) == 7
+
+
+@pytest.mark.asyncio
+async def test_segments_expire_and_follow_company_deletion(client, test_engine, company_id):
+    """Test segment rows and files go away with retention and company deletion."""
+    await _archive(test_engine)
+    async with AsyncSession(test_engine) as session:
+        paths = (await session.execute(select(EventSegment.path).order_by(EventSegment.min_timestamp))).scalars().all()
+        expired = await expire_event_segments(session, 30, now=datetime(2020, 3, 5))
+
+    assert expired == 1
+    assert not segment_file(paths[0]).exists()
+    assert segment_file(paths[1]).exists()
+
+    delete_resp = await client.delete(f"/api/companies/{company_id}")
+    assert delete_resp.status_code == 200
+    assert not segment_file(paths[1]).exists()
+
+
+@pytest.mark.asyncio
+async def test_deleted_agent_events_leave_segments(client, test_engine, company_id):
+    """Test deleting an agent rewrites the segments holding its archived events."""
+    await _archive(test_engine)
+    async with AsyncSession(test_engine) as session:
+        old_paths = (await session.execute(select(EventSegment.path))).scalars().all()
+
+    delete_resp = await client.delete(f"/api/companies/{company_id}/agents/BA-001")
+    assert delete_resp.status_code == 200
+
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()
+    assert logs["total"] == 5
+    assert all(log["from_agent"] == "DEV-001" for log in logs["logs"])
+    export = (await client.get(f"/api/companies/{company_id}/logs/export")).text
+    assert "BA-001" not in export
+
+    async with AsyncSession(test_engine) as session:
+        segments = (await session.execute(select(EventSegment).order_by(EventSegment.min_timestamp))).scalars().all()
+    assert [(s.min_timestamp, s.max_timestamp, s.event_count) for s in segments] == [
+        (datetime(2020, 1, 5), datetime(2020, 1, 6), 2),
+        (datetime(2020, 2, 10), datetime(2020, 2, 10), 1),
+    ]
+    assert all(segment_file(s.path).exists() for s in segments)
+    assert not any(segment_file(path).exists() for path in old_paths)
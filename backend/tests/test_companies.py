@@ -2,6 +2,7 @@
 
 import pytest
 from uuid import uuid4
+from sqlmodel import text
 
 
 # ============== Story 2.1: Company Registration API ==============
@@ -162,6 +163,25 @@ async def test_create_duplicate_agent_returns_409(client):
     assert response.status_code == 409
 
 
+@pytest.mark.asyncio
+async def test_create_company_duplicate_agent_ids_returns_409(client):
+    """Test a company payload repeating an agent_id returns 409 and creates nothing."""
+    response = await client.post(
+        "/api/companies",
+        json={
+            "name": "Duplicate Agents Co",
+            "agents": [
+                {"agent_id": "DUP-001", "name": "First", "role": "developer"},
+                {"agent_id": "DUP-001", "name": "Second", "role": "developer"},
+            ],
+        }
+    )
+    assert response.status_code == 409
+
+    listed = (await client.get("/api/companies")).json()["companies"]
+    assert all(company["name"] != "Duplicate Agents Co" for company in listed)
+
+
 @pytest.mark.asyncio
 async def test_create_agent_invalid_company_returns_404(client):
     """Test creating agent for non-existent company returns 404."""
@@ -342,3 +362,329 @@ async def test_deleted_agent_not_in_state(client):
     agent_ids = [a["agent_id"] for a in agents]
 
     assert "GONE-001" not in agent_ids
+
+
+# ============== Versioned State Deltas ==============
+
+@pytest.fixture
+async def versioned_company(client):
+    """Create a company with two agents and return (company_id, state version)."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={"name": "Delta Co"}
+    )
+    company_id = company_resp.json()["company_id"]
+    for agent_id, role in (("BA-001", "ba"), ("DEV-001", "developer")):
+        await client.post(
+            f"/api/companies/{company_id}/agents",
+            json={"agent_id": agent_id, "name": agent_id, "role": role}
+        )
+
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    return company_id, state["version"]
+
+
+@pytest.mark.asyncio
+async def test_state_version_bumped_by_writes(client, versioned_company):
+    """Test agent creation and events bump the company version."""
+    company_id, version = versioned_company
+    assert version == 2
+
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING"}
+    )
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    assert state["version"] == 3
+    assert state["is_delta"] is False
+
+
+@pytest.mark.asyncio
+async def test_state_since_returns_only_changes(client, versioned_company):
+    """Test ?since= returns only agents and movements changed after that version."""
+    company_id, version = versioned_company
+
+    unchanged = (await client.get(f"/api/companies/{company_id}/state?since={version}")).json()
+    assert unchanged["is_delta"] is True
+    assert unchanged["agents"] == []
+    assert unchanged["pending_movements"] == []
+
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "CODING"}
+    )
+    delta = (await client.get(f"/api/companies/{company_id}/state?since={version}")).json()
+
+    assert delta["is_delta"] is True
+    assert [a["agent_id"] for a in delta["agents"]] == ["DEV-001"]
+    assert delta["agents"][0]["status"] == "coding"
+    assert delta["version"] == version + 1
+
+
+@pytest.mark.asyncio
+async def test_state_since_reports_removals(client, versioned_company):
+    """Test deltas report completed movements and deleted agents."""
+    company_id, _ = versioned_company
+
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "to_agent": "DEV-001", "event_type": "WORK_REQUEST"}
+    )
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    handoff = next(m for m in state["pending_movements"] if m["purpose"] == "handoff")
+    version = state["version"]
+
+    await client.post(f"/api/companies/{company_id}/movements/{handoff['id']}/complete")
+    await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+
+    delta = (await client.get(f"/api/companies/{company_id}/state?since={version}")).json()
+    assert delta["is_delta"] is True
+    assert delta["removed_agent_ids"] == ["DEV-001"]
+    assert handoff["id"] in delta["removed_movement_ids"]
+    assert [a["agent_id"] for a in delta["agents"]] == ["BA-001"]
+
+
+@pytest.mark.asyncio
+async def test_state_since_future_version_returns_snapshot(client, versioned_company):
+    """Test an unknown (future) version falls back to a full snapshot."""
+    company_id, version = versioned_company
+
+    state = (await client.get(f"/api/companies/{company_id}/state?since={version + 100}")).json()
+    assert state["is_delta"] is False
+    assert len(state["agents"]) == 2
+
+
+# ============== Conditional Requests (ETag) ==============
+
+@pytest.mark.asyncio
+async def test_state_etag_returns_304_until_changed(client, versioned_company):
+    """Test /state answers 304 for a matching ETag and 200 after a write."""
+    company_id, _ = versioned_company
+
+    first = await client.get(f"/api/companies/{company_id}/state")
+    etag = first.headers["etag"]
+
+    cached = await client.get(f"/api/companies/{company_id}/state", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING"}
+    )
+    changed = await client.get(f"/api/companies/{company_id}/state", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_company_list_etag_changes_on_activity(client, versioned_company):
+    """Test the company list ETag changes when a company's activity changes."""
+    company_id, _ = versioned_company
+
+    etag = (await client.get("/api/companies")).headers["etag"]
+    assert (await client.get("/api/companies", headers={"If-None-Match": etag})).status_code == 304
+
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "CODING"}
+    )
+    assert (await client.get("/api/companies", headers={"If-None-Match": etag})).status_code == 200
+
+    etag = (await client.get("/api/companies")).headers["etag"]
+    await client.delete(f"/api/companies/{company_id}")
+    assert (await client.get("/api/companies", headers={"If-None-Match": etag})).status_code == 200
+
+    etag = (await client.get("/api/companies")).headers["etag"]
+    await client.post("/api/companies", json={"name": "Newcomer Co"})
+    assert (await client.get("/api/companies", headers={"If-None-Match": etag})).status_code == 200
+
+
+# ============== Denormalized Company Counters ==============
+
+async def _listed(client, company_id) -> dict:
+    companies = (await client.get("/api/companies", params={"limit": 100})).json()["companies"]
+    return next(c for c in companies if c["company_id"] == company_id)
+
+
+@pytest.mark.asyncio
+async def test_company_list_counts_follow_writes(client):
+    """Test agent_count, event_count and last_activity move with agent and event writes."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={"name": "Counted Co", "agents": [{"agent_id": "BA-001", "name": "Alice", "role": "ba"}]}
+    )
+    company_id = company_resp.json()["company_id"]
+    listed = await _listed(client, company_id)
+    assert (listed["agent_count"], listed["event_count"], listed["last_activity"]) == (1, 0, None)
+
+    await client.post(
+        f"/api/companies/{company_id}/agents",
+        json={"agent_id": "DEV-001", "name": "Bob", "role": "developer"}
+    )
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING"}
+    )
+    await client.post(
+        "/api/events/batch",
+        json={
+            "events": [
+                {"company_id": company_id, "agent_id": "DEV-001", "event_type": "CODING"},
+                {"company_id": company_id, "agent_id": "DEV-001", "event_type": "THINKING"},
+            ]
+        },
+    )
+    listed = await _listed(client, company_id)
+    assert (listed["agent_count"], listed["event_count"]) == (2, 3)
+    assert listed["last_activity"] is not None
+
+    await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+    listed = await _listed(client, company_id)
+    assert (listed["agent_count"], listed["event_count"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_company_list_reads_company_rows_only(client, test_engine):
+    """Test the list is served from the company row, without scanning agents or events."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={"name": "Row Co", "agents": [{"agent_id": "BA-001", "name": "Alice", "role": "ba"}]}
+    )
+    company_id = company_resp.json()["company_id"]
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING"}
+    )
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM events"))
+
+    listed = await _listed(client, company_id)
+
+    assert (listed["agent_count"], listed["event_count"]) == (1, 1)
+    assert listed["status"] == "active"
+
+
+@pytest.mark.asyncio
+async def test_delete_with_stale_directory_entry_returns_404(client, test_engine):
+    """Test deletes of rows already gone return 404 and leave the counters alone."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Stale Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    company_id = company_resp.json()["company_id"]
+    # Caches the directory entry, then remove the agent behind its back
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING"}
+    )
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM agents WHERE agent_id = 'DEV-001'"))
+
+    agent_resp = await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+    listed = await _listed(client, company_id)
+
+    assert agent_resp.status_code == 404
+    assert listed["agent_count"] == 2
+
+    empty_resp = await client.post("/api/companies", json={"name": "Gone Co"})
+    empty_id = empty_resp.json()["company_id"]
+    await client.delete(f"/api/companies/{empty_id}/agents/NONEXISTENT")  # Caches the entry
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM companies WHERE id = :id"), {"id": empty_id})
+
+    company_resp = await client.delete(f"/api/companies/{empty_id}")
+
+    assert company_resp.status_code == 404
+
+
+# ============== Company List Sorting and Keyset Pages ==============
+
+async def _create_listed_companies(client) -> dict[str, str]:
+    """Companies Lobby A..D: A and C have agents, C then A have events; returns name -> id."""
+    ids = {}
+    for name, agents in (("Lobby A", 2), ("Lobby B", 0), ("Lobby C", 1), ("Lobby D", 0)):
+        company_resp = await client.post(
+            "/api/companies",
+            json={
+                "name": name,
+                "agents": [
+                    {"agent_id": f"DEV-00{i}", "name": f"Dev {i}", "role": "developer"}
+                    for i in range(1, agents + 1)
+                ],
+            }
+        )
+        ids[name] = company_resp.json()["company_id"]
+    for name in ("Lobby C", "Lobby A"):
+        await client.post(
+            "/api/events",
+            json={"company_id": ids[name], "agent_id": "DEV-001", "event_type": "THINKING"}
+        )
+    await client.post("/api/companies", json={"name": "Other Co"})
+    return ids
+
+
+async def _all_pages(client, **params) -> list[str]:
+    """Names of every company, following next_cursor one page at a time."""
+    names = []
+    page = (await client.get("/api/companies", params=params)).json()
+    while True:
+        names += [c["name"] for c in page["companies"]]
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            return names
+        page = (await client.get("/api/companies", params={**params, "cursor": page["next_cursor"]})).json()
+
+
+@pytest.mark.asyncio
+async def test_company_list_sorts_and_pages(client):
+    """Test each sort order is followed across keyset pages without gaps or repeats."""
+    await _create_listed_companies(client)
+
+    by_name = await _all_pages(client, sort="name", name_prefix="lobby", limit=1)
+    assert by_name == ["Lobby A", "Lobby B", "Lobby C", "Lobby D"]
+
+    by_activity = await _all_pages(client, sort="last_activity", name_prefix="LOBBY", limit=1)
+    assert by_activity[:2] == ["Lobby A", "Lobby C"]
+    assert sorted(by_activity[2:]) == ["Lobby B", "Lobby D"]
+
+    by_agents = await _all_pages(client, sort="agent_count", name_prefix="lob", limit=3)
+    assert by_agents[:2] == ["Lobby A", "Lobby C"]
+
+    by_created = await _all_pages(client, sort="created_at", limit=2)
+    assert by_created[0] == "Other Co"
+    assert len(by_created) == 5
+
+
+@pytest.mark.asyncio
+async def test_company_list_filters_status(client):
+    """Test the status filter keeps companies with or without agents."""
+    await _create_listed_companies(client)
+
+    active = (await client.get("/api/companies", params={"status": "active"})).json()
+    inactive = (await client.get("/api/companies", params={"status": "inactive", "sort": "name"})).json()
+
+    assert [c["name"] for c in active["companies"]] == ["Lobby A", "Lobby C"]
+    assert [c["name"] for c in inactive["companies"]] == ["Lobby B", "Lobby D", "Other Co"]
+    assert all(c["status"] == "inactive" for c in inactive["companies"])
+
+
+@pytest.mark.asyncio
+async def test_company_list_validates_params(client):
+    """Test unknown sorts and statuses, malformed cursors and cursors of another sort are rejected."""
+    await _create_listed_companies(client)
+    cursor = (await client.get("/api/companies", params={"sort": "name", "limit": 1})).json()["next_cursor"]
+
+    assert (await client.get("/api/companies", params={"sort": "size"})).status_code == 400
+    assert (await client.get("/api/companies", params={"status": "busy"})).status_code == 400
+    assert (await client.get("/api/companies", params={"cursor": "not-a-cursor"})).status_code == 400
+    other_sort = await client.get("/api/companies", params={"sort": "agent_count", "cursor": cursor})
+    assert other_sort.status_code == 400
+    same_sort = await client.get("/api/companies", params={"sort": "name", "cursor": cursor})
+    assert same_sort.status_code == 200
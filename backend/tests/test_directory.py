@@ -0,0 +1,131 @@
+"""Tests for the company/agent directory cache."""
+
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Agent
+from app.services.directory import CompanyDirectory
+
+
+@pytest.fixture
+async def company_id(client):
+    """Create a company with two agents."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Directory Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+@pytest.mark.asyncio
+async def test_repeated_events_hit_cache(client, company_id):
+    """Test only the first event for a company misses the directory."""
+    for _ in range(3):
+        response = await client.post(
+            "/api/events",
+            json={"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING"}
+        )
+        assert response.status_code == 200
+
+    stats = (await client.get("/api/health/stats")).json()["directory_cache"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_agent_invalidates_cache(client, company_id):
+    """Test an agent created after the directory was warmed is visible to events."""
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING"}
+    )
+    await client.post(
+        f"/api/companies/{company_id}/agents",
+        json={"agent_id": "QA-001", "name": "Carol", "role": "qa"}
+    )
+
+    response = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "QA-001", "event_type": "REVIEWING"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_agent_created_elsewhere_reloads_entry(client, test_engine, company_id):
+    """Test an agent missing from a warm entry is looked up again before rejecting the event."""
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING"}
+    )
+    # Created by another worker: this process's directory isn't invalidated
+    async with AsyncSession(test_engine) as session:
+        session.add(Agent(company_id=company_id, agent_id="QA-001", name="Carol", role="qa", position_zone="qa"))
+        await session.commit()
+
+    response = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "QA-001", "event_type": "REVIEWING"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_delete_agent_invalidates_cache(client, company_id):
+    """Test events for a deleted agent are rejected once the directory is warm."""
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "WORKING"}
+    )
+    await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+
+    response = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "WORKING"}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_company_invalidates_cache(client, company_id):
+    """Test events for a deleted company are rejected once the directory is warm."""
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING"}
+    )
+    await client.delete(f"/api/companies/{company_id}")
+
+    response = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING"}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_directory_evicts_least_recently_used(client, test_engine):
+    """Test the directory keeps at most max_companies entries."""
+    company_ids = []
+    for i in range(3):
+        resp = await client.post("/api/companies", json={"name": f"LRU Co {i}"})
+        company_ids.append(resp.json()["company_id"])
+
+    directory = CompanyDirectory(max_companies=2, ttl_seconds=60)
+    async with AsyncSession(test_engine) as session:
+        for cid in company_ids:
+            assert await directory.get(session, UUID(cid)) is not None
+        # First company was evicted, last one is cached
+        await directory.get(session, UUID(company_ids[0]))
+        await directory.get(session, UUID(company_ids[2]))
+
+    assert directory.stats()["evictions"] == 2
+    assert directory.misses == 4
+    assert directory.hits == 1
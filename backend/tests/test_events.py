@@ -117,6 +117,30 @@ async def test_create_event_invalid_type_returns_422(client, company_with_agents
     assert response.status_code == 422
 
 
+@pytest.mark.asyncio
+async def test_create_event_long_agent_state_returns_422(client, company_with_agents):
+    """Test an agent_state longer than the status column is rejected before it reaches the agent."""
+    company_id = company_with_agents
+
+    response = await client.post(
+        "/api/events",
+        json={
+            "company_id": company_id,
+            "agent_id": "BA-001",
+            "event_type": "CUSTOM_STATE",
+            "payload": {"agent_state": "s" * 51}
+        }
+    )
+    assert response.status_code == 422
+
+    # The agent's later transitions still record
+    response = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING", "payload": {}}
+    )
+    assert response.status_code == 200
+
+
 # ============== Story 3.2: Core Event Types Processing ==============
 
 @pytest.mark.asyncio
@@ -389,3 +413,90 @@ async def test_cleanup_completed_movements(client, company_with_agents):
         cleanup_resp = await client.delete(f"/api/companies/{company_id}/movements/cleanup")
         assert cleanup_resp.status_code == 200
         assert cleanup_resp.json()["deleted_count"] >= 1
+
+
+# ============== Batch Event Ingestion ==============
+
+@pytest.mark.asyncio
+async def test_batch_events_all_accepted(client, company_with_agents):
+    """Test POST /api/events/batch accepts every valid event."""
+    company_id = company_with_agents
+
+    response = await client.post(
+        "/api/events/batch",
+        json={
+            "events": [
+                {"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING", "payload": {}},
+                {"company_id": company_id, "agent_id": "DEV-001", "event_type": "CODING", "payload": {"task": "API"}},
+            ]
+        }
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["accepted"] == 2
+    assert data["rejected"] == 0
+    assert all(r["status"] == "accepted" and r["event_id"] for r in data["results"])
+
+
+@pytest.mark.asyncio
+async def test_batch_events_partial_failure(client, company_with_agents):
+    """Test unknown agents are rejected per item without failing the batch."""
+    from uuid import uuid4
+
+    company_id = company_with_agents
+
+    response = await client.post(
+        "/api/events/batch",
+        json={
+            "events": [
+                {"company_id": company_id, "agent_id": "BA-001", "event_type": "WORKING", "payload": {}},
+                {"company_id": company_id, "agent_id": "GHOST-001", "event_type": "WORKING", "payload": {}},
+                {"company_id": company_id, "agent_id": "BA-001", "to_agent": "GHOST-002", "event_type": "WORK_REQUEST"},
+                {"company_id": str(uuid4()), "agent_id": "BA-001", "event_type": "WORKING"},
+            ]
+        }
+    )
+    data = response.json()
+
+    assert data["accepted"] == 1
+    assert data["rejected"] == 3
+    assert [r["status"] for r in data["results"]] == ["accepted", "rejected", "rejected", "rejected"]
+    assert "GHOST-001" in data["results"][1]["error"]
+    assert "GHOST-002" in data["results"][2]["error"]
+    assert data["results"][3]["error"] == "Company not found"
+
+    logs_resp = await client.get(f"/api/companies/{company_id}/logs")
+    assert logs_resp.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_events_apply_in_order(client, company_with_agents):
+    """Test batch events update agent state and create movements in order."""
+    company_id = company_with_agents
+
+    await client.post(
+        "/api/events/batch",
+        json={
+            "events": [
+                {"company_id": company_id, "agent_id": "DEV-001", "event_type": "WORKING", "payload": {"task": "Build"}},
+                {"company_id": company_id, "agent_id": "DEV-001", "event_type": "IDLE"},
+                {"company_id": company_id, "agent_id": "BA-001", "to_agent": "DEV-001", "event_type": "WORK_REQUEST",
+                 "payload": {"artifact": "spec.md"}},
+            ]
+        }
+    )
+
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    agents = {a["agent_id"]: a for a in state["agents"]}
+
+    assert agents["BA-001"]["status"] == "walking"
+    assert agents["DEV-001"]["status"] == "working"
+    assert {m["purpose"] for m in state["pending_movements"]} == {"handoff", "return"}
+
+
+@pytest.mark.asyncio
+async def test_batch_events_empty_returns_422(client):
+    """Test empty batch is rejected."""
+    response = await client.post("/api/events/batch", json={"events": []})
+    assert response.status_code == 422
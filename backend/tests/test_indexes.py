@@ -0,0 +1,191 @@
+"""Tests that the hot queries are served by the indexes from migrations 005 onwards."""
+
+import pytest
+from sqlmodel import text
+
+
+async def _explain(test_engine, sql: str) -> str:
+    """Return the EXPLAIN plan for `sql` with sequential scans disabled."""
+    async with test_engine.connect() as conn:
+        # Fresh statistics, and tiny test tables would otherwise always be scanned sequentially
+        await conn.execute(text("ANALYZE companies, agents, events, movements"))
+        await conn.execute(text("SET enable_seqscan = off"))
+        result = await conn.execute(text(f"EXPLAIN {sql}"))
+        plan = "\n".join(row[0] for row in result)
+        # events is partitioned: plans name each partition's copy of an index
+        inherited = await conn.execute(
+            text(
+                "SELECT child.relname, parent.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "WHERE child.relkind = 'i'"
+            )
+        )
+        for child_name, parent_name in inherited:
+            plan = plan.replace(child_name, parent_name)
+        return plan
+
+
+@pytest.fixture
+async def company_id(client):
+    """Create a company with two agents and some events."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Index Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    company_id = company_resp.json()["company_id"]
+    for event_type in ("THINKING", "WORKING", "CODING"):
+        await client.post(
+            "/api/events",
+            json={"company_id": company_id, "agent_id": "BA-001", "event_type": event_type}
+        )
+    return company_id
+
+
+@pytest.mark.asyncio
+async def test_agent_lookup_uses_unique_index(client, test_engine, company_id):
+    """Test agent lookups by (company_id, agent_id) use the unique index."""
+    plan = await _explain(
+        test_engine,
+        f"SELECT * FROM agents WHERE company_id = '{company_id}' AND agent_id = 'BA-001'",
+    )
+    assert "uq_agents_company_agent" in plan
+
+
+@pytest.mark.asyncio
+async def test_logs_event_type_filter_uses_index(client, test_engine, company_id):
+    """Test the event type log filter reads in index order without sorting."""
+    plan = await _explain(
+        test_engine,
+        f"SELECT * FROM events WHERE company_id = '{company_id}' AND event_type = 'WORKING' "
+        "ORDER BY timestamp DESC, id DESC LIMIT 101",
+    )
+    assert "ix_events_company_type_timestamp_id" in plan
+    # No Sort node; partitions read in index order are combined by Merge Append
+    assert "Sort  (" not in plan
+
+
+@pytest.mark.asyncio
+async def test_logs_agent_filter_count_uses_agent_indexes(client, test_engine, company_id):
+    """Test counting an agent's events combines the sender and receiver indexes."""
+    # Make BA-001 a small fraction of the company's events
+    await client.post(
+        "/api/events/batch",
+        json={
+            "events": [
+                {"company_id": company_id, "agent_id": "DEV-001", "event_type": "CODING"}
+                for _ in range(500)
+            ]
+        }
+    )
+    plan = await _explain(
+        test_engine,
+        f"SELECT count(*) FROM events WHERE company_id = '{company_id}' "
+        "AND (from_agent_id = 'BA-001' OR to_agent_id = 'BA-001')",
+    )
+    assert "ix_events_company_from_agent_timestamp_id" in plan
+    assert "ix_events_company_to_agent_timestamp_id" in plan
+
+
+@pytest.mark.asyncio
+async def test_pending_movements_use_partial_index(client, test_engine, company_id):
+    """Test the pending movement query uses the partial index."""
+    plan = await _explain(
+        test_engine,
+        f"SELECT * FROM movements WHERE company_id = '{company_id}' AND progress < 1.0",
+    )
+    assert "ix_movements_company_pending" in plan
+
+
+@pytest.mark.asyncio
+async def test_duplicate_agent_rejected_by_unique_index(client, test_engine, company_id):
+    """Test the database itself rejects a duplicate (company_id, agent_id)."""
+    from sqlalchemy.exc import IntegrityError
+
+    with pytest.raises(IntegrityError):
+        async with test_engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "INSERT INTO agents (id, company_id, agent_id, name, role, status, "
+                    "position_zone, position_x, position_y, created_at, version) VALUES "
+                    f"(gen_random_uuid(), '{company_id}', 'BA-001', 'Dup', 'ba', 'idle', "
+                    "'ba', 0, 0, now(), 0)"
+                )
+            )
+
+
+@pytest.mark.asyncio
+async def test_payload_containment_uses_gin_index(client, test_engine, company_id):
+    """Test payload @> filters are served by the payload GIN index."""
+    plan = await _explain(
+        test_engine,
+        "SELECT * FROM events WHERE payload @> '{\"task\": \"Writing specs\"}'",
+    )
+    assert "ix_events_payload_gin" in plan
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_uses_gin_index(client, test_engine, company_id):
+    """Test q= searches are served by the search_vector GIN index."""
+    plan = await _explain(
+        test_engine,
+        "SELECT id FROM events WHERE search_vector @@ websearch_to_tsquery('english', 'login bug')",
+    )
+    assert "ix_events_search_vector" in plan
+
+
+@pytest.mark.asyncio
+async def test_timeline_counts_use_index_only_scan(client, test_engine, company_id):
+    """Test timeline bucket counts are answered from the covering index alone."""
+    async with test_engine.connect() as conn:
+        # Index-only scans need the visibility map, which VACUUM sets
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM events"))
+    plan = await _explain(
+        test_engine,
+        "SELECT date_bin('1 minute', timestamp, '2000-01-01'), event_type, count(*) FROM events "
+        f"WHERE company_id = '{company_id}' AND timestamp >= now() - interval '1 hour' "
+        "GROUP BY 1, 2",
+    )
+    assert "Index Only Scan using ix_events_company_timestamp_covering" in plan
+
+
+@pytest.mark.asyncio
+async def test_company_list_sorts_use_keyset_indexes(client, test_engine, company_id):
+    """Test company list pages walk the (sort column, id) indexes without sorting."""
+    plan = await _explain(
+        test_engine,
+        "SELECT * FROM companies WHERE (last_activity, id) < (now(), gen_random_uuid()) "
+        "ORDER BY last_activity DESC NULLS LAST, id DESC LIMIT 10",
+    )
+    assert "ix_companies_last_activity_id" in plan
+    assert "Sort" not in plan
+
+    plan = await _explain(
+        test_engine, "SELECT * FROM companies ORDER BY agent_count DESC, id DESC LIMIT 10"
+    )
+    assert "Index Scan Backward using ix_companies_agent_count_id" in plan
+
+
+@pytest.mark.asyncio
+async def test_company_name_prefix_uses_index(client, test_engine, company_id):
+    """Test name prefix filters are a range scan on lower(name) COLLATE "C"."""
+    plan = await _explain(
+        test_engine,
+        """SELECT * FROM companies WHERE lower(name) COLLATE "C" >= 'ind' """
+        """AND lower(name) COLLATE "C" < 'ine'""",
+    )
+    assert "ix_companies_name_prefix" in plan
+
+
+@pytest.mark.asyncio
+async def test_company_list_marker_reads_no_table_scan(client, test_engine, company_id):
+    """Test the company list ETag marker is answered from an index, not a scan of companies."""
+    plan = await _explain(test_engine, "SELECT max(updated_at) FROM companies")
+    assert "ix_companies_updated_at" in plan
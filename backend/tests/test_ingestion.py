@@ -0,0 +1,149 @@
+"""Tests for queued (write-behind) event ingestion."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.services.ingestion import IngestionQueue, ingestion_queue
+
+
+@pytest.fixture
+async def company_id(client):
+    """Create a company with two agents."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Queue Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+@pytest.fixture
+async def queued_mode(test_engine, monkeypatch):
+    """Switch event ingestion to queued mode with a running flusher."""
+    monkeypatch.setattr(settings, "event_ingest_mode", "queued")
+    ingestion_queue.start(sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False))
+    yield ingestion_queue
+    await ingestion_queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queued_event_returns_202(client, company_id, queued_mode):
+    """Test queued mode acknowledges with 202 and writes the event on flush."""
+    response = await client.post(
+        "/api/events",
+        json={
+            "company_id": company_id,
+            "agent_id": "BA-001",
+            "to_agent": "DEV-001",
+            "event_type": "WORK_REQUEST",
+            "payload": {"task": "Spec review"}
+        }
+    )
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "queued"
+
+    await queued_mode.stop()
+
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()["logs"]
+    assert [log["id"] for log in logs] == [data["event_id"]]
+
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    agents = {a["agent_id"]: a for a in state["agents"]}
+    assert agents["DEV-001"]["current_task"] == "Spec review"
+    assert len(state["pending_movements"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_queued_event_still_validates(client, company_id, queued_mode):
+    """Test unknown agents are rejected before queuing."""
+    enqueued_before = queued_mode.stats()["enqueued"]
+
+    response = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "GHOST-001", "event_type": "WORKING"}
+    )
+    assert response.status_code == 404
+    assert queued_mode.stats()["enqueued"] == enqueued_before
+
+
+@pytest.mark.asyncio
+async def test_queue_flushes_by_size_and_drops_when_full(client, company_id, test_engine):
+    """Test the flusher writes batches of flush_size and counts drops on overflow."""
+    from app.schemas.event import EventCreate
+
+    queue = IngestionQueue(max_size=3, flush_size=2, flush_interval=60)
+    queue.start(sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False))
+
+    event = EventCreate(company_id=company_id, agent_id="DEV-001", event_type="CODING")
+    results = [queue.enqueue(event) for _ in range(4)]
+    await queue.stop()
+
+    stats = queue.stats()
+    assert results[-1] is None
+    assert stats["dropped"] == 1
+    assert stats["flushed"] == 3
+    assert stats["flushes"] == 2
+    assert stats["depth"] == 0
+
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()
+    assert logs["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_loses_only_the_bad_event(client, company_id, test_engine):
+    """Test a batch failing at write time is retried in halves, dropping only the bad event."""
+    from app.schemas.event import EventCreate
+
+    queue = IngestionQueue(max_size=10, flush_size=4, flush_interval=60)
+    queue.start(sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False))
+
+    good = EventCreate(company_id=company_id, agent_id="DEV-001", event_type="CODING")
+    # Passes every check but can't be stored: JSONB rejects NUL characters
+    bad = EventCreate(company_id=company_id, agent_id="DEV-001", event_type="CODING", payload={"note": "\u0000"})
+    for event in (good, good, bad, good):
+        queue.enqueue(event)
+    await queue.stop()
+
+    stats = queue.stats()
+    assert stats["failed"] == 1
+    assert stats["flushed"] == 3
+
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()
+    assert logs["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_column_limits_rejected_before_queuing(client, company_id, queued_mode):
+    """Test events that can't fit their columns are rejected instead of acknowledged."""
+    enqueued_before = queued_mode.stats()["enqueued"]
+
+    long_type = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "X" * 60}
+    )
+    long_task = await client.post(
+        "/api/events",
+        json={
+            "company_id": company_id,
+            "agent_id": "BA-001",
+            "event_type": "WORKING",
+            "payload": {"task": "x" * 501},
+        }
+    )
+    batch = await client.post(
+        "/api/events/batch",
+        json={"events": [{"company_id": company_id, "agent_id": "BA-001", "event_type": "X" * 60}]},
+    )
+
+    assert long_type.status_code == 422
+    assert long_task.status_code == 422
+    assert batch.json()["results"][0]["status"] == "rejected"
+    assert queued_mode.stats()["enqueued"] == enqueued_before
@@ -233,3 +233,364 @@ async def test_get_logs_includes_inferred_actions(client, company_with_events):
         for log in logs:
             assert "inferred_actions" in log
             assert isinstance(log["inferred_actions"], list)
+
+
+# ============== Conditional Requests (ETag) ==============
+
+@pytest.mark.asyncio
+async def test_get_logs_etag_returns_304_until_new_event(client, company_with_events):
+    """Test /logs answers 304 for a matching ETag and 200 after a new event."""
+    company_id = company_with_events
+    url = f"/api/companies/{company_id}/logs?limit=2"
+
+    etag = (await client.get(url)).headers["etag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    # Different query parameters are a different representation
+    other = await client.get(f"/api/companies/{company_id}/logs?limit=3", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "IDLE"}
+    )
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 200
+
+
+# ============== Cursor Pagination ==============
+
+@pytest.mark.asyncio
+async def test_get_logs_cursor_walks_all_pages(client, company_with_events):
+    """Test following next_cursor returns every log once, newest first."""
+    company_id = company_with_events
+
+    all_ids = [log["id"] for log in (await client.get(f"/api/companies/{company_id}/logs")).json()["logs"]]
+
+    seen = []
+    url = f"/api/companies/{company_id}/logs?limit=3"
+    while True:
+        data = (await client.get(url)).json()
+        seen.extend(log["id"] for log in data["logs"])
+        if data["next_cursor"] is None:
+            assert data["has_more"] is False
+            break
+        assert data["has_more"] is True
+        url = f"/api/companies/{company_id}/logs?limit=3&cursor={data['next_cursor']}"
+
+    assert seen == all_ids
+    assert len(seen) == 4
+
+
+@pytest.mark.asyncio
+async def test_get_logs_cursor_with_filter(client, company_with_events):
+    """Test cursors combine with agent filters."""
+    company_id = company_with_events
+
+    first = (await client.get(f"/api/companies/{company_id}/logs?agent_id=DEV-001&limit=1")).json()
+    second = (
+        await client.get(
+            f"/api/companies/{company_id}/logs?agent_id=DEV-001&limit=1&cursor={first['next_cursor']}"
+        )
+    ).json()
+
+    assert second["logs"][0]["event_type"] == "WORKING"
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_logs_invalid_cursor_returns_400(client, company_with_events):
+    """Test a malformed cursor is rejected."""
+    response = await client.get(f"/api/companies/{company_with_events}/logs?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+# ============== Count Modes ==============
+
+@pytest.mark.asyncio
+async def test_get_logs_count_modes(client, company_with_events):
+    """Test exact, estimate and none count modes for total."""
+    company_id = company_with_events
+    url = f"/api/companies/{company_id}/logs?limit=1&agent_id=BA-001"
+
+    exact = (await client.get(f"{url}&count=exact")).json()
+    assert exact["total"] == 2
+    assert exact["total_estimated"] is False
+
+    # Small results fall back to an exact count
+    estimate = (await client.get(f"{url}&count=estimate")).json()
+    assert estimate["total"] == 2
+
+    none = (await client.get(f"{url}&count=none")).json()
+    assert none["total"] is None
+    assert none["has_more"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_logs_invalid_count_mode_returns_400(client, company_with_events):
+    """Test unknown count modes are rejected."""
+    response = await client.get(f"/api/companies/{company_with_events}/logs?count=fast")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_logs_estimate_uses_planner(client, company_with_events, monkeypatch):
+    """Test count=estimate returns the planner's row estimate for large filtered results."""
+    from app.core import pagination
+
+    monkeypatch.setattr(pagination, "EXACT_COUNT_THRESHOLD", 0)
+    data = (await client.get(f"/api/companies/{company_with_events}/logs?count=estimate&event_type=CODING")).json()
+
+    assert data["total_estimated"] is True
+    assert isinstance(data["total"], int)
+
+
+@pytest.mark.asyncio
+async def test_get_logs_estimate_unfiltered_reads_company_counter(client, company_with_events, monkeypatch):
+    """Test an unfiltered count=estimate returns the company's event_count without an EXPLAIN."""
+    from app.api import companies
+
+    async def no_explain(*args):
+        raise AssertionError("estimate_rows should not run for an unfiltered count")
+
+    monkeypatch.setattr(companies, "estimate_rows", no_explain)
+    url = f"/api/companies/{company_with_events}/logs"
+
+    estimate = (await client.get(url, params={"count": "estimate", "limit": 1})).json()
+    exact = (await client.get(url, params={"count": "exact"})).json()
+
+    assert estimate["total"] == exact["total"]
+    assert estimate["total_estimated"] is False
+
+
+@pytest.mark.asyncio
+async def test_get_logs_estimate_binds_filter_values(client, company_with_events, monkeypatch):
+    """Test count=estimate explains the filtered query with its real parameters."""
+    from app.core import pagination
+
+    monkeypatch.setattr(pagination, "EXACT_COUNT_THRESHOLD", 0)
+    url = f"/api/companies/{company_with_events}/logs"
+
+    by_agent = await client.get(url, params={"count": "estimate", "agent_id": "BA-001"})
+    assert by_agent.status_code == 200
+    assert by_agent.json()["total_estimated"] is True
+
+    # A value that looks like a named bind parameter stays a plain value
+    bind_like = await client.get(url, params={"count": "estimate", "agent_id": "BA-001 :x"})
+    assert bind_like.status_code == 200
+    assert bind_like.json()["logs"] == []
+
+
+# ============== Payload Filters ==============
+
+@pytest.mark.asyncio
+async def test_get_logs_filter_by_payload_key(client, company_with_events):
+    """Test payload.<key>=<value> returns events whose payload has that value."""
+    company_id = company_with_events
+
+    data = (await client.get(f"/api/companies/{company_id}/logs?payload.task=Writing specs")).json()
+
+    assert [log["event_type"] for log in data["logs"]] == ["WORKING"]
+    assert data["logs"][0]["from_agent"] == "BA-001"
+    assert data["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_logs_filter_by_payload_contains(client, company_with_events):
+    """Test payload_contains matches nested and non-string values."""
+    company_id = company_with_events
+    await client.post(
+        "/api/events",
+        json={
+            "company_id": company_id,
+            "agent_id": "DEV-001",
+            "event_type": "CODING",
+            "payload": {"build": {"number": 42, "ok": False}},
+        }
+    )
+
+    contains = '{"build": {"number": 42}}'
+    data = (await client.get(f"/api/companies/{company_id}/logs", params={"payload_contains": contains})).json()
+    assert [log["event_type"] for log in data["logs"]] == ["CODING"]
+
+    nested = (await client.get(f"/api/companies/{company_id}/logs?payload.build.number=42")).json()
+    assert nested["logs"] == []  # payload.<key> values are compared as strings
+
+
+@pytest.mark.asyncio
+async def test_get_logs_invalid_payload_contains_returns_400(client, company_with_events):
+    """Test payload_contains must be a JSON object."""
+    response = await client.get(
+        f"/api/companies/{company_with_events}/logs", params={"payload_contains": "[1, 2]"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_logs_payload_filters_with_estimate(client, company_with_events, monkeypatch):
+    """Test payload filters combine with count=estimate."""
+    from app.core import pagination
+
+    monkeypatch.setattr(pagination, "EXACT_COUNT_THRESHOLD", 0)
+    url = f"/api/companies/{company_with_events}/logs"
+
+    contains = await client.get(
+        url, params={"count": "estimate", "payload_contains": '{"task": "Writing specs"}'}
+    )
+    by_key = await client.get(url, params={"count": "estimate", "payload.task": "Writing specs"})
+
+    for response in (contains, by_key):
+        assert response.status_code == 200
+        data = response.json()
+        assert [log["event_type"] for log in data["logs"]] == ["WORKING"]
+        assert data["total_estimated"] is True
+
+
+# ============== Full-Text Search ==============
+
+@pytest.fixture
+async def company_with_search_events(client, company_with_events):
+    """Add events with searchable task, thought and message text."""
+    company_id = company_with_events
+    for agent_id, payload in (
+        ("DEV-001", {"task": "Fix login bug in auth service"}),
+        ("DEV-001", {"thought": "The login page also has a styling bug"}),
+        ("BA-001", {"message": "Customer reported a bug"}),
+    ):
+        await client.post(
+            "/api/events",
+            json={"company_id": company_id, "agent_id": agent_id, "event_type": "WORKING", "payload": payload}
+        )
+    return company_id
+
+
+@pytest.mark.asyncio
+async def test_get_logs_search_ranks_and_highlights(client, company_with_search_events):
+    """Test q= returns matching events by relevance with highlighted headlines."""
+    company_id = company_with_search_events
+
+    data = (await client.get(f"/api/companies/{company_id}/logs", params={"q": "login bug"})).json()
+
+    assert data["total"] == 2
+    assert data["logs"][0]["payload"]["task"] == "Fix login bug in auth service"
+    assert data["logs"][0]["rank"] >= data["logs"][1]["rank"]
+    assert "<mark>login</mark>" in data["logs"][0]["headline"]
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_logs_search_phrase_and_exclusion(client, company_with_search_events):
+    """Test web search syntax for phrases and excluded words."""
+    company_id = company_with_search_events
+
+    phrase = (await client.get(f"/api/companies/{company_id}/logs", params={"q": '"login bug"'})).json()
+    assert [log["payload"].get("task") for log in phrase["logs"]] == ["Fix login bug in auth service"]
+
+    excluded = (await client.get(f"/api/companies/{company_id}/logs", params={"q": "bug -login"})).json()
+    assert [log["payload"].get("message") for log in excluded["logs"]] == ["Customer reported a bug"]
+
+
+@pytest.mark.asyncio
+async def test_get_logs_search_with_cursor_returns_400(client, company_with_search_events):
+    """Test search results can't be paged with a time cursor."""
+    company_id = company_with_search_events
+    first = (await client.get(f"/api/companies/{company_id}/logs?limit=1")).json()
+
+    response = await client.get(
+        f"/api/companies/{company_id}/logs", params={"q": "bug", "cursor": first["next_cursor"]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_logs_search_with_estimate(client, company_with_search_events, monkeypatch):
+    """Test q= combines with count=estimate and an agent filter."""
+    from app.core import pagination
+
+    monkeypatch.setattr(pagination, "EXACT_COUNT_THRESHOLD", 0)
+    response = await client.get(
+        f"/api/companies/{company_with_search_events}/logs",
+        params={"q": "login bug", "agent_id": "DEV-001", "count": "estimate"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["logs"][0]["payload"]["task"] == "Fix login bug in auth service"
+    assert data["total_estimated"] is True
+
+
+# ============== Log Export ==============
+
+@pytest.mark.asyncio
+async def test_export_logs_ndjson_oldest_first(client, company_with_events):
+    """Test NDJSON export streams every event, oldest first."""
+    import json
+
+    company_id = company_with_events
+    response = await client.get(f"/api/companies/{company_id}/logs/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["event_type"] for row in rows] == ["THINKING", "WORKING", "WORKING", "ERROR"]
+    assert rows[0]["payload"] == {"thought": "Analyzing requirements"}
+    assert rows[0]["from_agent"] == "BA-001"
+    assert "T" in rows[0]["timestamp"]  # ISO 8601, as in /logs
+
+
+@pytest.mark.asyncio
+async def test_export_logs_csv_with_filters(client, company_with_events):
+    """Test CSV export applies agent and event type filters."""
+    import csv
+    import io
+
+    company_id = company_with_events
+    response = await client.get(
+        f"/api/companies/{company_id}/logs/export?format=csv&agent_id=DEV-001&event_type=ERROR"
+    )
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["event_type"] == "ERROR"
+    assert rows[0]["payload"] == '{"error": "Build failed"}'
+
+
+@pytest.mark.asyncio
+async def test_export_logs_gzip(client, company_with_events):
+    """Test gzip=true returns a gzip file of the export."""
+    import gzip
+
+    company_id = company_with_events
+    response = await client.get(f"/api/companies/{company_id}/logs/export?gzip=true")
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    assert len(gzip.decompress(response.content).decode().splitlines()) == 4
+
+
+@pytest.mark.asyncio
+async def test_export_and_logs_time_filters(client, company_with_events):
+    """Test from/to limit both /logs and the export to a time range."""
+    company_id = company_with_events
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()["logs"]
+    newest, second = logs[0]["timestamp"], logs[1]["timestamp"]
+
+    recent = (await client.get(f"/api/companies/{company_id}/logs", params={"from": second})).json()
+    assert recent["total"] == 2
+
+    export = await client.get(
+        f"/api/companies/{company_id}/logs/export", params={"from": second, "to": newest}
+    )
+    assert len(export.text.splitlines()) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_logs_unknown_company_and_format(client, company_with_events):
+    """Test export validates the company and format."""
+    missing = await client.get("/api/companies/00000000-0000-0000-0000-000000000000/logs/export")
+    assert missing.status_code == 404
+
+    bad_format = await client.get(f"/api/companies/{company_with_events}/logs/export?format=xml")
+    assert bad_format.status_code == 400
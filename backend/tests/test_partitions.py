@@ -0,0 +1,186 @@
+"""Tests for monthly events partitions and partition-based retention."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import text
+
+from app.models import Event
+from app.services.partitions import (
+    create_event_partition,
+    ensure_event_partitions,
+    event_read_horizon,
+    expire_default_partition_events,
+    expire_event_partitions,
+)
+
+
+async def _create_company(client, **fields) -> str:
+    company_resp = await client.post("/api/companies", json={"name": "Retention Co", **fields})
+    return company_resp.json()["company_id"]
+
+
+async def _insert_event(test_engine, company_id: str, timestamp: datetime) -> None:
+    async with AsyncSession(test_engine) as session:
+        session.add(Event(company_id=company_id, event_type="WORKING", timestamp=timestamp))
+        await session.commit()
+
+
+async def _drop_tables(test_engine, *names: str) -> None:
+    async with test_engine.begin() as conn:
+        for name in names:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+@pytest.mark.asyncio
+async def test_ensure_creates_upcoming_partitions_once(client, test_engine):
+    """Test partitions are created for the current month and the months ahead."""
+    try:
+        async with AsyncSession(test_engine) as session:
+            created = await ensure_event_partitions(session, 2, today=date(2030, 11, 20))
+            again = await ensure_event_partitions(session, 2, today=date(2030, 11, 20))
+    finally:
+        await _drop_tables(test_engine, "events_p2030_11", "events_p2030_12", "events_p2031_01")
+
+    assert created == ["events_p2030_11", "events_p2030_12", "events_p2031_01"]
+    assert again == []
+
+
+@pytest.mark.asyncio
+async def test_expired_partition_is_dropped(client, test_engine):
+    """Test a month past retention is dropped as a whole partition."""
+    company_id = await _create_company(client)
+    async with AsyncSession(test_engine) as session:
+        await create_event_partition(session, date(2020, 1, 1))
+        await session.commit()
+    await _insert_event(test_engine, company_id, datetime(2020, 1, 15))
+
+    try:
+        async with AsyncSession(test_engine) as session:
+            expired = await expire_event_partitions(session, 30, "drop", now=datetime(2020, 4, 1))
+            exists = await session.scalar(text("SELECT to_regclass('events_p2020_01') IS NOT NULL"))
+            remaining = await session.scalar(text("SELECT count(*) FROM events"))
+    finally:
+        await _drop_tables(test_engine, "events_p2020_01")
+
+    assert expired == ["events_p2020_01"]
+    assert not exists
+    assert remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_partition_can_be_kept_detached(client, test_engine):
+    """Test the detach action removes the month from events but keeps its table."""
+    company_id = await _create_company(client)
+    async with AsyncSession(test_engine) as session:
+        await create_event_partition(session, date(2020, 1, 1))
+        await session.commit()
+    await _insert_event(test_engine, company_id, datetime(2020, 1, 15))
+
+    try:
+        async with AsyncSession(test_engine) as session:
+            # A month that is only partly past retention is kept
+            kept = await expire_event_partitions(session, 30, "detach", now=datetime(2020, 2, 15))
+            expired = await expire_event_partitions(session, 30, "detach", now=datetime(2020, 4, 1))
+            in_events = await session.scalar(text("SELECT count(*) FROM events"))
+            detached = await session.scalar(text("SELECT count(*) FROM events_p2020_01"))
+    finally:
+        await _drop_tables(test_engine, "events_p2020_01")
+
+    assert kept == []
+    assert expired == ["events_p2020_01"]
+    assert in_events == 0
+    assert detached == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_rows_are_deleted_from_default_partition(client, test_engine):
+    """Test rows past retention in the default partition are deleted and uncounted."""
+    company_id = await _create_company(client)
+    # No partition exists for 2019, so these rows land in the default partition
+    await _insert_event(test_engine, company_id, datetime(2019, 3, 5))
+    await _insert_event(test_engine, company_id, datetime(2019, 6, 5))
+    async with test_engine.begin() as conn:
+        await conn.execute(text("UPDATE companies SET event_count = 2 WHERE id = :id"), {"id": company_id})
+
+    async with AsyncSession(test_engine) as session:
+        deleted = await expire_default_partition_events(session, 30, now=datetime(2019, 5, 1))
+        remaining = await session.scalar(text("SELECT count(*) FROM events_default"))
+        event_count = await session.scalar(
+            text("SELECT event_count FROM companies WHERE id = :id"), {"id": company_id}
+        )
+
+    assert deleted == 1
+    assert remaining == 1
+    assert event_count == 1
+
+
+@pytest.mark.asyncio
+async def test_company_retention_hides_old_logs(client, test_engine):
+    """Test a company's retention_days limits its logs and export."""
+    company_id = await _create_company(
+        client, agents=[{"agent_id": "DEV-001", "name": "Bob", "role": "developer"}]
+    )
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "THINKING"}
+    )
+    await _insert_event(test_engine, company_id, datetime.utcnow() - timedelta(days=30))
+
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()
+    assert logs["total"] == 2
+
+    update_resp = await client.patch(f"/api/companies/{company_id}", json={"retention_days": 7})
+    assert update_resp.status_code == 200
+    assert update_resp.json()["retention_days"] == 7
+
+    logs = (await client.get(f"/api/companies/{company_id}/logs")).json()
+    assert logs["total"] == 1
+    assert logs["logs"][0]["event_type"] == "THINKING"
+
+    export_resp = await client.get(f"/api/companies/{company_id}/logs/export")
+    assert len(export_resp.text.splitlines()) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_company_validates_retention(client):
+    """Test retention_days must be positive and can be cleared."""
+    company_id = await _create_company(client, retention_days=14)
+
+    assert (await client.get(f"/api/companies/{company_id}")).json()["retention_days"] == 14
+
+    invalid_resp = await client.patch(f"/api/companies/{company_id}", json={"retention_days": 0})
+    assert invalid_resp.status_code == 422
+
+    cleared_resp = await client.patch(f"/api/companies/{company_id}", json={"retention_days": None})
+    assert cleared_resp.json()["retention_days"] is None
+    assert cleared_resp.json()["name"] == "Retention Co"
+
+
+def test_read_horizon_uses_shorter_window():
+    """Test the company window applies only when shorter than the global one."""
+    now = datetime(2026, 10, 17, 12, 30)
+
+    assert event_read_horizon(None, now=now) is None
+    assert event_read_horizon(7, now=now) == datetime(2026, 10, 10, 12, 0)
+
+
+@pytest.mark.asyncio
+async def test_time_range_queries_prune_partitions(client, test_engine):
+    """Test logs filtered by time only scan the matching monthly partitions."""
+    async with AsyncSession(test_engine) as session:
+        await create_event_partition(session, date(2020, 1, 1))
+        await session.commit()
+
+    try:
+        async with test_engine.connect() as conn:
+            result = await conn.execute(
+                text("EXPLAIN SELECT * FROM events WHERE timestamp >= '2026-10-01'")
+            )
+            plan = "\n".join(row[0] for row in result)
+    finally:
+        await _drop_tables(test_engine, "events_p2020_01")
+
+    assert "events_p2026_10" in plan
+    assert "events_p2020_01" not in plan
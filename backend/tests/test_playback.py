@@ -0,0 +1,275 @@
+"""Tests for accelerated playback of recorded company events."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import text, update
+
+from app.models import Agent, Event
+from app.services.playback import play_events, playbacks
+
+
+async def _create_company(client) -> str:
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Playback Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+async def _insert_history(test_engine, company_id: str, count: int) -> datetime:
+    """Insert `count` CODING events by DEV-001 a minute apart; returns the first timestamp."""
+    start = datetime(2026, 10, 1, 9, 0)
+    async with AsyncSession(test_engine) as session:
+        await session.execute(
+            update(Agent).where(Agent.company_id == company_id).values(created_at=start - timedelta(minutes=1))
+        )
+        for i in range(count):
+            session.add(
+                Event(
+                    company_id=company_id,
+                    from_agent_id="DEV-001",
+                    event_type="CODING",
+                    payload={"task": f"Task {i}"},
+                    timestamp=start + timedelta(minutes=i),
+                )
+            )
+        await session.commit()
+    return start
+
+
+def _parse(message: str) -> tuple[str, dict]:
+    event_type, data = message.strip().split("\n")
+    return event_type.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def _parse_stream(body: str) -> list[tuple[str, dict]]:
+    return [_parse(block) for block in body.split("\n\n") if block.startswith("event:")]
+
+
+def _session_factory(test_engine) -> sessionmaker:
+    return sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+# ============== Playback Stream ==============
+
+@pytest.mark.asyncio
+async def test_playback_streams_range_in_order(client, test_engine):
+    """Test playback sends the starting state, the range's events in order, then end."""
+    company_id = await _create_company(client)
+    start = await _insert_history(test_engine, company_id, 5)
+
+    resp = await client.get(
+        f"/api/companies/{company_id}/playback",
+        params={
+            "from": (start + timedelta(minutes=1)).isoformat(),
+            "to": (start + timedelta(minutes=4)).isoformat(),
+            "speed": 50,
+            "max_gap": 0.01,
+        },
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    messages = _parse_stream(resp.text)
+    assert [event_type for event_type, _ in messages] == ["playback", "state", "event", "event", "event", "end"]
+
+    # The state before the range already has the first event applied
+    agents = {a["agent_id"]: a for a in messages[1][1]["agents"]}
+    assert agents["DEV-001"]["current_task"] == "Task 0"
+
+    events = [data for event_type, data in messages if event_type == "event"]
+    assert [e["payload"]["task"] for e in events] == ["Task 1", "Task 2", "Task 3"]
+    assert [a["agent_id"] for a in events[0]["agents"]] == ["DEV-001"]
+    assert events[0]["agents"][0]["current_task"] == "Task 1"
+    assert playbacks.stats()["open"] == 0
+
+
+@pytest.mark.asyncio
+async def test_playback_adds_agents_created_during_range(client, test_engine):
+    """Test an agent created partway through the range joins the playback with its events."""
+    company_id = await _create_company(client)
+    start = await _insert_history(test_engine, company_id, 2)
+    await client.post(
+        f"/api/companies/{company_id}/agents",
+        json={"agent_id": "QA-001", "name": "Quinn", "role": "qa"}
+    )
+    async with AsyncSession(test_engine) as session:
+        await session.execute(
+            update(Agent)
+            .where(Agent.company_id == company_id, Agent.agent_id == "QA-001")
+            .values(created_at=start + timedelta(seconds=90))
+        )
+        session.add(
+            Event(
+                company_id=company_id,
+                from_agent_id="QA-001",
+                event_type="WORKING",
+                payload={"task": "Test plan"},
+                timestamp=start + timedelta(minutes=2),
+            )
+        )
+        await session.commit()
+
+    resp = await client.get(
+        f"/api/companies/{company_id}/playback",
+        params={
+            "from": start.isoformat(),
+            "to": (start + timedelta(minutes=3)).isoformat(),
+            "speed": 50,
+            "max_gap": 0.01,
+        },
+    )
+
+    messages = _parse_stream(resp.text)
+    assert "QA-001" not in [a["agent_id"] for a in messages[1][1]["agents"]]
+    events = [data for event_type, data in messages if event_type == "event"]
+    assert [e["from_agent"] for e in events] == ["DEV-001", "DEV-001", "QA-001"]
+    assert events[-1]["agents"][0]["agent_id"] == "QA-001"
+    assert events[-1]["agents"][0]["current_task"] == "Test plan"
+
+
+@pytest.mark.asyncio
+async def test_playback_validates_request(client):
+    """Test playback rejects unknown companies, empty ranges and out-of-range speeds."""
+    company_id = await _create_company(client)
+    now = datetime.utcnow()
+    params = {"from": now.isoformat(), "to": (now + timedelta(hours=1)).isoformat()}
+
+    missing_resp = await client.get(
+        "/api/companies/00000000-0000-0000-0000-000000000000/playback", params=params
+    )
+    assert missing_resp.status_code == 404
+
+    empty_resp = await client.get(
+        f"/api/companies/{company_id}/playback", params={"from": params["to"], "to": params["from"]}
+    )
+    assert empty_resp.status_code == 400
+
+    fast_resp = await client.get(f"/api/companies/{company_id}/playback", params={**params, "speed": 51})
+    assert fast_resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_control_unknown_playback_returns_404(client):
+    """Test controlling a playback that is not open returns 404."""
+    company_id = await _create_company(client)
+
+    resp = await client.post(
+        f"/api/companies/{company_id}/playback/00000000-0000-0000-0000-000000000000",
+        json={"paused": True},
+    )
+
+    assert resp.status_code == 404
+
+
+# ============== Pause and Seek ==============
+
+@pytest.mark.asyncio
+async def test_playback_pause_holds_next_event(client, test_engine):
+    """Test a paused playback sends nothing until it is resumed."""
+    company_id = await _create_company(client)
+    start = await _insert_history(test_engine, company_id, 3)
+    control = playbacks.open(UUID(company_id), start, start + timedelta(minutes=3), speed=50)
+    stream = play_events(_session_factory(test_engine), control, max_gap_seconds=0.01, keepalive_seconds=10, max_pause_seconds=60)
+
+    try:
+        assert _parse(await anext(stream))[0] == "playback"
+        assert _parse(await anext(stream))[0] == "state"
+        assert _parse(await anext(stream))[1]["payload"]["task"] == "Task 0"
+
+        resp = await client.post(
+            f"/api/companies/{company_id}/playback/{control.id}", json={"paused": True}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["paused"] is True
+
+        waiting = asyncio.create_task(anext(stream))
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+
+        control.update(paused=False, speed=None, seek_to=None)
+        event_type, data = _parse(await asyncio.wait_for(waiting, 5))
+        assert event_type == "event"
+        assert data["payload"]["task"] == "Task 1"
+    finally:
+        await stream.aclose()
+        playbacks.close(control.id)
+
+
+@pytest.mark.asyncio
+async def test_playback_seek_restarts_at_target(client, test_engine):
+    """Test seeking sends the state at the target, then continues from there."""
+    company_id = await _create_company(client)
+    start = await _insert_history(test_engine, company_id, 6)
+    control = playbacks.open(UUID(company_id), start, start + timedelta(minutes=6), speed=1)
+    # Real minute gaps at 1x: the stream only moves on because of the seek
+    stream = play_events(_session_factory(test_engine), control, max_gap_seconds=60, keepalive_seconds=10, max_pause_seconds=60)
+
+    try:
+        for _ in range(3):
+            await anext(stream)  # playback, state, Task 0
+
+        out_of_range = await client.post(
+            f"/api/companies/{company_id}/playback/{control.id}",
+            json={"seek_to": (start + timedelta(hours=1)).isoformat()},
+        )
+        assert out_of_range.status_code == 400
+
+        target = start + timedelta(minutes=4)
+        resp = await client.post(
+            f"/api/companies/{company_id}/playback/{control.id}",
+            json={"seek_to": target.isoformat(), "speed": 50},
+        )
+        assert resp.status_code == 200
+
+        event_type, data = _parse(await asyncio.wait_for(anext(stream), 5))
+        assert event_type == "state"
+        assert data["at"] == target.isoformat()
+        agents = {a["agent_id"]: a for a in data["agents"]}
+        assert agents["DEV-001"]["current_task"] == "Task 3"
+
+        event_type, data = _parse(await asyncio.wait_for(anext(stream), 5))
+        assert data["payload"]["task"] == "Task 4"
+    finally:
+        await stream.aclose()
+        playbacks.close(control.id)
+
+
+@pytest.mark.asyncio
+async def test_paused_playback_holds_no_lock_on_events(client, test_engine):
+    """Test a paused playback leaves events free for partition DDL, and ends after the pause limit."""
+    company_id = await _create_company(client)
+    start = await _insert_history(test_engine, company_id, 3)
+    control = playbacks.open(UUID(company_id), start, start + timedelta(minutes=3), speed=50)
+    stream = play_events(
+        _session_factory(test_engine), control, max_gap_seconds=0.01, keepalive_seconds=10, max_pause_seconds=0.3
+    )
+
+    try:
+        for _ in range(3):
+            await anext(stream)  # playback, state, Task 0
+        control.update(paused=True, speed=None, seek_to=None)
+        waiting = asyncio.create_task(anext(stream))
+        await asyncio.sleep(0.05)
+
+        async with test_engine.begin() as conn:
+            await conn.execute(text("LOCK TABLE events IN ACCESS EXCLUSIVE MODE NOWAIT"))
+
+        event_type, data = _parse(await asyncio.wait_for(waiting, 5))
+        assert event_type == "end"
+        assert data["paused_too_long"] is True
+    finally:
+        await stream.aclose()
+        playbacks.close(control.id)
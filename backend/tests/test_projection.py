@@ -0,0 +1,131 @@
+"""Tests for the in-memory company state projection."""
+
+from uuid import UUID
+
+import pytest
+from sqlmodel import text
+
+from app.services.projection import company_projections
+
+
+@pytest.fixture
+async def company_id(client):
+    """Create a company with two agents."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Projection Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+@pytest.mark.asyncio
+async def test_state_served_from_projection_after_writes(client, company_id):
+    """Test writes are applied to the projection instead of forcing a rebuild."""
+    await client.get(f"/api/companies/{company_id}/state")
+
+    await client.post(
+        "/api/events",
+        json={
+            "company_id": company_id,
+            "agent_id": "BA-001",
+            "event_type": "WORK_REQUEST",
+            "to_agent": "DEV-001",
+            "payload": {"task": "Spec review"},
+        }
+    )
+    await client.post(
+        f"/api/companies/{company_id}/agents",
+        json={"agent_id": "BA-002", "name": "Dana", "role": "ba"}
+    )
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+
+    agents = {a["agent_id"]: a for a in state["agents"]}
+    assert agents["BA-001"]["status"] == "walking"
+    assert agents["DEV-001"]["status"] == "working"
+    assert agents["BA-002"]["role_config"]["role_id"] == "ba"
+    assert len(state["pending_movements"]) == 2
+
+    stats = company_projections.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["applied"] == 2
+
+
+@pytest.mark.asyncio
+async def test_projection_matches_rebuild(client, company_id):
+    """Test a projection kept current from commits equals a cold rebuild."""
+    await client.get(f"/api/companies/{company_id}/state")
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "REVIEW_REQUEST", "to_agent": "BA-001"}
+    )
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    movement = state["pending_movements"][0]
+    await client.post(f"/api/companies/{company_id}/movements/{movement['id']}/complete")
+    await client.delete(f"/api/companies/{company_id}/agents/BA-001")
+
+    warm = (await client.get(f"/api/companies/{company_id}/state")).json()
+    company_projections.clear()
+    cold = (await client.get(f"/api/companies/{company_id}/state")).json()
+
+    assert warm == cold
+    assert [a["agent_id"] for a in warm["agents"]] == ["DEV-001"]
+    assert [m["purpose"] for m in warm["pending_movements"]] == ["return"]
+
+
+@pytest.mark.asyncio
+async def test_projection_delta_reports_removals(client, company_id):
+    """Test ?since= deltas answered from the projection include removed ids."""
+    version = (await client.get(f"/api/companies/{company_id}/state")).json()["version"]
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "MESSAGE_SEND", "to_agent": "DEV-001"}
+    )
+    await client.delete(f"/api/companies/{company_id}/agents/BA-001")
+
+    delta = (await client.get(f"/api/companies/{company_id}/state?since={version}")).json()
+    assert delta["is_delta"] is True
+    assert [a["agent_id"] for a in delta["agents"]] == ["DEV-001"]
+    assert delta["pending_movements"] == []
+    assert delta["removed_agent_ids"] == ["BA-001"]
+    assert len(delta["removed_movement_ids"]) == 2
+    assert company_projections.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_external_write_triggers_rebuild(client, company_id, test_engine):
+    """Test a version bump made by another process is not served stale."""
+    await client.get(f"/api/companies/{company_id}/state")
+
+    # Simulate another API worker writing directly to the database
+    async with test_engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE agents SET status = 'error' WHERE agent_id = 'BA-001'")
+        )
+        await conn.execute(
+            text("UPDATE companies SET version = version + 1 WHERE id = :id"),
+            {"id": UUID(company_id)},
+        )
+
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    agents = {a["agent_id"]: a for a in state["agents"]}
+    assert agents["BA-001"]["status"] == "error"
+    assert company_projections.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_company_with_removal_history(client, company_id):
+    """Test deleting a company also removes its tombstones and projection."""
+    await client.get(f"/api/companies/{company_id}/state")
+    await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+
+    response = await client.delete(f"/api/companies/{company_id}")
+    assert response.status_code == 200
+    assert company_projections.stats()["size"] == 0
+    assert (await client.get(f"/api/companies/{company_id}/state")).status_code == 404
@@ -0,0 +1,233 @@
+"""Tests for time-travel state reconstruction (/state?at=)."""
+
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import func, select, update
+
+from app.models import Agent, Company, Event, StateSnapshot
+from app.services.replay import StateReplay, snapshot_company_states, state_replay
+
+
+async def _create_company(client) -> str:
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Replay Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+async def _send(client, company_id, agent_id, event_type, **fields) -> str:
+    resp = await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": agent_id, "event_type": event_type, **fields}
+    )
+    return resp.json()["timestamp"]
+
+
+async def _insert_history(test_engine, company_id: str, count: int) -> datetime:
+    """Insert `count` events a minute apart, starting two hours ago; returns the start."""
+    start = datetime.utcnow() - timedelta(hours=2)
+    async with AsyncSession(test_engine) as session:
+        # The agents have to exist before their history
+        await session.execute(
+            update(Agent).where(Agent.company_id == company_id).values(created_at=start - timedelta(minutes=1))
+        )
+        for i in range(count):
+            session.add(
+                Event(
+                    company_id=company_id,
+                    from_agent_id="DEV-001" if i % 2 else "BA-001",
+                    to_agent_id="DEV-001" if i % 5 == 0 else None,
+                    event_type="WORK_REQUEST" if i % 5 == 0 else ("CODING" if i % 3 else "IDLE"),
+                    payload={"task": f"Task {i}", "notes": "x" * 100},
+                    timestamp=start + timedelta(minutes=i),
+                )
+            )
+        # The company counters ingestion would have maintained
+        await session.execute(
+            update(Company)
+            .where(Company.id == company_id)
+            .values(
+                event_count=Company.event_count + count,
+                last_activity=func.greatest(Company.last_activity, start + timedelta(minutes=count - 1)),
+            )
+        )
+        await session.commit()
+    return start
+
+
+def _states(agents) -> dict:
+    return {a.agent_id: (a.status, a.current_task, a.zone) for a in agents}
+
+
+async def _agents_at(client, company_id, at) -> dict:
+    resp = await client.get(f"/api/companies/{company_id}/state", params={"at": at})
+    assert resp.status_code == 200
+    return {a["agent_id"]: a for a in resp.json()["agents"]}
+
+
+@pytest.mark.asyncio
+async def test_state_at_replays_events(client):
+    """Test statuses, tasks and zones at points between events."""
+    company_id = await _create_company(client)
+    before = datetime.utcnow().isoformat()
+    t1 = await _send(client, company_id, "DEV-001", "THINKING", payload={"task": "Plan login"})
+    t2 = await _send(client, company_id, "BA-001", "WORK_REQUEST", to_agent="DEV-001")
+    t3 = await _send(client, company_id, "DEV-001", "TASK_COMPLETE")
+
+    agents = await _agents_at(client, company_id, before)
+    assert agents["DEV-001"]["status"] == "idle"
+
+    agents = await _agents_at(client, company_id, t1)
+    assert agents["DEV-001"]["status"] == "thinking"
+    assert agents["DEV-001"]["current_task"] == "Plan login"
+
+    agents = await _agents_at(client, company_id, t2)
+    assert agents["DEV-001"]["status"] == "working"
+    assert agents["BA-001"]["status"] == "idle"
+    assert agents["BA-001"]["position"]["zone"] == "ba"
+
+    agents = await _agents_at(client, company_id, t3)
+    assert agents["DEV-001"]["status"] == "idle"
+    assert agents["DEV-001"]["current_task"] is None
+
+
+@pytest.mark.asyncio
+async def test_state_at_excludes_later_agents(client):
+    """Test agents added after the requested time are not shown."""
+    company_id = await _create_company(client)
+    at = datetime.utcnow().isoformat()
+    await client.post(
+        f"/api/companies/{company_id}/agents",
+        json={"agent_id": "QA-001", "name": "Carol", "role": "qa"}
+    )
+
+    agents = await _agents_at(client, company_id, at)
+    assert set(agents) == {"BA-001", "DEV-001"}
+
+
+@pytest.mark.asyncio
+async def test_state_at_rejects_since(client):
+    """Test at and since can't be combined."""
+    company_id = await _create_company(client)
+    resp = await client.get(
+        f"/api/companies/{company_id}/state", params={"at": datetime.utcnow().isoformat(), "since": 1}
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_scrubbing_resumes_from_checkpoints(client, test_engine, monkeypatch):
+    """Test later replays start from a checkpoint and match a full replay."""
+    company_id = await _create_company(client)
+    start = await _insert_history(test_engine, company_id, 40)
+    monkeypatch.setattr(state_replay, "checkpoint_interval", 10)
+
+    await _agents_at(client, company_id, (start + timedelta(minutes=39)).isoformat())
+    replayed = state_replay.events_replayed
+    assert state_replay.stats()["checkpoints"] == 4
+
+    at = start + timedelta(minutes=33)
+    agents = await _agents_at(client, company_id, at.isoformat())
+    assert state_replay.checkpoint_hits == 1
+    assert state_replay.events_replayed - replayed == 4
+
+    async with AsyncSession(test_engine) as session:
+        full, _ = await StateReplay(1, 1000, 10).state_at(session, company_id, at)
+    assert _states(full) == {
+        agent_id: (a["status"], a["current_task"], a["position"]["zone"]) for agent_id, a in agents.items()
+    }
+
+
+# ============== Snapshots ==============
+
+@pytest.mark.asyncio
+async def test_snapshot_job_snapshots_busy_companies(client, test_engine):
+    """Test companies with enough new events get a snapshot at their last event."""
+    busy_id = await _create_company(client)
+    start = await _insert_history(test_engine, busy_id, 40)
+    quiet_id = await _create_company(client)
+    await _insert_history(test_engine, quiet_id, 5)
+    await client.post(
+        "/api/events",
+        json={"company_id": busy_id, "agent_id": "DEV-001", "event_type": "CODING"}
+    )
+
+    async with AsyncSession(test_engine) as session:
+        full, _ = await StateReplay(1, 1000, 10).state_at(session, busy_id, datetime.utcnow())
+        taken = await snapshot_company_states(session, 30, max_age=timedelta(days=1))
+        again = await snapshot_company_states(session, 30, max_age=timedelta(days=1))
+        snapshot = (await session.execute(select(StateSnapshot))).scalars().one()
+
+    assert (taken, again) == (1, 0)
+    assert snapshot.company_id == UUID(busy_id)
+    # Recent events are left for a later snapshot
+    assert snapshot.position_timestamp == start + timedelta(minutes=39)
+
+    replay = StateReplay(1, 1000, 10)
+    async with AsyncSession(test_engine) as session:
+        agents, _ = await replay.state_at(session, busy_id, datetime.utcnow())
+    assert replay.snapshot_hits == 1
+    assert replay.events_replayed == 1
+    assert _states(agents) == _states(full)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_job_snapshots_stale_companies(client, test_engine):
+    """Test any new events are snapshotted once the last snapshot is old enough."""
+    company_id = await _create_company(client)
+    await _insert_history(test_engine, company_id, 5)
+
+    async with AsyncSession(test_engine) as session:
+        taken = await snapshot_company_states(session, 1000, max_age=timedelta(minutes=30))
+
+    assert taken == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_job_skips_idle_companies(client, test_engine):
+    """Test companies without events, or without events since their snapshot, aren't candidates."""
+    await _create_company(client)
+    company_id = await _create_company(client)
+    await _insert_history(test_engine, company_id, 5)
+
+    async with AsyncSession(test_engine) as session:
+        first = await snapshot_company_states(session, 1000, max_age=timedelta(minutes=30))
+        again = await snapshot_company_states(session, 1, max_age=timedelta(seconds=0))
+        # Events written without touching the counters aren't noticed
+        session.add(
+            Event(
+                company_id=company_id,
+                from_agent_id="BA-001",
+                event_type="IDLE",
+                timestamp=datetime.utcnow() - timedelta(hours=1),
+            )
+        )
+        await session.commit()
+        unnoticed = await snapshot_company_states(session, 1, max_age=timedelta(seconds=0))
+
+    assert (first, again, unnoticed) == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_deleting_an_agent_drops_snapshots(client, test_engine):
+    """Test snapshots replayed from since-deleted events are discarded."""
+    company_id = await _create_company(client)
+    await _insert_history(test_engine, company_id, 5)
+    async with AsyncSession(test_engine) as session:
+        await snapshot_company_states(session, 1, max_age=timedelta(minutes=30))
+
+    await client.delete(f"/api/companies/{company_id}/agents/BA-001")
+
+    async with AsyncSession(test_engine) as session:
+        remaining = await session.scalar(select(func.count()).select_from(StateSnapshot))
+    assert remaining == 0
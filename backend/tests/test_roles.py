@@ -0,0 +1,76 @@
+"""Tests for the role configuration registry."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import RoleConfig
+from app.models.role_config import CUSTOM_ROLE_COLORS, DEFAULT_ROLES
+from app.services.roles import RoleRegistry, role_registry
+
+
+@pytest.mark.asyncio
+async def test_preload_seeds_default_roles(client, test_engine):
+    """Test preload seeds DEFAULT_ROLES once and caches them."""
+    registry = RoleRegistry()
+    async with AsyncSession(test_engine) as session:
+        await registry.preload(session)
+        await registry.preload(session)
+        result = await session.execute(select(RoleConfig))
+        stored = result.scalars().all()
+
+    assert len(stored) == len(DEFAULT_ROLES)
+    assert registry.get("developer").display_name == "Developer"
+    assert registry.get("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_state_polls_use_cached_role_configs(client):
+    """Test repeated /state polls don't look role configs up in the database."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Roles Co",
+            "agents": [
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+                {"agent_id": "SEC-001", "name": "Eve", "role": "security_engineer"},
+            ],
+        }
+    )
+    company_id = company_resp.json()["company_id"]
+
+    for _ in range(3):
+        state = (await client.get(f"/api/companies/{company_id}/state")).json()
+
+    assert state["role_configs"]["security_engineer"]["display_name"] == "Security Engineer"
+    assert role_registry.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_custom_roles_get_distinct_colors(client, test_engine):
+    """Test custom roles created concurrently get distinct palette colors."""
+    roles = [f"custom_role_{i}" for i in range(4)]
+
+    async def create(role):
+        # Separate registries stand in for separate API workers
+        async with AsyncSession(test_engine) as session:
+            return await RoleRegistry().resolve(session, role)
+
+    configs = await asyncio.gather(*(create(role) for role in roles))
+
+    colors = {config.color for config in configs}
+    assert colors == {color for color, _ in CUSTOM_ROLE_COLORS[:4]}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creation_of_same_role_agrees(client, test_engine):
+    """Test racing creators of one custom role all return the stored config."""
+    async def create():
+        async with AsyncSession(test_engine) as session:
+            return await RoleRegistry().resolve(session, "data_scientist")
+
+    configs = await asyncio.gather(*(create() for _ in range(3)))
+
+    assert len({config.color for config in configs}) == 1
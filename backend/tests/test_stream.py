@@ -0,0 +1,104 @@
+"""Tests for the company change stream."""
+
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.sse import format_sse
+from app.services.broadcaster import CompanyBroadcaster, company_broadcaster
+
+
+@pytest.fixture
+async def company_id(client):
+    """Create a company with two agents."""
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Stream Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+@pytest.mark.asyncio
+async def test_stream_unknown_company_returns_404(client):
+    """Test GET /stream for a missing company returns 404."""
+    response = await client.get(f"/api/companies/{uuid4()}/stream")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_committed_event_is_published(client, company_id):
+    """Test subscribers receive agent and movement changes after an event commits."""
+    queue = company_broadcaster.subscribe(UUID(company_id))
+    try:
+        await client.post(
+            "/api/events",
+            json={
+                "company_id": company_id,
+                "agent_id": "BA-001",
+                "to_agent": "DEV-001",
+                "event_type": "WORK_REQUEST",
+                "payload": {"task": "Build login"}
+            }
+        )
+        changes = _drain(queue)
+    finally:
+        company_broadcaster.unsubscribe(UUID(company_id), queue)
+
+    types = [change_type for change_type, _ in changes]
+    assert types == ["agent_status", "agent_status", "movement_created", "movement_created"]
+    assert changes[0][1] == {"agent_id": "BA-001", "status": "walking", "current_task": None}
+    assert changes[1][1]["current_task"] == "Build login"
+
+
+@pytest.mark.asyncio
+async def test_movement_completion_is_published(client, company_id):
+    """Test completing a movement publishes movement_completed."""
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "to_agent": "DEV-001", "event_type": "FEEDBACK"}
+    )
+    state = (await client.get(f"/api/companies/{company_id}/state")).json()
+    movement = next(m for m in state["pending_movements"] if m["purpose"] == "return")
+
+    queue = company_broadcaster.subscribe(UUID(company_id))
+    try:
+        await client.post(f"/api/companies/{company_id}/movements/{movement['id']}/complete")
+        changes = _drain(queue)
+    finally:
+        company_broadcaster.unsubscribe(UUID(company_id), queue)
+
+    assert changes == [(
+        "movement_completed",
+        {"movement_id": movement["id"], "agent_id": "BA-001", "zone": "ba", "status": "idle"},
+    )]
+
+
+def test_slow_subscriber_gets_resync():
+    """Test an overflowing subscriber queue collapses to a single resync message."""
+    broadcaster = CompanyBroadcaster(queue_size=2)
+    company_id = uuid4()
+    queue = broadcaster.subscribe(company_id)
+
+    for i in range(3):
+        broadcaster.publish(company_id, "agent_status", {"n": i})
+
+    assert _drain(queue) == [("resync", {})]
+    assert broadcaster.stats()["resyncs"] == 1
+
+
+def test_format_sse():
+    """Test SSE message framing."""
+    assert format_sse("ready", {"a": 1}) == 'event: ready\ndata: {"a": 1}\n\n'
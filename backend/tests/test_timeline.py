@@ -0,0 +1,150 @@
+"""Tests for the bucketed event timeline."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Event
+from app.services.timeline import bucket_start, timeline_cache
+
+
+async def _create_company(client) -> str:
+    company_resp = await client.post(
+        "/api/companies",
+        json={
+            "name": "Timeline Co",
+            "agents": [
+                {"agent_id": "BA-001", "name": "Alice", "role": "ba"},
+                {"agent_id": "DEV-001", "name": "Bob", "role": "developer"},
+            ],
+        }
+    )
+    return company_resp.json()["company_id"]
+
+
+async def _insert_events(test_engine, company_id: str, events: list[tuple[datetime, str, str]]) -> None:
+    async with AsyncSession(test_engine) as session:
+        for timestamp, agent_id, event_type in events:
+            session.add(
+                Event(company_id=company_id, from_agent_id=agent_id, event_type=event_type, timestamp=timestamp)
+            )
+        await session.commit()
+
+
+async def _timeline(client, company_id, **params) -> dict:
+    resp = await client.get(f"/api/companies/{company_id}/timeline", params=params)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+# ============== Buckets ==============
+
+@pytest.mark.asyncio
+async def test_timeline_counts_per_bucket(client, test_engine):
+    """Test events are counted per bucket and per event type, including empty buckets."""
+    company_id = await _create_company(client)
+    start = datetime(2026, 10, 1, 9, 0)
+    await _insert_events(
+        test_engine,
+        company_id,
+        [
+            (start + timedelta(seconds=10), "BA-001", "THINKING"),
+            (start + timedelta(seconds=50), "DEV-001", "CODING"),
+            (start + timedelta(minutes=2, seconds=5), "DEV-001", "CODING"),
+        ],
+    )
+
+    timeline = await _timeline(
+        client,
+        company_id,
+        bucket="1m",
+        group_by="event_type",
+        **{"from": start.isoformat(), "to": (start + timedelta(minutes=3)).isoformat()},
+    )
+
+    assert [b["total"] for b in timeline["buckets"]] == [2, 0, 1]
+    assert timeline["buckets"][0]["start"] == start.isoformat()
+    assert timeline["buckets"][0]["counts"] == {"THINKING": 1, "CODING": 1}
+    assert timeline["buckets"][1]["counts"] == {}
+
+    by_agent = await _timeline(
+        client,
+        company_id,
+        bucket="5m",
+        group_by="agent",
+        **{"from": start.isoformat(), "to": (start + timedelta(minutes=3)).isoformat()},
+    )
+    assert [b["counts"] for b in by_agent["buckets"]] == [{"BA-001": 1, "DEV-001": 2}]
+
+
+@pytest.mark.asyncio
+async def test_timeline_defaults_to_last_buckets(client):
+    """Test the default range is the last 60 buckets and includes new events."""
+    company_id = await _create_company(client)
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "BA-001", "event_type": "THINKING"}
+    )
+
+    timeline = await _timeline(client, company_id)
+
+    assert len(timeline["buckets"]) == 60
+    assert sum(b["total"] for b in timeline["buckets"]) == 1
+    assert timeline["buckets"][-1]["counts"] == {}
+
+
+@pytest.mark.asyncio
+async def test_timeline_validates_params(client):
+    """Test invalid bucket widths, groupings, ranges and companies are rejected."""
+    company_id = await _create_company(client)
+    url = f"/api/companies/{company_id}/timeline"
+
+    assert (await client.get(url, params={"bucket": "1w"})).status_code == 400
+    assert (await client.get(url, params={"group_by": "role"})).status_code == 400
+    too_many = await client.get(url, params={"bucket": "1s", "from": "2020-01-01T00:00:00"})
+    assert too_many.status_code == 400
+    missing = await client.get("/api/companies/00000000-0000-0000-0000-000000000000/timeline")
+    assert missing.status_code == 404
+
+
+# ============== Caching ==============
+
+@pytest.mark.asyncio
+async def test_closed_buckets_are_cached(client, test_engine):
+    """Test closed buckets come from the cache while the open tail is recounted."""
+    company_id = await _create_company(client)
+    now = datetime.utcnow()
+    old = bucket_start(now, timedelta(minutes=1)) - timedelta(minutes=10)
+    await _insert_events(test_engine, company_id, [(old, "BA-001", "THINKING")])
+
+    first = await _timeline(client, company_id, bucket="1m")
+    assert sum(b["total"] for b in first["buckets"]) == 1
+
+    # A closed bucket is immutable: a row slipped into it directly isn't recounted
+    await _insert_events(test_engine, company_id, [(old, "BA-001", "THINKING")])
+    # The open bucket is
+    await client.post(
+        "/api/events",
+        json={"company_id": company_id, "agent_id": "DEV-001", "event_type": "CODING"}
+    )
+    second = await _timeline(client, company_id, bucket="1m")
+
+    assert timeline_cache.stats()["entries"] == 1
+    assert sum(b["total"] for b in second["buckets"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_agent_removal_invalidates_cache(client, test_engine):
+    """Test deleting an agent (and its events) drops the company's cached buckets."""
+    company_id = await _create_company(client)
+    old = bucket_start(datetime.utcnow(), timedelta(minutes=1)) - timedelta(minutes=10)
+    await _insert_events(test_engine, company_id, [(old, "BA-001", "THINKING"), (old, "DEV-001", "CODING")])
+
+    first = await _timeline(client, company_id, bucket="1m")
+    assert sum(b["total"] for b in first["buckets"]) == 2
+
+    await client.delete(f"/api/companies/{company_id}/agents/DEV-001")
+    second = await _timeline(client, company_id, bucket="1m")
+
+    assert sum(b["total"] for b in second["buckets"]) == 1
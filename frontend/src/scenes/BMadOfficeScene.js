@@ -21,6 +21,8 @@ export class BMadOfficeScene extends Phaser.Scene {
         this.selectedCompanyId = null;
         this.pollingTimer = null;
         this.pollCount = 0;
+        this.stateStream = null;
+        this._pollInFlight = false;
         this.activeMovements = new Map();
         this.agentMap = new Map();
         this.knownLogIds = new Set();
@@ -67,6 +69,7 @@ export class BMadOfficeScene extends Phaser.Scene {
         this.events.once('shutdown', () => {
             if (this._companyRefreshTimer) { clearInterval(this._companyRefreshTimer); this._companyRefreshTimer = null; }
             if (this.pollingTimer) { clearTimeout(this.pollingTimer); this.pollingTimer = null; }
+            if (this.stateStream) { this.stateStream.close(); this.stateStream = null; }
         });
 
         // Hide loader
@@ -93,11 +96,12 @@ export class BMadOfficeScene extends Phaser.Scene {
         this.uiManager.hideNoCompanyOverlay();
 
         // Fetch initial state
-        const state = await this.api.getCompanyState(companyId);
-        if (!state) {
+        const fullState = await this.api.getCompanyState(companyId);
+        if (!fullState) {
             this.uiManager.updateConnectionStatus('error');
             return;
         }
+        const state = this.stateReconciler.mergeState(fullState);
 
         // Merge role configs from backend
         this.roleRegistry.mergeBackendRoles(state.role_configs);
@@ -124,6 +128,9 @@ export class BMadOfficeScene extends Phaser.Scene {
         // Update UI
         this.updateLists();
 
+        // Push updates over SSE; polling stays as a slow fallback while the stream is open
+        this.stateStream = this.api.openCompanyStream(companyId, (type, data) => this._handleStreamChange(type, data));
+
         // H3: Start polling with setTimeout chaining (prevents concurrent polls)
         this._schedulePoll();
         this.uiManager.updateConnectionStatus('connected');
@@ -132,11 +139,44 @@ export class BMadOfficeScene extends Phaser.Scene {
         }
     }
 
-    _schedulePoll() {
+    _schedulePoll(delay = null) {
+        const streaming = this.stateStream?.readyState === EventSource.OPEN;
         this.pollingTimer = setTimeout(async () => {
-            await this.pollState();
+            this._pollInFlight = true;
+            try {
+                await this.pollState();
+            } finally {
+                this._pollInFlight = false;
+            }
             if (this.selectedCompanyId) this._schedulePoll();
-        }, 3000);
+        }, delay ?? (streaming ? 15000 : 3000));
+    }
+
+    // Poll soon (debounced) unless a poll is already running
+    _requestPoll() {
+        if (this._pollInFlight || !this.selectedCompanyId) return;
+        if (this.pollingTimer) clearTimeout(this.pollingTimer);
+        this._schedulePoll(250);
+    }
+
+    _handleStreamChange(type, data) {
+        switch (type) {
+            case 'agent_status': {
+                const agent = this.agentMap.get(data.agent_id);
+                if (agent) agent.updateFromState(data, this.stateReconciler.mapBackendStatus.bind(this.stateReconciler));
+                if (this.selectedAgent?.agentId === data.agent_id) this.uiManager.updateAgentPanel(this.selectedAgent);
+                break;
+            }
+            case 'movement_created':
+                this._startMovement(data);
+                break;
+            case 'movement_completed':
+                // Frontend drives its own animations to completion
+                break;
+            default:
+                // agent_added / agent_removed / resync need a full snapshot
+                this._requestPoll();
+        }
     }
 
     _createAgentFromApi(apiAgent) {
@@ -188,12 +228,14 @@ export class BMadOfficeScene extends Phaser.Scene {
         this.pollCount++;
         const gen = this._pollGeneration;
 
-        const state = await this.api.getCompanyState(this.selectedCompanyId);
+        // Versioned delta: only agents/movements changed since the last poll
+        const delta = await this.api.getCompanyState(this.selectedCompanyId, this.stateReconciler.version);
         if (gen !== this._pollGeneration) return; // Company changed during fetch
-        if (!state) {
+        if (!delta) {
             this.uiManager.updateConnectionStatus('error');
             return;
         }
+        const state = this.stateReconciler.mergeState(delta);
         this.uiManager.updateConnectionStatus('connected');
 
         // Merge role configs
@@ -263,23 +305,9 @@ export class BMadOfficeScene extends Phaser.Scene {
         const handoffs = pendingMovements.filter(m => m.purpose === 'handoff');
         const returns = pendingMovements.filter(m => m.purpose === 'return');
 
-        // Start handoff movements not already active
-        for (const movement of handoffs) {
-            if (!this.activeMovements.has(movement.id)) {
-                this.animateMovement(movement);
-            }
-        }
-
-        // Start return movements ONLY if no active handoff for same agent
-        for (const movement of returns) {
-            if (!this.activeMovements.has(movement.id)) {
-                const hasActiveHandoff = [...this.activeMovements.values()]
-                    .some(m => m.agentId === movement.agent_id && m.purpose === 'handoff');
-                if (!hasActiveHandoff) {
-                    this.animateMovement(movement);
-                }
-            }
-        }
+        // Start handoff movements first, then returns
+        for (const movement of handoffs) this._startMovement(movement);
+        for (const movement of returns) this._startMovement(movement);
 
         // Clean up completed: remove from activeMovements if no longer in API list
         const apiMovementIds = new Set(pendingMovements.map(m => m.id));
@@ -290,6 +318,18 @@ export class BMadOfficeScene extends Phaser.Scene {
         }
     }
 
+    _startMovement(movement) {
+        if (this.activeMovements.has(movement.id)) return;
+
+        // Start return movements ONLY if no active handoff for same agent
+        if (movement.purpose === 'return') {
+            const hasActiveHandoff = [...this.activeMovements.values()]
+                .some(m => m.agentId === movement.agent_id && m.purpose === 'handoff');
+            if (hasActiveHandoff) return;
+        }
+        this.animateMovement(movement);
+    }
+
     animateMovement(movement) {
         const agent = this.agentMap.get(movement.agent_id);
         if (!agent || agent.isBusy) return;
@@ -374,6 +414,10 @@ export class BMadOfficeScene extends Phaser.Scene {
             clearTimeout(this.pollingTimer);
             this.pollingTimer = null;
         }
+        if (this.stateStream) {
+            this.stateStream.close();
+            this.stateStream = null;
+        }
 
         // Kill all active tweens first to prevent orphaned references
         this.tweens.killAll();
@@ -387,6 +431,7 @@ export class BMadOfficeScene extends Phaser.Scene {
         Object.values(this.departments).forEach(d => d.destroy());
 
         // Clear state
+        this.stateReconciler.reset();
         this.agentMap.clear();
         this.activeMovements.clear();
         this.knownLogIds.clear();
@@ -24,12 +24,27 @@ export class APIService {
         return this._fetch(`${this.baseUrl}/companies`);
     }
 
-    async getCompanyState(companyId) {
-        return this._fetch(`${this.baseUrl}/companies/${companyId}/state`);
+    // Pass the last response's `version` as `since` to receive only later changes
+    async getCompanyState(companyId, since = null) {
+        const query = since !== null ? `?since=${since}` : '';
+        return this._fetch(`${this.baseUrl}/companies/${companyId}/state${query}`);
     }
 
-    async getCompanyLogs(companyId, { limit = 50, offset = 0, agentId = null, eventType = null } = {}) {
-        let url = `${this.baseUrl}/companies/${companyId}/logs?limit=${limit}&offset=${offset}`;
+    // Server-Sent Events stream of committed changes; returns the EventSource (or null if unsupported)
+    openCompanyStream(companyId, onChange) {
+        if (typeof EventSource === 'undefined') return null;
+        const source = new EventSource(`${this.baseUrl}/companies/${companyId}/stream`);
+        const types = ['agent_status', 'agent_added', 'agent_removed', 'movement_created', 'movement_completed', 'resync'];
+        for (const type of types) {
+            source.addEventListener(type, (e) => onChange(type, JSON.parse(e.data)));
+        }
+        return source;
+    }
+
+    async getCompanyLogs(companyId, { limit = 50, offset = 0, cursor = null, agentId = null, eventType = null } = {}) {
+        // Prefer the next_cursor of the previous page; offset is kept for compatibility
+        let url = `${this.baseUrl}/companies/${companyId}/logs?limit=${limit}`;
+        url += cursor ? `&cursor=${encodeURIComponent(cursor)}` : `&offset=${offset}`;
         if (agentId) url += `&agent_id=${encodeURIComponent(agentId)}`;
         if (eventType) url += `&event_type=${encodeURIComponent(eventType)}`;
         return this._fetch(url);
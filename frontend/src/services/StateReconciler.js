@@ -1,6 +1,37 @@
 import { AGENT_STATES } from '../classes/Agent.js';
 
 export class StateReconciler {
+    constructor() {
+        this.reset();
+    }
+
+    // Forget the cached snapshot (e.g. on company switch)
+    reset() {
+        this.version = null;
+        this._agents = new Map();
+        this._movements = new Map();
+    }
+
+    // Merge a full or delta /state response into the cached snapshot and return the full state
+    mergeState(state) {
+        if (!state.is_delta) {
+            this._agents = new Map(state.agents.map(a => [a.agent_id, a]));
+            this._movements = new Map(state.pending_movements.map(m => [m.id, m]));
+        } else {
+            for (const agentId of state.removed_agent_ids || []) this._agents.delete(agentId);
+            for (const movementId of state.removed_movement_ids || []) this._movements.delete(movementId);
+            for (const agent of state.agents) this._agents.set(agent.agent_id, agent);
+            for (const movement of state.pending_movements) this._movements.set(movement.id, movement);
+        }
+        this.version = state.version;
+
+        return {
+            ...state,
+            agents: [...this._agents.values()],
+            pending_movements: [...this._movements.values()],
+        };
+    }
+
     reconcileAgents(agentMap, apiAgents, roleRegistry) {
         const toAdd = [];
         const toRemove = [];